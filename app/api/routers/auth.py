@@ -2,12 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.hashing import password_hasher
+from app.core.principal import invalidate_principal
 from app.db.database import get_db
-from app.core.security import (
-    get_password_hash, verify_password, create_access_token, get_current_user
+from app.core.security import create_access_token, get_current_user
+from app.repositories.user_repo import (
+    get_user_by_email, get_user_by_id, create_user, update_password, delete_user
 )
-from app.repositories.user_repo import get_user_by_email, create_user
-from app.schemas.auth import UserCreate, UserOut, Token
+from app.schemas.auth import UserCreate, UserOut, Token, PasswordChange
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -17,19 +19,49 @@ async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)):
     existing = await get_user_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=409, detail="Email already registered")
-    user = await create_user(db, payload.email, get_password_hash(payload.password))
+    hashed = await password_hasher.hash(payload.password)
+    user = await create_user(db, payload.email, hashed)
     return user
 
 # Login existing user
 @router.post("/login", response_model=Token)
 async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     user = await get_user_by_email(db, form.username)
-    if not user or not verify_password(form.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await password_hasher.verify(form.password, user.hashed_password)
+    if not valid:
         # Always 401 for bad credentials
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    token = create_access_token(user.id)
-    return Token(access_token=token)
\ No newline at end of file
+    if new_hash:
+        # Stored hash used an older cost; upgrade it while we have the password
+        await update_password(db, user.id, new_hash)
+    token = create_access_token(user.id, email=user.email)
+    return Token(access_token=token)
+
+# Change password
+@router.post("/change_password", status_code=status.HTTP_204_NO_CONTENT)
+async def change_password(
+    payload: PasswordChange,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    user = await get_user_by_id(db, current_user.id)
+    if not user or not (await password_hasher.verify(payload.current_password, user.hashed_password))[0]:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
+    hashed = await password_hasher.hash(payload.new_password)
+    await update_password(db, user.id, hashed)
+    # Committed before the cache drops the user, so no request can re-cache the old row
+    await db.commit()
+    invalidate_principal(user.id)
+
+# Delete account
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_account(db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
+    await delete_user(db, current_user.id)
+    await db.commit()
+    invalidate_principal(current_user.id)
\ No newline at end of file
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, Response
+from app.core import metrics
+from app.core.config import settings
+from app.core.startup import readiness
+
+router = APIRouter(tags=["Health"])
+
+# Liveness: the process is up and serving
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+# Readiness: schema checked and warm-up finished
+@router.get("/ready")
+def ready():
+    """503 until start-up has finished; the body has the import and warm-up timings."""
+    return JSONResponse(content=readiness.as_dict(), status_code=200 if readiness.ready else 503)
+
+
+# Metrics for Prometheus to scrape
+@router.get("/metrics")
+def get_metrics():
+    """Request latency, hot-path spans, LLM, DB pool and event-loop metrics of this worker process."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,116 +1,155 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.information import (
     BasicInfo, SocialLinks, Skill, Project, Education, Experience, ExtraCurricular, Certificate, Achievement, ResumeData
 )
 from app.core.security import get_current_user
+from app.db.database import get_db
+from app.repositories.profile_repo import SECTION_WRITERS, save_resume_data
 from app.schemas import auth
 
 router = APIRouter(prefix="/info", tags=["Information"])
 
+
+async def _save_section(db: AsyncSession, user_id, section: str, value) -> None:
+    try:
+        await SECTION_WRITERS[section](db, user_id, value)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=f"{section}: {exc}")
+
+
 # Full Resume Endpoints
 
 @router.post("/")
-def create_resume(
+async def create_resume(
     data: ResumeData, 
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """
     Create a new resume with all sections.
     Users can submit full resume data in one request.
     """
+    try:
+        await save_resume_data(db, current_user.id, data.model_dump(mode="json"))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     return {"resume": data.model_dump()}
 
 
 @router.patch("/")
-def update_resume(
+async def update_resume(
     data: ResumeData,
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """
     Update the full resume. Any section not provided will remain unchanged.
     """
+    try:
+        await save_resume_data(db, current_user.id, data.model_dump(mode="json"))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     return {"updated_resume": data.model_dump()}
 
 
 # Section-Specific Endpoints
 
 @router.patch("/basic")
-def update_basic(
+async def update_basic(
     info: BasicInfo,
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update basic information of the resume."""
+    await _save_section(db, current_user.id, "basic_info", info.model_dump(mode="json"))
     return {"basic_info": info.model_dump()}
 
 
 @router.patch("/social_links")
-def update_socials(
+async def update_socials(
     links: SocialLinks,
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update social and professional links of the resume."""
+    await _save_section(db, current_user.id, "social_links", links.model_dump(mode="json"))
     return {"social_links": links.model_dump()}
 
 
 @router.patch("/skills")
-def update_skills(
+async def update_skills(
     skills: List[Skill],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update skills section of the resume."""
+    await _save_section(db, current_user.id, "skills", [x.model_dump(mode="json") for x in skills])
     return {"skills": [s.model_dump() for s in skills]}
 
 
 @router.patch("/projects")
-def update_projects(
+async def update_projects(
     projects: List[Project],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update projects section of the resume."""
+    await _save_section(db, current_user.id, "projects", [x.model_dump(mode="json") for x in projects])
     return {"projects": [p.model_dump() for p in projects]}
 
 
 @router.patch("/experience")
-def update_experience(
+async def update_experience(
     experiences: List[Experience],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update experience section of the resume."""
+    await _save_section(db, current_user.id, "experience", [x.model_dump(mode="json") for x in experiences])
     return {"experience": [e.model_dump() for e in experiences]}
 
 
 @router.patch("/education")
-def update_education(
+async def update_education(
     education: List[Education],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update education section of the resume."""
+    await _save_section(db, current_user.id, "education", [x.model_dump(mode="json") for x in education])
     return {"education": [e.model_dump() for e in education]}
 
 
 @router.patch("/certificates")
-def update_certificates(
+async def update_certificates(
     certificates: List[Certificate],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update certifications section of the resume."""
+    await _save_section(db, current_user.id, "certificates", [x.model_dump(mode="json") for x in certificates])
     return {"certificates": [c.model_dump() for c in certificates]}
 
 
 @router.patch("/achievements")
-def update_achievements(
+async def update_achievements(
     achievements: List[Achievement],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update achievements section of the resume."""
+    await _save_section(db, current_user.id, "achievements", [x.model_dump(mode="json") for x in achievements])
     return {"achievements": [a.model_dump() for a in achievements]}
 
 
 @router.patch("/extra_curricular")
-def update_extra_curricular(
+async def update_extra_curricular(
     activities: List[ExtraCurricular],
+    db: AsyncSession = Depends(get_db),
     current_user: auth.UserLogin = Depends(get_current_user)
 ):
     """Update extra-curricular activities section of the resume."""
+    await _save_section(db, current_user.id, "extra_curricular", [x.model_dump(mode="json") for x in activities])
     return {"extra_curricular": [act.model_dump() for act in activities]}
\ No newline at end of file
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+from uuid import UUID
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import get_current_user, get_token_principal
+from app.core.uploads import read_docx_upload
+from app.db.database import SessionFactory, get_db
+from app.repositories.job_repo import TERMINAL_STATUSES, create_job, get_job
+from app.schemas import auth
+from app.schemas.jobs import JobOut
+from app.services.jobs.runner import JOB_HANDLERS, JOB_OUTPUT_TYPES, job_runner
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+# Job types that need an uploaded document
+NEEDS_FILE = {"parse_resume", "apply_changes", "convert"}
+
+
+# Submit a job
+@router.post("/{job_type}", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job_type: str,
+    file: UploadFile | None = File(None),
+    payload_json: str = Form("{}"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth.UserLogin = Depends(get_current_user)
+):
+    """
+    Queue a `parse_resume`, `apply_changes`, `tailor` or `convert` job. \n
+    `file` - the `.docx` (required except for `tailor` with `resume_json`) \n
+    `payload_json` - job options, e.g. `{"sentences": [...]}` for apply_changes
+    or `{"job_description": "...", "resume_json": {...}}` for tailor
+    """
+    if job_type not in JOB_HANDLERS:
+        raise HTTPException(status_code=404, detail=f"Unknown job type '{job_type}'")
+    try:
+        payload = json.loads(payload_json)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="payload_json is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="payload_json must be a JSON object")
+
+    data = (await read_docx_upload(file)).data if file is not None else None
+    if data is None and (job_type in NEEDS_FILE or "resume_json" not in payload):
+        raise HTTPException(status_code=422, detail="A .docx file is required for this job")
+    if job_type == "tailor" and not payload.get("job_description"):
+        raise HTTPException(status_code=422, detail="payload_json.job_description is required")
+
+    job = await create_job(db, current_user.id, job_type, payload, data)
+    await db.commit()
+    job_runner.notify()
+    return job
+
+
+# Job status, with optional long-poll
+@router.get("/{job_id}", response_model=JobOut)
+async def job_status(
+    job_id: UUID,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish"),
+    current_user: auth.UserLogin = Depends(get_token_principal)
+):
+    """
+    Current status of a job. With `wait`, the request is held until the job
+    completes or fails, or `wait` seconds pass (capped at JOB_LONG_POLL_MAX_SECONDS).
+    """
+    deadline = time.monotonic() + min(wait, settings.JOB_LONG_POLL_MAX_SECONDS)
+    finished = job_runner.finished_event(job_id)
+    try:
+        while True:
+            # Short-lived sessions so a long-poll never pins a pooled connection
+            async with SessionFactory() as db:
+                job = await get_job(db, current_user.id, job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            remaining = deadline - time.monotonic()
+            if job.status in TERMINAL_STATUSES or remaining <= 0:
+                return job
+            # Woken at once for jobs run by this process; re-checked every
+            # second for jobs run by another worker
+            try:
+                await asyncio.wait_for(finished.wait(), min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        job_runner.forget_waiter(job_id, finished)
+
+
+# Job result
+@router.get("/{job_id}/result")
+async def job_result(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth.UserLogin = Depends(get_token_principal)
+):
+    """Result JSON of a completed job, or the generated file for `apply_changes`/`convert`."""
+    job = await get_job(db, current_user.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=422, detail=job.error or "Job failed")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    if job.output_data is not None and job.job_type in JOB_OUTPUT_TYPES:
+        media_type, ext = JOB_OUTPUT_TYPES[job.job_type]
+        return Response(
+            content=job.output_data,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="result.{ext}"'},
+        )
+    return JSONResponse(content=job.result)
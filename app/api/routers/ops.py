@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.core.executor import executor_stats
+from app.core.hashing import password_hasher
+from app.core.principal import principal_cache
+from app.core.profiling import list_profiles, profile_path, require_profile_admin
+from app.core.uploads import upload_stats
+from app.services.jobs.runner import job_runner
+from app.services.llm.cache import llm_cache
+from app.services.llm.client import llm_stats
+from app.services.resume.cache import parse_cache
+from app.services.resume.pdf import pdf_converter
+from app.services.resume.skills import skill_dictionary
+from app.services.resume.templates import template_registry
+
+# Every /ops endpoint needs X-Profile-Token (PROFILE_ADMIN_TOKEN)
+router = APIRouter(prefix="/ops", tags=["Ops"], dependencies=[Depends(require_profile_admin)])
+
+# Executor pool stats
+@router.get("/executor")
+def get_executor_stats():
+    """Queue depth, wait time and execution time per task type."""
+    return executor_stats()
+
+
+# Parse-result cache counters
+@router.get("/parse_cache")
+def get_parse_cache_stats():
+    """Hit, miss and eviction counters for the parsed-resume cache."""
+    return parse_cache.stats()
+
+
+# LLM call stats
+@router.get("/llm")
+def get_llm_stats():
+    """Latency, token usage and retry counts for LLM calls."""
+    return llm_stats.as_dict()
+
+
+# LLM response cache counters and savings
+@router.get("/llm_cache")
+async def get_llm_cache_stats():
+    """Hits, misses, evictions and the dollars and seconds saved by the LLM cache."""
+    return await llm_cache.stats()
+
+
+# Job runner slots
+@router.get("/jobs")
+def get_job_runner_stats():
+    """Running jobs and concurrency limits per job type for this process."""
+    return job_runner.stats()
+
+
+# Principal cache
+@router.get("/principals")
+def get_principal_cache_stats():
+    """Hit rate of the resolved-user cache and latency of the lookups it could not avoid."""
+    return principal_cache.stats()
+
+
+# Password hashing
+@router.get("/hashing")
+def get_hashing_stats():
+    """bcrypt cost in use, hashes per second and queue wait on the hash pool."""
+    return password_hasher.stats()
+
+
+# Skill dictionary
+@router.get("/skills")
+def get_skill_dictionary_stats():
+    """Size of the in-memory skill dictionary and how often it resolved names without the DB."""
+    return skill_dictionary.stats()
+
+
+# PDF conversion pool
+@router.get("/pdf")
+def get_pdf_converter_stats():
+    """LibreOffice workers, queue depth, conversion latency and PDF cache hits."""
+    return pdf_converter.stats()
+
+
+# Resume templates
+@router.get("/templates")
+def get_template_stats():
+    """Loaded templates, their placeholders, and load/reload/render counts."""
+    return template_registry.stats()
+
+
+# Upload ingestion
+@router.get("/uploads")
+def get_upload_stats():
+    """Accepted uploads and rejections by reason (too large, not a docx, zip bomb, encrypted)."""
+    return dict(upload_stats)
+
+
+# Per-request profiles
+@router.get("/profiles")
+def get_profiles():
+    """Stored request profiles, newest first: route, status, duration and per-task timings."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """Folded stacks in microseconds, for flamegraph.pl, inferno or speedscope."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -1,16 +1,29 @@
-import io
-import tempfile
+import base64
 import json
-from fastapi.responses import FileResponse, JSONResponse
+import time
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from docx import Document
+from app.core.executor import run_task
 from app.core.security import get_current_user
+from app.core.uploads import read_docx_upload, docx_response
 from app.schemas import auth
-from app.services.resume.replacer import replace_and_style
-from app.services.resume.parser import extract_sentences_regex
+from app.services.resume.cache import parse_with_cache
+from app.services.resume.tailor import stream_tailored_edits
+from app.services.resume.tasks import (
+    extract_sentences_task, replace_sentence_task, apply_changes_task,
+    load_document, apply_one_change, save_document
+)
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
+
+def _memory_headers(input_bytes: int, output_bytes: int, peak_bytes: int | None) -> dict:
+    headers = {"X-Buffered-Bytes": str(input_bytes + output_bytes)}
+    if peak_bytes is not None:
+        headers["X-Peak-Memory-Bytes"] = str(peak_bytes)
+    return headers
+
+
 # Extract sentences from docx
 @router.post("/extract_sentences")
 async def parse_resume(
@@ -20,17 +33,17 @@ async def parse_resume(
     """
     Extract sentences from the uploaded `.docx` resume.
     """
-    # Step 1: Save the uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp_in:
-        tmp_in.write(await file.read())
-        tmp_in.flush()
-        input_path = tmp_in.name
+    # Step 1: Read and validate the upload, hashing it on the way in
+    upload = await read_docx_upload(file)
+    data = upload.data
 
-    # Step 2: Extract sentences from the document
-    result = extract_sentences_regex(input_path)
+    # Step 2: Extract sentences, reusing the cached result for a repeat upload
+    result, hit, peak = await parse_with_cache("sentences", data, extract_sentences_task, upload.sha256)
 
     # Step 3: Return the structured JSON response
-    return JSONResponse(content=result)
+    headers = _memory_headers(len(data), 0, peak)
+    headers["X-Parse-Cache"] = "hit" if hit else "miss"
+    return JSONResponse(content=result, headers=headers)
 
 
 # Replace whole sentences 
@@ -50,27 +63,22 @@ async def replace_text(
     `bold words` comma seperated \n
     `italic words` comma seperated
     '''
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp_in:
-        tmp_in.write(await file.read())
-        tmp_in.flush()
-        input_path = tmp_in.name
-
-    # Load document
-    doc = Document(input_path)
+    # Read and validate the uploaded file
+    data = (await read_docx_upload(file)).data
 
     # Convert comma-separated lists into Python lists
     bold_list = [w.strip() for w in bold_words.split(",") if w.strip()]
     italic_list = [w.strip() for w in italic_words.split(",") if w.strip()]
 
-    # Replace and style
-    replace_and_style(doc, from_sentence, to_sentence, bold_list, italic_list)
+    # Load, replace and style, serialize (off the event loop)
+    output, peak = await run_task(
+        "docx_replace", replace_sentence_task,
+        data, from_sentence, to_sentence, bold_list, italic_list
+    )
 
-    # Save updated file
-    output_path = input_path.replace(".docx", "_updated.docx")
-    doc.save(output_path)
-
-    return FileResponse(output_path, filename="updated_resume.docx")
+    return docx_response(
+        output, "updated_resume.docx", _memory_headers(len(data), len(output), peak)
+    )
 
 
 # Tailor Resume
@@ -86,29 +94,85 @@ async def apply_changes(
     Upload `changes_json` - This is a dummy LLM response. \n
     The sentences which needs to be changed in the Resume in JSON format
     '''
-    # Save uploaded docx
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp_in:
-        tmp_in.write(await file.read())
-        tmp_in.flush()
-        input_path = tmp_in.name
-
-    doc = Document(input_path)
+    # Read and validate the uploaded docx
+    data = (await read_docx_upload(file)).data
 
     # Load JSON changes
     changes = json.loads(changes_json)
 
-    # Apply changes
-    for change in changes.get("sentences", []):
-        replace_and_style(
-            doc,
-            from_sentence=change["from_sentence"],
-            to_sentence=change["to_sentence"],
-            bold_words=change.get("bold_words", []),
-            italic_words=change.get("italic_words", [])
-        )
-
-    # Save updated file
-    output_path = input_path.replace(".docx", "_updated.docx")
-    doc.save(output_path)
-
-    return FileResponse(output_path, filename="updated_resume.docx")
\ No newline at end of file
+    # Apply all changes in a single pass over the document (off the event loop)
+    (output, report), peak = await run_task(
+        "docx_replace", apply_changes_task, data, changes.get("sentences", [])
+    )
+
+    headers = {
+        "X-Replaced-Blocks": str(report["replaced"]),
+        "X-Unmatched-Sentences": str(len(report["unmatched"])),
+        "X-Ambiguous-Sentences": str(len(report["ambiguous"])),
+        "X-Shadowed-Sentences": str(len(report["shadowed"])),
+    }
+    headers.update(_memory_headers(len(data), len(output), peak))
+    return docx_response(output, "updated_resume.docx", headers)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Tailor Resume against a JD, streaming edits as the LLM produces them
+@router.post("/tailor_stream")
+async def tailor_stream(
+    file: UploadFile = File(...),
+    job_description: str = Form(...),
+    current_user: auth.UserLogin = Depends(get_current_user)
+):
+    '''
+    Tailor Resume with the LLM, streamed as Server-Sent Events \n
+    Upload `.docx` and the `job_description` text \n
+    `edit` events arrive as each sentence change is applied, then a `done`
+    event carries the updated `.docx` (base64) and timings
+    '''
+    upload = await read_docx_upload(file)
+    data = upload.data
+    sentences, _, _ = await parse_with_cache("sentences", data, extract_sentences_task, upload.sha256)
+    texts = [s["text"] for s in sentences["sentences"]]
+    user_id = getattr(current_user, "id", None)
+
+    async def events():
+        started = time.perf_counter()
+        first_edit = None
+        applied, unmatched = 0, []
+        written = set()  # blocks already rewritten: a later edit can't re-match an earlier edit's text
+        try:
+            doc = await run_task("docx_stream", load_document, data)
+            async for change in stream_tailored_edits(texts, job_description, user_id=user_id):
+                report = await run_task("docx_stream", apply_one_change, doc, change, written)
+                if first_edit is None:
+                    first_edit = time.perf_counter() - started
+                matched = not report["unmatched"]
+                yield _sse("edit", {"index": applied + len(unmatched), "matched": matched, **change})
+                if matched:
+                    applied += 1
+                else:
+                    unmatched.append(change["from_sentence"])
+
+            output = await run_task("docx_stream", save_document, doc)
+            yield _sse("done", {
+                "applied": applied,
+                "unmatched": unmatched,
+                "time_to_first_edit_seconds": first_edit,
+                "total_seconds": time.perf_counter() - started,
+                "filename": "updated_resume.docx",
+                "docx_base64": base64.b64encode(output).decode("ascii"),
+            })
+        except HTTPException as exc:
+            yield _sse("error", {"status_code": exc.status_code, "detail": exc.detail})
+        except Exception:
+            # Headers are already sent, so failures can only be reported in-stream
+            yield _sse("error", {"status_code": 502, "detail": "Tailoring failed"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
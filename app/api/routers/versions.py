@@ -0,0 +1,94 @@
+import time
+from uuid import UUID
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_user, get_token_principal
+from app.core.uploads import read_docx_upload
+from app.db.database import get_db
+from app.repositories.file_repo import store_file
+from app.repositories.version_repo import (
+    create_resume, create_version, get_version, get_version_file_id, get_version_sentences
+)
+from app.schemas import auth
+from app.schemas.versions import VersionCreate, VersionOut
+from app.services.resume.cache import parse_with_cache
+from app.services.resume.tasks import extract_sentences_task
+
+router = APIRouter(prefix="/resumes", tags=["Resume Versions"])
+
+
+def _version_out(version, rows_written: int) -> VersionOut:
+    out = VersionOut.model_validate(version)
+    out.rows_written = rows_written
+    return out
+
+
+# Upload a resume as the first version
+@router.post("/", response_model=VersionOut, status_code=status.HTTP_201_CREATED)
+async def upload_resume(
+    file: UploadFile = File(...),
+    title: str = Form("Resume"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth.UserLogin = Depends(get_current_user)
+):
+    """
+    Store the `.docx` (once per content hash) and its sentences as version 1 of a new resume.
+    """
+    upload = await read_docx_upload(file)
+    stored, _ = await store_file(db, current_user.id, upload.data, "resume", upload.sha256)
+    sentences, _, _ = await parse_with_cache("sentences", upload.data, extract_sentences_task, upload.sha256)
+
+    resume = await create_resume(db, current_user.id, title)
+    version, rows = await create_version(
+        db, resume.id, [s["text"] for s in sentences["sentences"]], file_id=stored.id
+    )
+    return _version_out(version, rows)
+
+
+# Save edited sentences as a child version
+@router.post("/versions/{version_id}", response_model=VersionOut, status_code=status.HTTP_201_CREATED)
+async def create_child_version(
+    version_id: UUID,
+    payload: VersionCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth.UserLogin = Depends(get_current_user)
+):
+    """
+    New version derived from `version_id` with the full list of sentences;
+    only the sentences that differ from the parent are stored.
+    """
+    parent = await get_version(db, current_user.id, version_id)
+    if parent is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    started = time.perf_counter()
+    version, rows = await create_version(db, parent.resume_id, payload.sentences, parent_version_id=parent.id)
+    out = _version_out(version, rows)
+    return JSONResponse(
+        content=out.model_dump(mode="json"),
+        status_code=status.HTTP_201_CREATED,
+        headers={"X-Version-Create-Ms": f"{(time.perf_counter() - started) * 1000:.1f}"},
+    )
+
+
+# Sentences of a version
+@router.get("/versions/{version_id}")
+async def read_version(
+    version_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth.UserLogin = Depends(get_token_principal)
+):
+    """
+    Sentences of the version, rebuilt from its deltas (same shape as
+    `/resume/extract_sentences`), plus the file it was derived from.
+    """
+    version = await get_version(db, current_user.id, version_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    texts = await get_version_sentences(db, version.id)
+    file_id = await get_version_file_id(db, version.id)  # inherited from the nearest ancestor with a file
+    return {
+        "file_id": str(file_id) if file_id else None,
+        "sentences": [{"id": i, "text": t} for i, t in enumerate(texts, start=1)],
+    }
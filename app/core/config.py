@@ -10,11 +10,122 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Principal cache (resolved users, per process)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing (bcrypt cost calibrated at startup unless HASH_ROUNDS is set)
+    HASH_WORKERS: int = 2
+    HASH_QUEUE: int = 32
+    HASH_TARGET_MS: float = 250.0
+    HASH_ROUNDS: int | None = None
+    HASH_MIN_ROUNDS: int = 10  # calibration floor; weaker hashes are upgraded on login
+    HASH_MAX_ROUNDS: int = 14
+
     # FastAPI
     PROJECT_NAME: str = "Resume Rizzer"
 
     # OpenAI Key
     OPENAI_API_KEY: str | None = None
+    OPENAI_BASE_URL: str | None = None  # point at a local stub for tests/load runs
+    OPENAI_MODEL: str = "gpt-4o-mini"
+
+    # LLM client limits
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_IN_FLIGHT: int = 16
+    LLM_MAX_IN_FLIGHT_PER_USER: int = 2
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_DEADLINE_SECONDS: float = 90.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+
+    # LLM response cache
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_PERSIST: bool = True
+    LLM_CACHE_MAX_ROWS: int = 100000
+
+    # Prompt construction
+    PROMPT_TOKEN_BUDGET: int = 3000
+    PROMPT_MIN_JD_TOKENS: int = 300
+
+    # Background jobs
+    JOB_RUNNER_IN_PROCESS: bool = True  # False when only `python -m app.worker` runs jobs
+    JOB_CONCURRENCY: dict[str, int] = {
+        "parse_resume": 4, "apply_changes": 4, "tailor": 8, "convert": 2,
+    }
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_STALE_SECONDS: int = 600
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_LONG_POLL_MAX_SECONDS: float = 30.0
+
+    # Executor pools for blocking DOCX and hashing work
+    EXECUTOR_THREAD_WORKERS: int = 4
+    EXECUTOR_THREAD_QUEUE: int = 64
+    EXECUTOR_PROCESS_WORKERS: int = 2
+    EXECUTOR_PROCESS_QUEUE: int = 16
+    EXECUTOR_USE_PROCESSES: bool = True
+    EXECUTOR_RETRY_AFTER_SECONDS: int = 2
+
+    # In-memory DOCX pipeline
+    UPLOAD_SPOOL_MAX_BYTES: int = 2 * 1024 * 1024
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_FORM_OVERHEAD_BYTES: int = 1024 * 1024  # other form fields sent with a file
+    UPLOAD_MAX_UNCOMPRESSED_BYTES: int = 100 * 1024 * 1024
+    UPLOAD_MAX_COMPRESSION_RATIO: int = 100
+    UPLOAD_RATIO_CHECK_MIN_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_ZIP_ENTRIES: int = 1000
+    STREAM_CHUNK_BYTES: int = 64 * 1024
+    TRACE_PEAK_MEMORY: bool = False
+
+    # Parse-result cache (content-addressed by upload hash)
+    PARSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PARSE_CACHE_DIR: str | None = None
+    PARSE_CACHE_DISK_MAX_FILES: int = 10000
+
+    # Start-up: schema check and readiness-gated warm-up
+    DB_AUTO_CREATE: bool = True  # create tables on an empty database (dev)
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 4
+    WARMUP_PRESPAWN_PROCESSES: bool = True
+
+    # Blob store (content-addressed uploads and generated files)
+    BLOB_BACKEND: str = "local"  # local or s3
+    BLOB_DIR: str = "data/blobs"
+    BLOB_S3_BUCKET: str | None = None
+    BLOB_S3_ENDPOINT_URL: str | None = None  # MinIO/LocalStack etc.
+    BLOB_S3_PREFIX: str = "blobs/"
+
+    # PDF conversion (pool of headless LibreOffice processes)
+    PDF_SOFFICE_BINARY: str | None = None  # default: soffice or libreoffice on PATH
+    PDF_WORKERS: int = 2
+    PDF_QUEUE: int = 16
+    PDF_TIMEOUT_SECONDS: float = 30.0
+    PDF_START_TIMEOUT_SECONDS: float = 30.0
+    PDF_MAX_JOBS_PER_WORKER: int = 200
+    PDF_MAX_WORKER_RSS_MB: int = 1024
+    PDF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PDF_WARM_ON_START: bool = True
+
+    # Resume templates (parsed once, reloaded when the file changes)
+    TEMPLATE_DIR: str | None = None  # every .docx here is loaded during warm-up
+
+    # Metrics (GET /metrics, Prometheus text format, per process)
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+
+    # Per-request profiling (opt-in; folded stacks for flamegraph tools)
+    PROFILE_ADMIN_TOKEN: str | None = None  # X-Profile-Token value: profiles that request, unlocks /ops
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of other requests profiled
+    PROFILE_MODE: str = "sample"  # sample (stack sampling) or trace (every call, several times slower)
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILE_DIR: str = "data/profiles"
+    PROFILE_KEEP: int = 200
+    PROFILE_MAX_AGE_HOURS: float = 72.0
+
+    # Delta-encoded resume versions
+    VERSION_SNAPSHOT_INTERVAL: int = 16  # full copy after this many deltas
+    VERSION_CACHE_SIZE: int = 256  # reconstructed versions kept in memory
 
     class Config:
         env_file = ".env"
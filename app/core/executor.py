@@ -0,0 +1,205 @@
+# bounded thread/process pools for blocking work, with per-task-type stats
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import CallbackGauge, Counter, Histogram, collect_spans, record_spans
+from app.core.profiling import current_profile, profile_call
+
+# Which pool each task type runs on. Parsing and rewriting DOCX is pure Python
+# and holds the GIL, so it goes to processes; bcrypt releases the GIL and
+# gets its own threads so a login burst can't starve the DOCX work.
+TASK_POOLS = {
+    "docx_parse": "process",
+    "docx_replace": "process",
+    "docx_stream": "thread",  # a live Document can't cross a process boundary
+    "blob_io": "thread",
+    "warmup": "process",  # no-op tasks that start the worker processes early
+    "password_hash": "hash",
+    "password_verify": "hash",
+}
+
+
+@dataclass
+class TaskStats:
+    in_flight: int = 0
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    exec_seconds_total: float = 0.0
+    exec_seconds_max: float = 0.0
+
+    def as_dict(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_seconds_avg": self.wait_seconds_total / done if done else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+            "exec_seconds_avg": self.exec_seconds_total / done if done else 0.0,
+            "exec_seconds_max": self.exec_seconds_max,
+        }
+
+
+@dataclass
+class _Pool:
+    name: str
+    workers: int
+    max_pending: int
+    executor: Executor | None = None
+    in_flight: int = 0
+    stats: Dict[str, TaskStats] = field(default_factory=dict)
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.name == "process" and settings.EXECUTOR_USE_PROCESSES:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-pool"
+                )
+        return self.executor
+
+
+_pools: Dict[str, _Pool] = {
+    "thread": _Pool("thread", settings.EXECUTOR_THREAD_WORKERS, settings.EXECUTOR_THREAD_QUEUE),
+    "process": _Pool("process", settings.EXECUTOR_PROCESS_WORKERS, settings.EXECUTOR_PROCESS_QUEUE),
+    "hash": _Pool("hash", settings.HASH_WORKERS, settings.HASH_QUEUE),
+}
+
+
+TASK_WAIT = Histogram("executor_wait_seconds", "Time a task queued before a pool worker started it.", ["task"])
+TASK_EXEC = Histogram("executor_exec_seconds", "Time a pool worker spent running a task.", ["task"])
+TASK_REJECTED = Counter("executor_rejected_total", "Tasks refused with 503 because the pool was full.", ["task"])
+
+
+def _timed_call(fn: Callable, *args) -> tuple:
+    # Runs inside the worker; wall-clock stamps are comparable across processes.
+    # Spans recorded by `fn` travel back with the result.
+    started = time.time()
+    with collect_spans() as spans:
+        result = fn(*args)
+    return started, time.time(), result, spans
+
+
+def _profiled_call(mode: str, interval: float, fn: Callable, *args) -> tuple:
+    # _timed_call for a request being profiled: also returns fn's folded stacks
+    started = time.time()
+    with collect_spans() as spans:
+        result, folded = profile_call(mode, interval, fn, *args)
+    return started, time.time(), result, spans, folded
+
+
+def _release(pool: _Pool, stats: TaskStats) -> None:
+    stats.in_flight -= 1
+    pool.in_flight -= 1
+
+
+def _release_threadsafe(loop: asyncio.AbstractEventLoop, pool: _Pool, stats: TaskStats) -> None:
+    # Done-callbacks run on the worker thread (or the process pool's manager thread)
+    try:
+        loop.call_soon_threadsafe(_release, pool, stats)
+    except RuntimeError:
+        pass  # loop already closed; nothing left to admit
+
+
+async def run_task(task_type: str, fn: Callable, *args) -> Any:
+    """
+    Run `fn(*args)` on the pool configured for `task_type` and await the result.
+    Raises 503 with Retry-After when the pool already has `max_pending` tasks
+    queued or running. Functions sent to the process pool must be picklable
+    (module-level) and so must their arguments and return value.
+    """
+    pool = _pools[TASK_POOLS.get(task_type, "thread")]
+    stats = pool.stats.setdefault(task_type, TaskStats())
+
+    if pool.in_flight >= pool.max_pending:
+        stats.rejected += 1
+        TASK_REJECTED.labels(task_type).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(settings.EXECUTOR_RETRY_AFTER_SECONDS)},
+        )
+
+    pool.in_flight += 1
+    stats.submitted += 1
+    stats.in_flight += 1
+    submitted = time.time()
+    loop = asyncio.get_running_loop()
+    profile = current_profile()
+    try:
+        if profile is None:
+            work = pool.get_executor().submit(_timed_call, fn, *args)
+        else:
+            work = pool.get_executor().submit(
+                _profiled_call, profile.mode, profile.interval, fn, *args
+            )
+    except BaseException:
+        _release(pool, stats)
+        raise
+    # The slot is freed when the worker is done, not when the caller stops
+    # waiting: a cancelled request leaves its task running in the pool
+    work.add_done_callback(lambda _: _release_threadsafe(loop, pool, stats))
+    try:
+        started, finished, result, spans, *folded = await asyncio.wrap_future(work, loop=loop)
+    except BaseException:
+        stats.failed += 1
+        raise
+    else:
+        wait, elapsed = max(started - submitted, 0.0), finished - started
+        stats.completed += 1
+        stats.wait_seconds_total += wait
+        stats.wait_seconds_max = max(stats.wait_seconds_max, wait)
+        stats.exec_seconds_total += elapsed
+        stats.exec_seconds_max = max(stats.exec_seconds_max, elapsed)
+        TASK_WAIT.labels(task_type).observe(wait)
+        TASK_EXEC.labels(task_type).observe(elapsed)
+        record_spans(spans)
+        if profile is not None:
+            profile.add_task(task_type, wait, elapsed, folded[0])
+        return result
+        return result
+
+
+def executor_stats() -> dict:
+    return {
+        name: {
+            "workers": pool.workers,
+            "max_pending": pool.max_pending,
+            "in_flight": pool.in_flight,
+            # Workers can't report "started" across a process boundary, so
+            # depth is whatever is in flight beyond the number of workers.
+            "queue_depth": max(pool.in_flight - pool.workers, 0),
+            "tasks": {t: s.as_dict() for t, s in pool.stats.items()},
+        }
+        for name, pool in _pools.items()
+    }
+
+
+CallbackGauge(
+    "executor_in_flight", "Tasks queued or running per pool.", ["pool"],
+    lambda: (((name,), pool.in_flight) for name, pool in _pools.items()),
+)
+
+
+def shutdown_executors() -> None:
+    for pool in _pools.values():
+        if pool.executor is not None:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+            pool.executor = None
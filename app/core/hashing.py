@@ -0,0 +1,137 @@
+# password hashing on a dedicated pool, with the bcrypt cost calibrated at startup
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.executor import executor_stats, run_task
+
+# Only used to measure the cost of a hash during calibration
+_CALIBRATION_PASSWORD = "calibration-password"
+
+# passlib 1.7 probes the backend with a >72-byte password, which bcrypt 5 rejects
+BCRYPT_MAX_MAJOR = 4
+
+
+def _make_context(rounds: int) -> CryptContext:
+    # New hashes use `rounds`, but any cost within the configured range is
+    # accepted: pods calibrate independently, and a login landing on a pod
+    # with another cost must not rehash. Only hashes below the floor are upgraded.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=min(settings.HASH_MIN_ROUNDS, rounds),
+        bcrypt__max_rounds=max(settings.HASH_MAX_ROUNDS, rounds),
+    )
+
+
+def check_bcrypt_backend() -> str:
+    """Fail at start-up, not on the first login, when the installed bcrypt can't back passlib."""
+    import bcrypt
+
+    version = getattr(bcrypt, "__version__", "0")
+    major = int(version.split(".")[0]) if version.split(".")[0].isdigit() else 0
+    if major > BCRYPT_MAX_MAJOR:
+        raise RuntimeError(
+            f"bcrypt {version} is not supported by passlib; install the version in requirements.txt (bcrypt==4.0.1)"
+        )
+    try:
+        context = _make_context(4)
+        if not context.verify(_CALIBRATION_PASSWORD, context.hash(_CALIBRATION_PASSWORD)):
+            raise ValueError("hash did not verify")
+    except Exception as exc:
+        raise RuntimeError(f"bcrypt {version} backend is not usable: {exc}") from exc
+    return version
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on the "hash" executor pool, so a login
+    burst queues there (and gets 503 once HASH_QUEUE is full) instead of
+    taking threads from DOCX work. The cost is HASH_ROUNDS when set,
+    otherwise the largest cost that stays under HASH_TARGET_MS on this host.
+    """
+
+    def __init__(self):
+        self.rounds = settings.HASH_ROUNDS or settings.HASH_MIN_ROUNDS
+        self.context = _make_context(self.rounds)
+        self.calibrated_ms: Optional[float] = None
+        self.hashes = 0
+        self.verifies = 0
+        self.rehashes = 0
+        self._recent: deque = deque()  # finish times of hashes/verifies in the last minute
+
+    def calibrate(self) -> int:
+        """Time one hash at HASH_MIN_ROUNDS and scale up; each extra round doubles the cost."""
+        check_bcrypt_backend()
+        if settings.HASH_ROUNDS:
+            return self.rounds
+        base = settings.HASH_MIN_ROUNDS
+        context = _make_context(base)
+        context.hash(_CALIBRATION_PASSWORD)  # load the backend outside the timing
+        samples = []
+        for _ in range(3):
+            start = time.perf_counter()
+            context.hash(_CALIBRATION_PASSWORD)
+            samples.append(time.perf_counter() - start)
+        base_ms = sorted(samples)[1] * 1000
+
+        extra = math.floor(math.log2(settings.HASH_TARGET_MS / base_ms)) if base_ms < settings.HASH_TARGET_MS else 0
+        self.rounds = min(base + extra, settings.HASH_MAX_ROUNDS)
+        self.calibrated_ms = round(base_ms * 2 ** (self.rounds - base), 1)
+        self.context = _make_context(self.rounds)
+        return self.rounds
+
+    async def calibrate_async(self) -> int:
+        return await asyncio.to_thread(self.calibrate)
+
+    def _record(self) -> None:
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+
+    async def hash(self, password: str) -> str:
+        hashed = await run_task("password_hash", self.context.hash, password)
+        self.hashes += 1
+        self._record()
+        return hashed
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns (valid, new_hash). `new_hash` is set when the password is
+        valid but `hashed` is weaker than HASH_MIN_ROUNDS (or another scheme); store it.
+        """
+        valid, new_hash = await run_task(
+            "password_verify", self.context.verify_and_update, password, hashed
+        )
+        self.verifies += 1
+        self._record()
+        if new_hash is not None:
+            self.rehashes += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        pool = executor_stats()["hash"]
+        now = time.monotonic()
+        recent = sum(1 for t in self._recent if t >= now - 60)
+        return {
+            "rounds": self.rounds,
+            "target_ms": settings.HASH_TARGET_MS,
+            "calibrated_ms": self.calibrated_ms,
+            "hashes": self.hashes,
+            "verifies": self.verifies,
+            "rehashes": self.rehashes,
+            "per_second_1m": round(recent / 60, 3),
+            "workers": pool["workers"],
+            "queue_depth": pool["queue_depth"],
+            "tasks": pool["tasks"],  # queue wait and execution time per operation
+        }
+
+
+password_hasher = PasswordHasher()
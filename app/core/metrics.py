@@ -0,0 +1,348 @@
+# in-process metrics in the Prometheus text format, cheap enough to leave on
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds in seconds
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 90.0, 120.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values):
+        """The child for these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class CallbackGauge(_Metric):
+    """A gauge read at scrape time: `fn` returns `(label values, value)` pairs."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str], fn: Callable[[], Iterable[tuple]]):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def _samples(self):
+        for values, value in self.fn():
+            yield f"{self.name}{_format_labels(self.labelnames, tuple(values))} {_format_value(value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple, lock: threading.Lock):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # per bucket, the last one is +Inf
+        self.sum = 0.0
+        self._lock = lock
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: tuple = FAST_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets, self._lock)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            with self._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def render() -> str:
+    """Every registered metric, in the Prometheus text exposition format."""
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# ======================================
+# SPANS (timed sections of the hot path)
+# ======================================
+
+SPANS = Histogram(
+    "span_duration_seconds",
+    "Time spent in named sections: docx_load, docx_save, extract_sentences, classify_sections, replace, pdf_convert.",
+    ["span"],
+)
+
+_local = threading.local()
+
+
+def observe_span(name: str, seconds: float) -> None:
+    collected = getattr(_local, "spans", None)
+    if collected is not None:
+        collected.append((name, seconds))
+    else:
+        SPANS.labels(name).observe(seconds)
+
+
+class span:
+    """
+    `with span("docx_load"): ...` times the block into span_duration_seconds.
+    Inside an executor task the timings are collected and sent back with the
+    result (see `collect_spans`), so spans from pool processes are not lost.
+    """
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class collect_spans:
+    """Collect the spans recorded by this thread instead of observing them."""
+    __slots__ = ("spans", "previous")
+
+    def __enter__(self) -> List[tuple]:
+        self.previous = getattr(_local, "spans", None)
+        self.spans = _local.spans = []
+        return self.spans
+
+    def __exit__(self, *exc):
+        _local.spans = self.previous
+        return False
+
+
+def record_spans(spans: Iterable[tuple]) -> None:
+    for name, seconds in spans:
+        observe_span(name, seconds)
+
+
+# ======================================
+# HTTP
+# ======================================
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests by route template and status code.", ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from the request arriving to the last byte of the response.",
+    ["method", "route"], buckets=HTTP_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled.", ["method", "route"])
+
+# Routes seen after routing, by (template, methods), and the paths they resolved
+_known_routes: Dict[tuple, object] = {}
+_path_cache: Dict[tuple, str] = {}
+_PATH_CACHE_MAX = 4096
+
+
+def _routed(scope) -> str:
+    """The template of the route that handled the request (/jobs/{job_id}, not one series per id)."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    key = (path, frozenset(getattr(route, "methods", None) or ()))
+    if key not in _known_routes:
+        _known_routes[key] = route
+    return path
+
+
+def _route_before(scope) -> str:
+    """
+    The route template before routing has run, for the in-flight gauge:
+    matched against routes already seen, so only the first request to a
+    route in this process counts as "unknown".
+    """
+    key = (scope["method"], scope["path"])
+    path = _path_cache.get(key)
+    if path is None:
+        for route in list(_known_routes.values()):
+            if route.matches(scope)[0] == Match.FULL:
+                path = route.path
+                break
+        else:
+            return "unknown"
+        if len(_path_cache) >= _PATH_CACHE_MAX:
+            _path_cache.clear()
+        _path_cache[key] = path
+    return path
+
+
+class MetricsMiddleware:
+    """Per-route request counts, latency histograms and in-flight gauges."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = HTTP_IN_FLIGHT.labels(method, _route_before(scope))
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            route = _routed(scope)
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+
+
+# ======================================
+# EVENT LOOP LAG
+# ======================================
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task; blocking calls show up here.",
+)
+LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Event loop lag at the most recent check.")
+
+_lag_task: Optional[asyncio.Task] = None
+
+
+async def _watch_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started - interval, 0.0)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_LAST.set(lag)
+
+
+def start_loop_lag_monitor(interval: float) -> None:
+    global _lag_task
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.create_task(_watch_loop_lag(interval))
+
+
+async def stop_loop_lag_monitor() -> None:
+    global _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        await asyncio.gather(_lag_task, return_exceptions=True)
+        _lag_task = None
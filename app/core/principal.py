@@ -0,0 +1,94 @@
+# short-lived cache of resolved users for get_current_user
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by route handlers."""
+    id: UUID
+    email: str
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU map of user id -> Principal.
+    Invalidation is per process; with several workers a change becomes
+    visible everywhere within `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, tuple]" = OrderedDict()  # id -> (expires, principal)
+        self.hits = 0
+        self.misses = 0
+        self.claim_hits = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.lookups = 0
+        self.lookup_seconds_total = 0.0
+        self.lookup_seconds_max = 0.0
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires, principal = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return principal
+            del self._entries[user_id]
+        self.misses += 1
+        return None
+
+    def put(self, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: UUID) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def record_lookup(self, seconds: float) -> None:
+        self.lookups += 1
+        self.lookup_seconds_total += seconds
+        self.lookup_seconds_max = max(self.lookup_seconds_max, seconds)
+
+    def stats(self) -> dict:
+        resolved = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / resolved, 4) if resolved else 0.0,
+            "claim_hits": self.claim_hits,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "db_lookups": self.lookups,
+            "avg_lookup_ms": round(self.lookup_seconds_total / self.lookups * 1000, 3) if self.lookups else 0.0,
+            "max_lookup_ms": round(self.lookup_seconds_max * 1000, 3),
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """Drop a cached user; call once a password change or account deletion is committed."""
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,337 @@
+# opt-in per-request profiles of executor work, stored as folded stacks for flamegraphs
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+TOKEN_HEADER = b"x-profile-token"
+MODE_HEADER = b"x-profile-mode"
+MODES = ("sample", "trace")
+# Never sampled: probes and the profile downloads themselves
+SKIP_PREFIXES = ("/health", "/ready", "/metrics", "/ops")
+_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class RequestProfile:
+    id: str
+    mode: str
+    interval: float  # seconds between samples in "sample" mode
+    trigger: str  # header or sample
+    folded: Counter = field(default_factory=Counter)  # "frame;frame;..." -> microseconds
+    tasks: List[dict] = field(default_factory=list)
+
+    def add_task(self, task_type: str, wait: float, elapsed: float, folded: Counter) -> None:
+        self.tasks.append({"task": task_type, "wait_ms": round(wait * 1000, 3), "exec_ms": round(elapsed * 1000, 3)})
+        root = f"run_task:{task_type}"
+        self.folded[f"{root};[queue wait]"] += int(wait * 1e6)
+        for stack, micros in folded.items():
+            self.folded[f"{root};{stack}" if stack else root] += micros
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """The profile of the request being handled, if it is being profiled."""
+    return _current.get()
+
+
+# ======================================
+# PROFILERS (run where the task runs: a pool thread or process)
+# ======================================
+
+_names: dict = {}
+
+
+def _frame_name(code, module: str) -> str:
+    name = _names.get(code)
+    if name is None:
+        name = _names[code] = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+    return name
+
+
+def _c_name(fn) -> str:
+    module = getattr(fn, "__module__", None)
+    owner = getattr(fn, "__self__", None)
+    if module is None and owner is not None:
+        module = type(owner).__module__
+    return f"{module or 'builtins'}:{getattr(fn, '__qualname__', repr(fn))}"
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack; each sample weighs the time since the previous one."""
+
+    def __init__(self, target: int, root, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.target = target
+        self.root = root  # the caller's frame: sampling stops walking there
+        self.interval = interval
+        self.folded: Counter = Counter()
+        self.done = threading.Event()
+
+    def _stack(self, frame) -> str:
+        names = []
+        while frame is not None and frame is not self.root:
+            names.append(_frame_name(frame.f_code, frame.f_globals.get("__name__", "?")))
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            now = time.perf_counter()
+            if frame is not None:
+                self.folded[self._stack(frame)] += int((now - last) * 1e6)
+            last = now
+
+
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_saved = 0.0
+
+
+def _shorten_switch_interval(interval: float, on: bool) -> None:
+    # The sampler needs the GIL to take a sample; by default a busy thread
+    # hands it over only every 5 ms
+    global _switch_users, _switch_saved
+    with _switch_lock:
+        if on:
+            if _switch_users == 0:
+                _switch_saved = sys.getswitchinterval()
+                sys.setswitchinterval(min(_switch_saved, interval / 2))
+            _switch_users += 1
+        else:
+            _switch_users -= 1
+            if _switch_users == 0:
+                sys.setswitchinterval(_switch_saved)
+
+
+def _sampled(interval: float, fn: Callable, *args) -> Tuple[object, Counter]:
+    sampler = _Sampler(threading.get_ident(), sys._getframe(), interval)
+    _shorten_switch_interval(interval, True)
+    sampler.start()
+    try:
+        return fn(*args), sampler.folded
+    finally:
+        sampler.done.set()
+        sampler.join()
+        _shorten_switch_interval(interval, False)
+
+
+def _traced(fn: Callable, *args) -> Tuple[object, Counter]:
+    # sys.setprofile sees every Python call and builtin C call on this thread
+    # only; self time is charged to the full stack. Cython functions (lxml)
+    # raise no call events, so their time is the self time of the python-docx
+    # frame that called them (BaseOxmlElement.xpath, parse_xml, ...)
+    folded: Counter = Counter()
+    stack: List[str] = [""]
+    last = time.perf_counter_ns()
+
+    def tracer(frame, event, arg):
+        nonlocal last
+        now = time.perf_counter_ns()
+        folded[stack[-1]] += now - last
+        if event == "call":
+            name = _frame_name(frame.f_code, frame.f_globals.get("__name__", "?"))
+            stack.append(f"{stack[-1]};{name}" if len(stack) > 1 else name)
+        elif event == "c_call":
+            name = _c_name(arg)
+            stack.append(f"{stack[-1]};{name}" if len(stack) > 1 else name)
+        elif len(stack) > 1:  # return, c_return, c_exception
+            stack.pop()
+        last = time.perf_counter_ns()
+
+    sys.setprofile(tracer)
+    try:
+        result = fn(*args)
+    finally:
+        sys.setprofile(None)
+    folded.pop("", None)
+    return result, Counter({stack: ns // 1000 for stack, ns in folded.items() if ns >= 1000})
+
+
+def profile_call(mode: str, interval: float, fn: Callable, *args) -> Tuple[object, Counter]:
+    """`fn(*args)` and its folded stacks, in microseconds."""
+    if mode == "trace":
+        return _traced(fn, *args)
+    return _sampled(interval, fn, *args)
+
+
+# ======================================
+# STORAGE
+# ======================================
+
+def _paths(profile_id: str) -> Tuple[str, str]:
+    base = os.path.join(settings.PROFILE_DIR, profile_id)
+    return base + ".folded", base + ".json"
+
+
+def _prune() -> None:
+    """Keep the newest PROFILE_KEEP profiles and none older than PROFILE_MAX_AGE_HOURS."""
+    entries = []
+    for name in os.listdir(settings.PROFILE_DIR):
+        if name.endswith(".json"):
+            path = os.path.join(settings.PROFILE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), name[:-5]))
+            except OSError:
+                continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - settings.PROFILE_MAX_AGE_HOURS * 3600
+    for i, (mtime, profile_id) in enumerate(entries):
+        if i >= settings.PROFILE_KEEP or mtime < cutoff:
+            for path in _paths(profile_id):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def write_profile(meta: dict, folded: Counter) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    folded_path, meta_path = _paths(meta["id"])
+    with open(folded_path, "w") as f:
+        f.writelines(f"{stack} {micros}\n" for stack, micros in sorted(folded.items()) if micros > 0)
+    # Metadata last: listing only shows profiles whose stacks are complete
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    _prune()
+
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(settings.PROFILE_DIR):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile's folded stacks, or None (also for malformed ids)."""
+    if not _ID.match(profile_id):
+        return None
+    path = _paths(profile_id)[0]
+    return path if os.path.exists(path) else None
+
+
+def require_profile_admin(x_profile_token: str | None = Header(None)) -> None:
+    """Dependency for the /ops endpoints: 404 unless PROFILE_ADMIN_TOKEN is set, 403 on a wrong token."""
+    if not settings.PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Ops endpoints are not enabled")
+    if not x_profile_token or not hmac.compare_digest(x_profile_token, settings.PROFILE_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+# ======================================
+# MIDDLEWARE
+# ======================================
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when it carries X-Profile-Token (PROFILE_ADMIN_TOKEN)
+    or is picked at PROFILE_SAMPLE_RATE. Work sent through `run_task` is
+    profiled where it runs, by stack sampling or, with X-Profile-Mode: trace,
+    by tracing every call (finer, but the task runs several times slower).
+    The event loop is shared with other requests, so time spent there is
+    reported as one frame. The response gets an X-Profile-Id header; the
+    folded stacks are downloadable from /ops/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.token = settings.PROFILE_ADMIN_TOKEN.encode() if settings.PROFILE_ADMIN_TOKEN else None
+        self.rate = settings.PROFILE_SAMPLE_RATE
+
+    def _select(self, scope) -> Optional[RequestProfile]:
+        trigger, mode = None, settings.PROFILE_MODE
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == TOKEN_HEADER and hmac.compare_digest(value, self.token):
+                    trigger = "header"
+                elif name == MODE_HEADER and value.decode("latin-1") in MODES:
+                    mode = value.decode("latin-1")
+        if trigger is None:
+            if not self.rate or random.random() >= self.rate or scope["path"].startswith(SKIP_PREFIXES):
+                return None
+            trigger, mode = "sample", settings.PROFILE_MODE
+        return RequestProfile(
+            id=uuid.uuid4().hex, mode=mode, interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000, trigger=trigger,
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = self._select(scope)
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]}
+            await send(message)
+
+        created = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            await self._store(scope, profile, created, elapsed, status_code)
+
+    async def _store(self, scope, profile: RequestProfile, created: str, elapsed: float, status_code: int) -> None:
+        from app.core.executor import run_task
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        root = f"{scope['method']} {route}"
+        in_tasks = sum(t["wait_ms"] + t["exec_ms"] for t in profile.tasks) / 1000
+        folded = Counter({f"{root};{stack}": micros for stack, micros in profile.folded.items()})
+        folded[f"{root};[event loop, I/O and awaits]"] = int(max(elapsed - in_tasks, 0.0) * 1e6)
+        meta = {
+            "id": profile.id,
+            "created": created,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "mode": profile.mode,
+            "trigger": profile.trigger,
+            "tasks": profile.tasks,
+        }
+        try:
+            await run_task("blob_io", write_profile, meta, folded)
+        except Exception as exc:
+            logger.warning("Could not store profile %s: %s", profile.id, exc)
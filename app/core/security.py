@@ -1,52 +1,82 @@
 # hashing & JWT helpers, current_user dep
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.principal import Principal, principal_cache
 from app.db.database import get_db
 from app.repositories.user_repo import get_user_by_id
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def create_access_token(subject: str | int, expires_minutes: int | None = None) -> str:
+def create_access_token(subject: str | int, expires_minutes: int | None = None,
+                        email: str | None = None) -> str:
     expire = datetime.now(tz=timezone.utc) + timedelta(
         minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode = {"sub": str(subject), "exp": expire}
+    if email is not None:
+        # Lets read-only routes build the principal without a lookup
+        to_encode["email"] = email
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)]
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         sub: Optional[str] = payload.get("sub")
         if sub is None:
             raise credentials_exception
-        user_id = int(sub)
+        payload["sub"] = UUID(sub)
     except (JWTError, ValueError):
         raise credentials_exception
+    return payload
 
+async def _resolve_principal(db: AsyncSession, user_id: UUID) -> Principal:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    start = time.perf_counter()
     user = await get_user_by_id(db, user_id)
+    principal_cache.record_lookup(time.perf_counter() - start)
     if not user:
         raise credentials_exception
-    return user
\ No newline at end of file
+    principal = Principal(id=user.id, email=user.email)
+    principal_cache.put(principal)
+    return principal
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> Principal:
+    payload = _decode_token(token)
+    return await _resolve_principal(db, payload["sub"])
+
+async def get_token_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> Principal:
+    """
+    For read-only routes: trust the signed claims and skip the user lookup.
+    A deleted account or changed password is not noticed until the token
+    expires, so don't use this where that matters. Tokens without an
+    `email` claim fall back to `get_current_user`.
+    """
+    payload = _decode_token(token)
+    email = payload.get("email")
+    if email is None:
+        return await _resolve_principal(db, payload["sub"])
+    principal_cache.claim_hits += 1
+    return Principal(id=payload["sub"], email=email)  # sub is already a UUID
@@ -0,0 +1,199 @@
+# schema check and readiness-gated warm-up, run once per process after start-up
+import asyncio
+import importlib
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.core.executor import executor_stats, run_task
+from app.core.hashing import password_hasher
+from app.db import models
+from app.db.database import engine
+from app.services.resume.pdf import pdf_converter
+from app.services.resume.resume import heading_indexes
+from app.services.resume.skills import skill_dictionary
+from app.services.resume.tasks import warm_worker
+from app.services.resume.templates import template_registry
+
+# uvicorn configures this logger, so start-up timings show up in the server log
+logger = logging.getLogger("uvicorn.error")
+
+# Imported in a thread during warm-up instead of on the first request
+HEAVY_MODULES = ("httpx", "openai", "docx")
+
+
+class Readiness:
+    def __init__(self):
+        self.state = "starting"  # starting, warming, ready, failed
+        self.error: Optional[str] = None
+        self.import_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.steps: Dict[str, dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "import_seconds": self.import_seconds,
+            "ready_seconds": self.ready_seconds,
+            "steps": self.steps,
+        }
+
+
+readiness = Readiness()
+
+# (name, step, required, warm-up only); see warmup_step
+_steps: List[Tuple[str, Callable[[], Awaitable], bool, bool]] = []
+
+
+def warmup_step(name: str, required: bool = False, optional: bool = True):
+    """
+    Register an async start-up step. A failing `required` step leaves the
+    process not ready; others are logged and skipped. `optional` steps only
+    run when WARMUP_ENABLED is set.
+    """
+    def register(fn):
+        _steps.append((name, fn, required, optional))
+        return fn
+    return register
+
+
+MIGRATIONS_DIR = Path(models.__file__).with_name("migrations")
+
+
+def pending_migrations(version: int) -> List[str]:
+    """Upgrade scripts taking the database from `version` to SCHEMA_VERSION, in order."""
+    names = sorted(p.name for p in MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.sql"))
+    return [f"app/db/migrations/{name}" for name in names if version < int(name[:3]) <= models.SCHEMA_VERSION]
+
+
+@warmup_step("schema", required=True, optional=False)
+async def check_schema() -> None:
+    """
+    Compare schema_version with SCHEMA_VERSION. Tables are only created on a
+    database with no tables at all: create_all never adds columns, so an
+    existing schema must be upgraded with the scripts in app/db/migrations.
+    """
+    async with engine.begin() as conn:
+        exists = (await conn.execute(text("SELECT to_regclass('schema_version') IS NOT NULL"))).scalar()
+        version = None
+        if exists:
+            version = (await conn.execute(select(models.SchemaVersion.version)
+                                          .order_by(models.SchemaVersion.version.desc()).limit(1))).scalar()
+        if version == models.SCHEMA_VERSION:
+            return
+        if version is None:
+            tables = (await conn.execute(text(
+                "SELECT count(*) FROM information_schema.tables "
+                "WHERE table_schema = current_schema() AND table_type = 'BASE TABLE'"
+            ))).scalar()
+            if tables == 0 and settings.DB_AUTO_CREATE:
+                await conn.run_sync(models.Base.metadata.create_all)
+                await conn.execute(models.SchemaVersion.__table__.insert().values(version=models.SCHEMA_VERSION))
+                logger.info("Created database schema version %s", models.SCHEMA_VERSION)
+                return
+            if tables:
+                # Tables but no schema_version: the original, unversioned schema
+                version = 1
+    if version is None:
+        raise RuntimeError(
+            f"Database is empty and DB_AUTO_CREATE is off; load app/db/schema.sql (version {models.SCHEMA_VERSION})"
+        )
+    if version > models.SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, newer than this build ({models.SCHEMA_VERSION})"
+        )
+    raise RuntimeError(
+        f"Database schema is at version {version}, this build needs {models.SCHEMA_VERSION}; "
+        f"apply in order: {', '.join(pending_migrations(version))}"
+    )
+
+
+@warmup_step("db_pool")
+async def open_db_connections() -> None:
+    """Open WARMUP_DB_CONNECTIONS pooled connections at once so the first requests don't pay for the handshakes."""
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(0.05)  # hold it so the next touch opens another
+    await asyncio.gather(*(touch() for _ in range(settings.WARMUP_DB_CONNECTIONS)))
+
+
+@warmup_step("imports")
+async def import_heavy_modules() -> None:
+    await asyncio.to_thread(lambda: [importlib.import_module(m) for m in HEAVY_MODULES])
+
+
+@warmup_step("heading_index")
+async def build_heading_indexes() -> None:
+    heading_indexes()
+
+
+@warmup_step("templates")
+async def preload_templates() -> None:
+    if settings.TEMPLATE_DIR:
+        await asyncio.to_thread(template_registry.preload, settings.TEMPLATE_DIR)
+
+
+@warmup_step("process_pool")
+async def start_worker_processes() -> None:
+    if not (settings.WARMUP_PRESPAWN_PROCESSES and settings.EXECUTOR_USE_PROCESSES):
+        return
+    workers = executor_stats()["process"]["workers"]
+    await asyncio.gather(*(run_task("warmup", warm_worker) for _ in range(workers)))
+
+
+@warmup_step("pdf_pool")
+async def start_pdf_workers() -> None:
+    # Only processes that run jobs convert PDFs
+    if settings.PDF_WARM_ON_START and settings.JOB_RUNNER_IN_PROCESS:
+        await pdf_converter.warm()
+
+
+@warmup_step("password_hash", required=True, optional=False)
+async def calibrate_password_hash() -> None:
+    await password_hasher.calibrate_async()
+
+
+@warmup_step("skills", optional=False)
+async def load_skill_dictionary() -> None:
+    await skill_dictionary.refresh()
+
+
+async def run_warmup(process_started: float) -> bool:
+    """Run the registered steps in order and record their timings; True when ready."""
+    readiness.state, readiness.error = "warming", None
+    for name, step, required, optional in _steps:
+        if optional and not settings.WARMUP_ENABLED:
+            continue
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as exc:
+            elapsed = round(time.perf_counter() - started, 3)
+            readiness.steps[name] = {"seconds": elapsed, "error": str(exc)}
+            if required:
+                readiness.state, readiness.error = "failed", f"{name}: {exc}"
+                logger.error("Start-up step %s failed: %s", name, exc)
+                return False
+            logger.warning("Warm-up step %s skipped: %s", name, exc)
+            continue
+        readiness.steps[name] = {"seconds": round(time.perf_counter() - started, 3)}
+
+    readiness.ready_seconds = round(time.perf_counter() - process_started, 3)
+    readiness.state = "ready"
+    logger.info(
+        "Ready in %.2fs (imports %.2fs; %s)",
+        readiness.ready_seconds,
+        readiness.import_seconds or 0.0,
+        ", ".join(f"{name} {info['seconds']:.2f}s" for name, info in readiness.steps.items()),
+    )
+    return True
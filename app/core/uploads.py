@@ -0,0 +1,176 @@
+# helpers for moving uploads and generated files through memory
+import hashlib
+import io
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.formparsers import MultiPartParser
+
+from app.core.config import settings
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Multipart uploads are held in a SpooledTemporaryFile; anything above this
+# threshold spills to an anonymous temp file that vanishes when closed.
+MultiPartParser.spool_max_size = settings.UPLOAD_SPOOL_MAX_BYTES
+
+
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Rejections by reason, for /ops/uploads
+upload_stats: Counter = Counter()
+
+
+@dataclass
+class Upload:
+    data: bytes
+    sha256: str  # hex, same as content_hash(data)
+    filename: str | None = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def _reject(reason: str, status_code: int, detail: str) -> HTTPException:
+    upload_stats[reason] += 1
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+def _too_large(limit: int) -> HTTPException:
+    return _reject("too_large", 413, f"Upload is larger than {limit // (1024 * 1024)} MB")
+
+
+async def read_upload(file: UploadFile, max_bytes: int | None = None, magic: bytes | None = None) -> Upload:
+    """
+    Read an upload in STREAM_CHUNK_BYTES chunks, hashing as it goes, and
+    close it (removing any spill file now). Stops with 413 as soon as
+    `max_bytes` is passed, and with 422 after the first chunk when the
+    content does not start with `magic`.
+    """
+    limit = max_bytes or settings.UPLOAD_MAX_BYTES
+    try:
+        if file.size is not None and file.size > limit:
+            raise _too_large(limit)
+        digest = hashlib.sha256()
+        chunks, size = [], 0
+        while True:
+            chunk = await file.read(settings.STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            if magic is not None and size == 0 and not chunk.startswith(magic):
+                raise _reject("wrong_type", 422, "The uploaded file is not a .docx document")
+            size += len(chunk)
+            if size > limit:
+                raise _too_large(limit)
+            digest.update(chunk)
+            chunks.append(chunk)
+    finally:
+        await file.close()
+    return Upload(b"".join(chunks), digest.hexdigest(), file.filename)
+
+
+def validate_docx(data: bytes) -> None:
+    """
+    Checks on the ZIP central directory only, before any XML is parsed:
+    a readable archive with [Content_Types].xml and word/document.xml, no
+    encrypted entries, and nothing that inflates past the configured size
+    or ratio. The sizes come from the directory, and zipfile (which
+    python-docx reads through) never inflates an entry past its declared
+    size, so a lying header cannot get around these limits.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            infos = zf.infolist()
+    except (zipfile.BadZipFile, ValueError, EOFError):
+        raise _reject("wrong_type", 422, "The uploaded file is not a valid .docx archive")
+
+    if len(infos) > settings.UPLOAD_MAX_ZIP_ENTRIES:
+        raise _reject("zip_bomb", 413, "The .docx archive has too many entries")
+    names = {info.filename for info in infos}
+    if "word/document.xml" not in names or "[Content_Types].xml" not in names:
+        raise _reject("wrong_type", 422, "The uploaded archive is not a Word document")
+
+    total = 0
+    for info in infos:
+        if info.flag_bits & 0x1:
+            raise _reject("encrypted", 422, "Encrypted .docx files are not supported")
+        total += info.file_size
+        # Small parts legitimately compress well; only large ones are checked for ratio
+        if (info.file_size > settings.UPLOAD_RATIO_CHECK_MIN_BYTES
+                and info.file_size > max(info.compress_size, 1) * settings.UPLOAD_MAX_COMPRESSION_RATIO):
+            raise _reject("zip_bomb", 413, f"{info.filename} expands too much to be processed")
+    if total > settings.UPLOAD_MAX_UNCOMPRESSED_BYTES:
+        raise _reject("zip_bomb", 413, "The .docx is too large once uncompressed")
+
+
+async def read_docx_upload(file: UploadFile) -> Upload:
+    """read_upload plus validate_docx; every route taking a resume file goes through this."""
+    upload = await read_upload(file, magic=ZIP_MAGIC)
+    validate_docx(upload.data)
+    upload_stats["accepted"] += 1
+    return upload
+
+
+class UploadLimitMiddleware:
+    """
+    Caps request bodies before Starlette spools a multipart upload: a
+    Content-Length over the limit is refused up front, and a chunked body
+    is cut off (413) once it has sent more than the limit.
+    """
+
+    def __init__(self, app, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_body_bytes:
+            upload_stats["too_large"] += 1
+            response = JSONResponse(
+                {"detail": f"Request body is larger than {self.max_body_bytes} bytes"},
+                status_code=413,
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside the form parser, so FastAPI turns it into a 413 response
+                    raise _too_large(self.max_body_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _iter_chunks(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+def docx_response(data: bytes, filename: str, headers: dict | None = None) -> StreamingResponse:
+    """Stream a generated DOCX back to the client straight from memory."""
+    headers = dict(headers or {})
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    headers["Content-Length"] = str(len(data))
+    return StreamingResponse(
+        _iter_chunks(data, settings.STREAM_CHUNK_BYTES),
+        media_type=DOCX_MEDIA_TYPE,
+        headers=headers,
+    )
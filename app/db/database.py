@@ -1,11 +1,44 @@
 # async engine, session, Base, get_db
 
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from contextlib import asynccontextmanager
 from app.core.config import settings
+from app.core.metrics import CallbackGauge, Histogram
 
-engine = create_async_engine(settings.DATABASE_URL, future=True, echo=False)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting for a free one and opening new ones.",
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The default async pool, timing every checkout."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+engine = create_async_engine(settings.DATABASE_URL, future=True, echo=False, poolclass=TimedQueuePool)
+
+
+def _pool_connections():
+    pool = engine.sync_engine.pool
+    return [
+        (("size",), pool.size()),
+        (("checked_out",), pool.checkedout()),
+        (("checked_in",), pool.checkedin()),
+        (("overflow",), max(pool.overflow(), 0)),  # SQLAlchemy counts up from -size
+    ]
+
+
+CallbackGauge("db_pool_connections", "Connection pool size and current use.", ["state"], _pool_connections)
 
 SessionFactory = async_sessionmaker(
     bind=engine,
@@ -0,0 +1,99 @@
+-- ==============================================
+-- VERSION 1 -> 2
+-- Content-addressed files, delta resume versions, the job queue, the LLM
+-- response cache and schema_version. Version 1 is the original schema,
+-- which had no schema_version table. Every statement is idempotent, so the
+-- script can also repair a database that was stamped without being migrated:
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f app/db/migrations/002_blobs_deltas_jobs_llm_cache.sql
+-- ==============================================
+BEGIN;
+
+-- FILES
+ALTER TABLE files ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE files ADD COLUMN IF NOT EXISTS size_bytes BIGINT;
+
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_files_user_content_hash') THEN
+        ALTER TABLE files ADD CONSTRAINT uq_files_user_content_hash UNIQUE (user_id, content_hash);
+    END IF;
+END $$;
+
+-- RESUME VERSIONS (existing rows are full snapshots at depth 0)
+ALTER TABLE resume_versions ALTER COLUMN file_id DROP NOT NULL;
+ALTER TABLE resume_versions ADD COLUMN IF NOT EXISTS parent_version_id UUID REFERENCES resume_versions(id);
+ALTER TABLE resume_versions ADD COLUMN IF NOT EXISTS depth INT NOT NULL DEFAULT 0;
+ALTER TABLE resume_versions ADD COLUMN IF NOT EXISTS sentence_count INT NOT NULL DEFAULT 0;
+
+ALTER TABLE resume_sentences ADD COLUMN IF NOT EXISTS op VARCHAR(10) NOT NULL DEFAULT 'put';
+ALTER TABLE resume_sentences ALTER COLUMN text DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_resume_sentences_version_id ON resume_sentences(version_id);
+
+UPDATE resume_versions v SET sentence_count = s.n
+FROM (SELECT version_id, count(*) AS n FROM resume_sentences GROUP BY version_id) s
+WHERE v.id = s.version_id AND v.sentence_count = 0;
+
+-- SOCIAL LINKS: one row per user, keep the newest
+DELETE FROM social_links a USING social_links b
+WHERE a.user_id = b.user_id AND a.ctid < b.ctid;
+
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'social_links_user_id_key') THEN
+        ALTER TABLE social_links ADD CONSTRAINT social_links_user_id_key UNIQUE (user_id);
+    END IF;
+END $$;
+
+-- SKILLS (existing rows get the migration time)
+ALTER TABLE skills ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT now();
+UPDATE skills SET created_at = now() WHERE created_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_skills_created_at ON skills(created_at);
+
+-- Sections are replaced per user on every save
+CREATE INDEX IF NOT EXISTS idx_education_user_id ON education(user_id);
+CREATE INDEX IF NOT EXISTS idx_experience_user_id ON experience(user_id);
+CREATE INDEX IF NOT EXISTS idx_projects_user_id ON projects(user_id);
+CREATE INDEX IF NOT EXISTS idx_certificates_user_id ON certificates(user_id);
+CREATE INDEX IF NOT EXISTS idx_achievements_user_id ON achievements(user_id);
+CREATE INDEX IF NOT EXISTS idx_extra_curricular_user_id ON extra_curricular(user_id);
+
+-- JOBS
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS payload JSONB DEFAULT '{}'::jsonb;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS input_data BYTEA;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS result JSONB;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS output_data BYTEA;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS error TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS attempts INT DEFAULT 0;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs(status, created_at);
+
+-- LLM RESPONSE CACHE
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    response JSONB NOT NULL,
+    prompt_tokens INT DEFAULT 0,
+    completion_tokens INT DEFAULT 0,
+    cost_usd DOUBLE PRECISION DEFAULT 0,
+    latency_seconds DOUBLE PRECISION DEFAULT 0,
+    hits INT DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    last_hit_at TIMESTAMPTZ DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_hit_at ON llm_cache(last_hit_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires_at ON llm_cache(expires_at);
+
+-- SCHEMA VERSION
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    applied_at TIMESTAMPTZ DEFAULT now()
+);
+
+INSERT INTO schema_version (version) VALUES (2) ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
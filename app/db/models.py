@@ -1,9 +1,10 @@
 from sqlalchemy import (
-    String, Integer, Date, DateTime, Text, ForeignKey, ARRAY
+    String, Integer, BigInteger, Float, Date, DateTime, Text, ForeignKey, ARRAY, LargeBinary, Index,
+    UniqueConstraint
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declarative_base
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 
 Base = declarative_base()
@@ -37,11 +38,15 @@ class File(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     file_type: Mapped[str] = mapped_column(String(50))  # resume, jd, other
-    file_path: Mapped[str] = mapped_column(Text, nullable=False)
+    file_path: Mapped[str] = mapped_column(Text, nullable=False)  # blob store key
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)  # sha256, also the blob key
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=True)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="files")
 
+    __table_args__ = (UniqueConstraint("user_id", "content_hash", name="uq_files_user_content_hash"),)
+
 
 # ======================================
 # RESUMES (logical grouping of versions)
@@ -65,7 +70,10 @@ class ResumeVersion(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     resume_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"))
-    file_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE"))
+    file_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE"), nullable=True)  # NULL: same file as the parent
+    parent_version_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("resume_versions.id"), nullable=True)
+    depth: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # deltas since the last full snapshot
+    sentence_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -78,12 +86,15 @@ class ResumeSentence(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     version_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("resume_versions.id", ondelete="CASCADE"))
-    section: Mapped[str] = mapped_column(String(100))  # skills, experience, etc.
-    sentence_order: Mapped[int] = mapped_column(Integer)
-    text: Mapped[str] = mapped_column(Text, nullable=False)
+    section: Mapped[str] = mapped_column(String(100), nullable=True)  # skills, experience, etc.
+    sentence_order: Mapped[int] = mapped_column(Integer)  # sparse; stable across versions
+    op: Mapped[str] = mapped_column(String(10), default="put", nullable=False)  # put or delete (delta versions)
+    text: Mapped[str] = mapped_column(Text, nullable=True)  # NULL for delete
 
     version = relationship("ResumeVersion", back_populates="sentences")
 
+    __table_args__ = (Index("idx_resume_sentences_version_id", "version_id"),)
+
 
 # ======================================
 # USER PROFILE (structured info)
@@ -108,7 +119,7 @@ class SocialLink(Base):
     __tablename__ = "social_links"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), unique=True)
     github: Mapped[str] = mapped_column(Text)
     linkedin: Mapped[str] = mapped_column(Text)
     portfolio: Mapped[str] = mapped_column(Text)
@@ -121,6 +132,7 @@ class Skill(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(100), unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
 
 class UserSkill(Base):
@@ -135,7 +147,7 @@ class Education(Base):
     __tablename__ = "education"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     institution: Mapped[str] = mapped_column(String(255))
     degree: Mapped[str] = mapped_column(String(100))
     field: Mapped[str] = mapped_column(String(100))
@@ -148,7 +160,7 @@ class Experience(Base):
     __tablename__ = "experience"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     company: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(100))
     start_date: Mapped[datetime] = mapped_column(Date)
@@ -160,7 +172,7 @@ class Project(Base):
     __tablename__ = "projects"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
     tech_stack: Mapped[list[str]] = mapped_column(ARRAY(Text))
@@ -171,7 +183,7 @@ class Certificate(Base):
     __tablename__ = "certificates"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     name: Mapped[str] = mapped_column(String(255))
     issuer: Mapped[str] = mapped_column(String(255))
     date: Mapped[datetime] = mapped_column(Date)
@@ -182,7 +194,7 @@ class Achievement(Base):
     __tablename__ = "achievements"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
 
@@ -191,7 +203,7 @@ class ExtraCurricular(Base):
     __tablename__ = "extra_curricular"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     activity: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
 
@@ -235,6 +247,58 @@ class Job(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     job_type: Mapped[str] = mapped_column(String(50), nullable=False)  # parse_resume, apply_changes, etc.
-    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, completed, failed
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, running, completed, failed
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+    input_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)  # uploaded document
+    result: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    output_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)  # generated document
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    locked_by: Mapped[str] = mapped_column(String(100), nullable=True)  # worker that claimed it
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    completed_at: Mapped[datetime] = mapped_column(DateTime)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("idx_jobs_status_created_at", "status", "created_at"),)
+
+
+# ======================================
+# LLM RESPONSE CACHE
+# ======================================
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of canonical inputs
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(20), nullable=False)
+    response: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cost_usd: Mapped[float] = mapped_column(Float, default=0.0)  # what one call cost
+    latency_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    last_hit_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+# ======================================
+# SCHEMA VERSION
+# ======================================
+
+# Bump together with app/db/schema.sql whenever the schema changes, and add
+# app/db/migrations/NNN_*.sql taking the previous version to this one.
+# Version 1 is the original schema, which had no schema_version table.
+SCHEMA_VERSION = 2
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -21,8 +21,11 @@ CREATE TABLE files (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     file_type VARCHAR(50) NOT NULL, -- resume, jd, other
-    file_path TEXT NOT NULL,
-    uploaded_at TIMESTAMPTZ DEFAULT now()
+    file_path TEXT NOT NULL, -- blob store key
+    content_hash VARCHAR(64), -- sha256, also the blob key
+    size_bytes BIGINT,
+    uploaded_at TIMESTAMPTZ DEFAULT now(),
+    CONSTRAINT uq_files_user_content_hash UNIQUE (user_id, content_hash)
 );
 
 -- ==============================================
@@ -39,7 +42,10 @@ CREATE TABLE resumes (
 CREATE TABLE resume_versions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     resume_id UUID NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
-    file_id UUID NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    file_id UUID REFERENCES files(id) ON DELETE CASCADE, -- NULL: same file as the parent
+    parent_version_id UUID REFERENCES resume_versions(id),
+    depth INT NOT NULL DEFAULT 0, -- deltas since the last full snapshot
+    sentence_count INT NOT NULL DEFAULT 0,
     version_number INT NOT NULL,
     created_at TIMESTAMPTZ DEFAULT now()
 );
@@ -48,10 +54,13 @@ CREATE TABLE resume_sentences (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     version_id UUID NOT NULL REFERENCES resume_versions(id) ON DELETE CASCADE,
     section VARCHAR(100), -- skills, experience, education, etc.
-    sentence_order INT,
-    text TEXT NOT NULL
+    sentence_order INT, -- sparse; stable across versions
+    op VARCHAR(10) NOT NULL DEFAULT 'put', -- put or delete (delta versions)
+    text TEXT -- NULL for delete
 );
 
+CREATE INDEX idx_resume_sentences_version_id ON resume_sentences(version_id);
+
 -- ==============================================
 -- USER PROFILE (structured source of truth)
 -- ==============================================
@@ -68,7 +77,7 @@ CREATE TABLE user_profiles (
 
 CREATE TABLE social_links (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    user_id UUID UNIQUE NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     github TEXT,
     linkedin TEXT,
     portfolio TEXT,
@@ -78,9 +87,12 @@ CREATE TABLE social_links (
 
 CREATE TABLE skills (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    name VARCHAR(100) UNIQUE NOT NULL
+    name VARCHAR(100) UNIQUE NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
 );
 
+CREATE INDEX idx_skills_created_at ON skills(created_at);
+
 CREATE TABLE user_skills (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     skill_id UUID NOT NULL REFERENCES skills(id) ON DELETE CASCADE,
@@ -141,6 +153,14 @@ CREATE TABLE extra_curricular (
     description TEXT
 );
 
+-- Sections are replaced per user on every save
+CREATE INDEX idx_education_user_id ON education(user_id);
+CREATE INDEX idx_experience_user_id ON experience(user_id);
+CREATE INDEX idx_projects_user_id ON projects(user_id);
+CREATE INDEX idx_certificates_user_id ON certificates(user_id);
+CREATE INDEX idx_achievements_user_id ON achievements(user_id);
+CREATE INDEX idx_extra_curricular_user_id ON extra_curricular(user_id);
+
 -- ==============================================
 -- JOB DESCRIPTIONS & ALIGNMENT
 -- ==============================================
@@ -170,7 +190,49 @@ CREATE TABLE jobs (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     job_type VARCHAR(50) NOT NULL, -- parse_resume, apply_changes, etc.
-    status VARCHAR(20) DEFAULT 'pending', -- pending, completed, failed
+    status VARCHAR(20) DEFAULT 'pending', -- pending, running, completed, failed
+    payload JSONB DEFAULT '{}'::jsonb,
+    input_data BYTEA, -- uploaded document
+    result JSONB,
+    output_data BYTEA, -- generated document
+    error TEXT,
+    attempts INT DEFAULT 0,
+    locked_by VARCHAR(100), -- worker that claimed it
     created_at TIMESTAMPTZ DEFAULT now(),
+    started_at TIMESTAMPTZ,
     completed_at TIMESTAMPTZ
 );
+
+CREATE INDEX idx_jobs_status_created_at ON jobs(status, created_at);
+
+-- ==============================================
+-- LLM RESPONSE CACHE
+-- ==============================================
+CREATE TABLE llm_cache (
+    key VARCHAR(64) PRIMARY KEY, -- sha256 of canonical inputs
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    response JSONB NOT NULL,
+    prompt_tokens INT DEFAULT 0,
+    completion_tokens INT DEFAULT 0,
+    cost_usd DOUBLE PRECISION DEFAULT 0, -- what one call cost
+    latency_seconds DOUBLE PRECISION DEFAULT 0,
+    hits INT DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    last_hit_at TIMESTAMPTZ DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX idx_llm_cache_last_hit_at ON llm_cache(last_hit_at);
+CREATE INDEX idx_llm_cache_expires_at ON llm_cache(expires_at);
+
+-- ==============================================
+-- SCHEMA VERSION (checked at startup; bump with SCHEMA_VERSION in models.py
+-- and add the upgrade to app/db/migrations)
+-- ==============================================
+CREATE TABLE schema_version (
+    version INT PRIMARY KEY,
+    applied_at TIMESTAMPTZ DEFAULT now()
+);
+
+INSERT INTO schema_version (version) VALUES (2);
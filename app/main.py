@@ -1,20 +1,67 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI
 from app.core.config import settings
 from app.api.routers import auth
 from app.api.routers import resume
 from app.api.routers import information
-from app.db.database import engine
-from app.db import models
+from app.api.routers import ops
+from app.api.routers import jobs
+from app.api.routers import versions
+from app.api.routers import health
+from app.core.executor import shutdown_executors
+from app.core.metrics import MetricsMiddleware, start_loop_lag_monitor, stop_loop_lag_monitor
+from app.core.profiling import ProfilingMiddleware
+from app.core.startup import readiness, run_warmup
+from app.core.uploads import UploadLimitMiddleware
+from app.services.jobs.runner import job_runner
+from app.services.llm.client import close_llm_client
+from app.services.resume.pdf import pdf_converter
 
 app = FastAPI(title=settings.PROJECT_NAME)
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_body_bytes=settings.UPLOAD_MAX_BYTES + settings.UPLOAD_FORM_OVERHEAD_BYTES,
+)
+if settings.PROFILE_ADMIN_TOKEN or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and also times requests refused above
+    app.add_middleware(MetricsMiddleware)
 
 # Routers
+app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(resume.router)
 app.include_router(information.router)
+app.include_router(versions.router)
+app.include_router(jobs.router)
+app.include_router(ops.router)
+
+readiness.import_seconds = round(time.perf_counter() - _import_started, 3)
+_warmup_task: asyncio.Task | None = None
+
+
+async def _warm_up():
+    # Schema check and warm-up run behind /ready; the job runner waits for them
+    if await run_warmup(_import_started) and settings.JOB_RUNNER_IN_PROCESS:
+        job_runner.start()
 
-# DEV ONLY: auto-create tables on startup 
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(models.Base.metadata.create_all)
\ No newline at end of file
+    global _warmup_task
+    _warmup_task = asyncio.create_task(_warm_up())
+    if settings.METRICS_ENABLED:
+        start_loop_lag_monitor(settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    await stop_loop_lag_monitor()
+    await job_runner.stop()
+    await pdf_converter.stop()
+    shutdown_executors()
+    await close_llm_client()
@@ -0,0 +1,36 @@
+# DB access for stored files (content lives in the blob store)
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import File
+from app.services.storage.blob import content_hash, get_blob, put_blob
+
+
+async def store_file(db: AsyncSession, user_id: UUID, data: bytes, file_type: str,
+                     digest: str | None = None) -> tuple[File, bool]:
+    """
+    Store `data` once per user and once in the blob store.
+    Returns (file, created); `created` is False for a repeat upload.
+    """
+    digest = digest or content_hash(data)
+    res = await db.execute(select(File).where(File.user_id == user_id, File.content_hash == digest))
+    existing = res.scalars().first()
+    if existing is not None:
+        return existing, False
+
+    key = await put_blob(data)
+    stmt = insert(File).values(
+        user_id=user_id, file_type=file_type, file_path=key,
+        content_hash=digest, size_bytes=len(data),
+    )
+    # A concurrent upload of the same bytes may have won the race; reuse its row
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_files_user_content_hash", set_={"file_type": stmt.excluded.file_type}
+    ).returning(File)
+    res = await db.execute(stmt, execution_options={"populate_existing": True})
+    return res.scalars().one(), True
+
+
+async def read_file(file: File) -> bytes:
+    return await get_blob(file.file_path)
@@ -0,0 +1,94 @@
+# DB access for background jobs
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Job
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+async def create_job(db: AsyncSession, user_id, job_type: str, payload: dict,
+                     input_data: bytes | None = None) -> Job:
+    job = Job(user_id=user_id, job_type=job_type, status="pending",
+              payload=payload, input_data=input_data, attempts=0)
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def get_job(db: AsyncSession, user_id, job_id) -> Job | None:
+    res = await db.execute(select(Job).where(Job.id == job_id, Job.user_id == user_id))
+    return res.scalars().first()
+
+
+async def claim_jobs(db: AsyncSession, worker_id: str, free_slots: Dict[str, int]) -> List[Job]:
+    """
+    Atomically move up to `free_slots[job_type]` pending jobs of each type to
+    `running`. SKIP LOCKED lets any number of workers poll the same table
+    without handing out a job twice.
+    """
+    claimed: List[Job] = []
+    for job_type, slots in free_slots.items():
+        if slots <= 0:
+            continue
+        pending = (
+            select(Job.id)
+            .where(Job.status == "pending", Job.job_type == job_type)
+            .order_by(Job.created_at)
+            .limit(slots)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        res = await db.execute(
+            update(Job)
+            .where(Job.id.in_(pending))
+            .values(status="running", started_at=datetime.utcnow(),
+                    attempts=Job.attempts + 1, locked_by=worker_id)
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        claimed.extend(res.scalars().all())
+    return claimed
+
+
+async def complete_job(db: AsyncSession, job_id, result: dict, output_data: bytes | None) -> None:
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status="completed", result=result, output_data=output_data,
+                input_data=None, error=None, completed_at=datetime.utcnow())
+    )
+
+
+async def fail_job(db: AsyncSession, job_id, error: str) -> None:
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status="failed", error=error, completed_at=datetime.utcnow())
+    )
+
+
+async def requeue_job(db: AsyncSession, job_id) -> None:
+    """Hand a claimed job back to the queue without counting the attempt."""
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status="pending", locked_by=None, attempts=Job.attempts - 1)
+    )
+
+
+async def requeue_stale_jobs(db: AsyncSession, older_than_seconds: int, max_attempts: int) -> int:
+    """Return jobs stuck in `running` (their worker died) to `pending`, or fail them."""
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than_seconds)
+    stale = (Job.status == "running", Job.started_at < cutoff)
+    await db.execute(
+        update(Job).where(*stale, Job.attempts >= max_attempts)
+        .values(status="failed", error="Worker lost the job too many times",
+                completed_at=datetime.utcnow())
+    )
+    res = await db.execute(
+        update(Job).where(*stale, Job.attempts < max_attempts)
+        .values(status="pending", locked_by=None)
+    )
+    return res.rowcount or 0
@@ -0,0 +1,165 @@
+# DB access for the structured resume sections behind /info
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    Achievement, Certificate, Education, Experience, ExtraCurricular, Project,
+    SocialLink, UserProfile, UserSkill,
+)
+from app.services.resume.skills import skill_dictionary
+
+# "Present", "Current" etc. mean the role is ongoing
+_ONGOING = {"present", "current", "now", "ongoing", "till date", "to date"}
+_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m", "%Y/%m", "%m/%Y", "%b %Y", "%B %Y", "%b, %Y", "%B, %Y", "%Y")
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    """Resume-style dates ("2023-05", "May 2023", "Present") to a date; ongoing is None."""
+    if value is None:
+        return None
+    text = re.sub(r"\s+", " ", value.strip().rstrip("."))
+    text = re.sub(r"^Sept\b", "Sep", text, flags=re.IGNORECASE)
+    if not text or text.lower() in _ONGOING:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+async def _replace_rows(db: AsyncSession, model, user_id: UUID, rows: List[dict]) -> None:
+    """
+    Replace a user's rows in one statement: a DELETE in a CTE followed by a
+    multi-row INSERT. Both see the same snapshot, so new rows are never
+    deleted.
+    """
+    removed = delete(model).where(model.user_id == user_id).returning(model.id).cte("removed")
+    if not rows:
+        await db.execute(removed.select())
+        return
+    await db.execute(
+        insert(model).values([{**row, "user_id": user_id} for row in rows]).add_cte(removed)
+    )
+
+
+# ======================================
+# SINGLE-ROW SECTIONS
+# ======================================
+
+async def save_basic_info(db: AsyncSession, user_id: UUID, info: dict) -> None:
+    stmt = insert(UserProfile).values(user_id=user_id, **info)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserProfile.user_id],
+        set_={**{k: stmt.excluded[k] for k in info}, "updated_at": datetime.utcnow()},
+    ))
+
+
+async def save_social_links(db: AsyncSession, user_id: UUID, links: dict) -> None:
+    stmt = insert(SocialLink).values(user_id=user_id, **links)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[SocialLink.user_id],
+        set_={k: stmt.excluded[k] for k in links},
+    ))
+
+
+# ======================================
+# LIST SECTIONS
+# ======================================
+
+async def save_skills(db: AsyncSession, user_id: UUID, skills: List[dict]) -> None:
+    """
+    Resolve names through the skill dictionary, then replace the user's links:
+    delete the links not listed, then upsert the rest. `_replace_rows` can't
+    be used: these rows are keyed on (user_id, skill_id), and a DELETE CTE
+    only runs after the INSERT, which would hit the key for re-saved skills.
+    """
+    ids = await skill_dictionary.resolve([skill["name"] for skill in skills])
+    proficiency: Dict[UUID, Optional[str]] = {}
+    for skill in skills:
+        if skill["name"] in ids:
+            proficiency[ids[skill["name"]]] = skill.get("proficiency")  # last duplicate wins
+
+    stale = delete(UserSkill).where(UserSkill.user_id == user_id)
+    if not proficiency:
+        await db.execute(stale)
+        return
+    await db.execute(stale.where(UserSkill.skill_id.not_in(list(proficiency))))
+    stmt = insert(UserSkill).values([
+        {"user_id": user_id, "skill_id": skill_id, "proficiency": level}
+        for skill_id, level in proficiency.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserSkill.user_id, UserSkill.skill_id],
+        set_={"proficiency": stmt.excluded.proficiency},
+    ))
+
+
+async def save_projects(db: AsyncSession, user_id: UUID, projects: List[dict]) -> None:
+    await _replace_rows(db, Project, user_id, [
+        {"title": p["title"], "description": p["description"],
+         "tech_stack": p["tech_stack"], "link": p.get("link")}
+        for p in projects
+    ])
+
+
+async def save_experience(db: AsyncSession, user_id: UUID, experiences: List[dict]) -> None:
+    await _replace_rows(db, Experience, user_id, [
+        {"company": e["company"], "role": e["role"],
+         "start_date": _parse_date(e["start_date"]), "end_date": _parse_date(e.get("end_date")),
+         "description": "\n".join(e["description"])}
+        for e in experiences
+    ])
+
+
+async def save_education(db: AsyncSession, user_id: UUID, education: List[dict]) -> None:
+    await _replace_rows(db, Education, user_id, education)
+
+
+async def save_certificates(db: AsyncSession, user_id: UUID, certificates: List[dict]) -> None:
+    await _replace_rows(db, Certificate, user_id, [
+        {"name": c["name"], "issuer": c["issuer"], "date": _parse_date(c["date"]), "link": c.get("link")}
+        for c in certificates
+    ])
+
+
+async def save_achievements(db: AsyncSession, user_id: UUID, achievements: List[dict]) -> None:
+    await _replace_rows(db, Achievement, user_id, achievements)
+
+
+async def save_extra_curricular(db: AsyncSession, user_id: UUID, activities: List[dict]) -> None:
+    await _replace_rows(db, ExtraCurricular, user_id, activities)
+
+
+SECTION_WRITERS = {
+    "basic_info": save_basic_info,
+    "social_links": save_social_links,
+    "skills": save_skills,
+    "projects": save_projects,
+    "experience": save_experience,
+    "education": save_education,
+    "certificates": save_certificates,
+    "achievements": save_achievements,
+    "extra_curricular": save_extra_curricular,
+}
+
+
+async def save_resume_data(db: AsyncSession, user_id: UUID, data: dict) -> List[str]:
+    """
+    Write every section present in `data` (a `ResumeData.model_dump(mode="json")`);
+    sections that are None are left as they are. Runs inside the caller's
+    transaction, about two statements per section however many rows it has.
+    """
+    saved = []
+    for section, writer in SECTION_WRITERS.items():
+        if data.get(section) is not None:
+            await writer(db, user_id, data[section])
+            saved.append(section)
+    return saved
@@ -1,5 +1,6 @@
 # DB access for users
-from sqlalchemy import select
+from uuid import UUID
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import User
 
@@ -7,7 +8,7 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     res = await db.execute(select(User).where(User.email == email))
     return res.scalars().first()
 
-async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+async def get_user_by_id(db: AsyncSession, user_id: UUID) -> User | None:
     res = await db.execute(select(User).where(User.id == user_id))
     return res.scalars().first()
 
@@ -15,4 +16,10 @@ async def create_user(db: AsyncSession, email: str, hashed_password: str) -> Use
     user = User(email=email, hashed_password=hashed_password)
     db.add(user)
     await db.flush()  
-    return user
\ No newline at end of file
+    return user
+
+async def update_password(db: AsyncSession, user_id: UUID, hashed_password: str) -> None:
+    await db.execute(update(User).where(User.id == user_id).values(hashed_password=hashed_password))
+
+async def delete_user(db: AsyncSession, user_id: UUID) -> None:
+    await db.execute(delete(User).where(User.id == user_id))
@@ -0,0 +1,237 @@
+# DB access for resume versions, stored as deltas against their parent
+import difflib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Resume, ResumeSentence, ResumeVersion
+
+# Spacing of sentence_order in a snapshot, leaving room for later inserts
+ORDER_GAP = 1024
+
+# (sentence_order, text) pairs in document order
+VersionState = Tuple[Tuple[int, str], ...]
+
+# Versions never change once written, so reconstructions can be kept as-is
+_states: "OrderedDict[UUID, VersionState]" = OrderedDict()
+
+
+def _remember(version_id: UUID, state: VersionState) -> None:
+    _states[version_id] = state
+    _states.move_to_end(version_id)
+    while len(_states) > settings.VERSION_CACHE_SIZE:
+        _states.popitem(last=False)
+
+
+def _cached(version_id: UUID) -> Optional[VersionState]:
+    state = _states.get(version_id)
+    if state is not None:
+        _states.move_to_end(version_id)
+    return state
+
+
+# ======================================
+# READ
+# ======================================
+
+async def get_version(db: AsyncSession, user_id: UUID, version_id: UUID) -> ResumeVersion | None:
+    res = await db.execute(
+        select(ResumeVersion)
+        .join(Resume, Resume.id == ResumeVersion.resume_id)
+        .where(ResumeVersion.id == version_id, Resume.user_id == user_id)
+    )
+    return res.scalars().first()
+
+
+async def _chain(db: AsyncSession, version_id: UUID) -> List[UUID]:
+    """Ids from `version_id` back to its nearest snapshot, newest first (one recursive query)."""
+    rv = ResumeVersion
+    chain = (
+        select(rv.id, rv.parent_version_id, rv.depth)
+        .where(rv.id == version_id)
+        .cte("chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(rv.id, rv.parent_version_id, rv.depth)
+        .join(chain, rv.id == chain.c.parent_version_id)
+        .where(chain.c.depth > 0)
+    )
+    res = await db.execute(select(chain.c.id, chain.c.depth).order_by(chain.c.depth.desc()))
+    return [row.id for row in res.all()]
+
+
+async def get_version_state(db: AsyncSession, version_id: UUID) -> VersionState:
+    """
+    Rebuild a version: start from the nearest snapshot (or the nearest
+    version already in memory) and replay the deltas after it.
+    """
+    state = _cached(version_id)
+    if state is not None:
+        return state
+
+    chain = await _chain(db, version_id)
+    if not chain:
+        raise LookupError(f"Resume version {version_id} not found")
+
+    # Stop at the newest ancestor we already hold
+    base: dict = {}
+    replay = chain
+    for i, vid in enumerate(chain):
+        known = _cached(vid)
+        if known is not None:
+            base, replay = dict(known), chain[:i]
+            break
+    replay = list(reversed(replay))  # oldest first
+
+    if replay:
+        res = await db.execute(
+            select(ResumeSentence.version_id, ResumeSentence.sentence_order,
+                   ResumeSentence.op, ResumeSentence.text)
+            .where(ResumeSentence.version_id.in_(replay))
+        )
+        rows_by_version: dict = {}
+        for row in res.all():
+            rows_by_version.setdefault(row.version_id, []).append(row)
+        for vid in replay:
+            for row in rows_by_version.get(vid, []):
+                if row.op == "delete":
+                    base.pop(row.sentence_order, None)
+                else:
+                    base[row.sentence_order] = row.text
+
+    state = tuple(sorted(base.items()))
+    _remember(version_id, state)
+    return state
+
+
+async def get_version_sentences(db: AsyncSession, version_id: UUID) -> List[str]:
+    return [text for _, text in await get_version_state(db, version_id)]
+
+
+async def get_version_file_id(db: AsyncSession, version_id: UUID) -> UUID | None:
+    """The file of the nearest version (itself or an ancestor) that has one."""
+    rv = ResumeVersion
+    chain = (
+        select(rv.id, rv.parent_version_id, rv.file_id, rv.version_number)
+        .where(rv.id == version_id)
+        .cte("file_chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(rv.id, rv.parent_version_id, rv.file_id, rv.version_number)
+        .join(chain, rv.id == chain.c.parent_version_id)
+        .where(chain.c.file_id.is_(None))
+    )
+    res = await db.execute(
+        select(chain.c.file_id).where(chain.c.file_id.is_not(None)).limit(1)
+    )
+    return res.scalar()
+
+
+# ======================================
+# WRITE
+# ======================================
+
+def _snapshot_rows(sentences: List[str]) -> List[dict]:
+    return [
+        {"sentence_order": (i + 1) * ORDER_GAP, "op": "put", "text": text}
+        for i, text in enumerate(sentences)
+    ]
+
+
+def _delta_rows(parent: VersionState, sentences: List[str]) -> Optional[List[dict]]:
+    """
+    Rows turning `parent` into `sentences`: changed lines keep their order
+    key, removed lines get a delete, new lines get keys between their
+    neighbours. None when there is no room left between two keys.
+    """
+    old_texts = [text for _, text in parent]
+    orders = [order for order, _ in parent]
+    rows: List[dict] = []
+
+    matcher = difflib.SequenceMatcher(None, old_texts, sentences, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            rows.append({"sentence_order": orders[i1 + k], "op": "put", "text": sentences[j1 + k]})
+        for k in range(i1 + paired, i2):
+            rows.append({"sentence_order": orders[k], "op": "delete", "text": None})
+
+        new = sentences[j1 + paired:j2]
+        if new:
+            lo = orders[i1 + paired - 1] if i1 + paired > 0 else 0
+            hi = orders[i2] if i2 < len(orders) else lo + (len(new) + 1) * ORDER_GAP
+            step = (hi - lo) // (len(new) + 1)
+            if step < 1:
+                return None
+            for k, text in enumerate(new):
+                rows.append({"sentence_order": lo + (k + 1) * step, "op": "put", "text": text})
+    return rows
+
+
+async def create_version(
+    db: AsyncSession,
+    resume_id: UUID,
+    sentences: List[str],
+    parent_version_id: UUID | None = None,
+    file_id: UUID | None = None,
+) -> Tuple[ResumeVersion, int]:
+    """
+    Add a version of `resume_id`. With a parent, only the changed sentences
+    are written; every VERSION_SNAPSHOT_INTERVAL deltas (or when order keys
+    run out) a full copy is written instead so reconstruction stays short.
+    Returns (version, rows written).
+    """
+    rows: Optional[List[dict]] = None
+    depth = 0
+    if parent_version_id is not None:
+        parent = await db.get(ResumeVersion, parent_version_id)
+        if parent is None or parent.resume_id != resume_id:
+            raise LookupError(f"Resume version {parent_version_id} not found")
+        if parent.depth + 1 < settings.VERSION_SNAPSHOT_INTERVAL:
+            rows = _delta_rows(await get_version_state(db, parent_version_id), sentences)
+            depth = parent.depth + 1
+    if rows is None:
+        rows, depth = _snapshot_rows(sentences), 0
+
+    number = await db.execute(
+        select(func.coalesce(func.max(ResumeVersion.version_number), 0) + 1)
+        .where(ResumeVersion.resume_id == resume_id)
+    )
+    version = ResumeVersion(
+        resume_id=resume_id,
+        file_id=file_id,
+        parent_version_id=parent_version_id,
+        depth=depth,
+        sentence_count=len(sentences),
+        version_number=number.scalar(),
+    )
+    db.add(version)
+    await db.flush()
+
+    if rows:
+        await db.execute(insert(ResumeSentence), [{**row, "version_id": version.id} for row in rows])
+
+    if depth == 0:
+        _remember(version.id, tuple((row["sentence_order"], row["text"]) for row in rows))
+    else:
+        state = dict(await get_version_state(db, parent_version_id))
+        for row in rows:
+            if row["op"] == "delete":
+                state.pop(row["sentence_order"], None)
+            else:
+                state[row["sentence_order"]] = row["text"]
+        _remember(version.id, tuple(sorted(state.items())))
+    return version, len(rows)
+
+
+async def create_resume(db: AsyncSession, user_id: UUID, title: str) -> Resume:
+    resume = Resume(user_id=user_id, title=title)
+    db.add(resume)
+    await db.flush()
+    return resume
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class JobOut(BaseModel):
+    id: UUID
+    job_type: str
+    status: str
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class VersionCreate(BaseModel):
+    sentences: List[str]
+
+
+class VersionOut(BaseModel):
+    id: UUID
+    resume_id: UUID
+    parent_version_id: Optional[UUID] = None
+    file_id: Optional[UUID] = None
+    version_number: int
+    depth: int
+    sentence_count: int
+    created_at: datetime
+    rows_written: int = 0  # sentence rows stored for this version
+    class Config:
+        from_attributes = True
@@ -0,0 +1,208 @@
+# in-process job runner that claims rows from the jobs table
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.executor import run_task
+from app.db.database import SessionFactory
+from app.db.models import Job
+from app.repositories.job_repo import (
+    claim_jobs, complete_job, fail_job, requeue_job, requeue_stale_jobs
+)
+from app.services.resume.cache import parse_with_cache
+from app.services.resume.pdf import pdf_converter
+from app.services.resume.tailor import tailor_resume_with_jd
+from app.services.resume.tasks import apply_changes_task, parse_resume_task
+
+logger = logging.getLogger("uvicorn.error")
+
+HandlerResult = Tuple[dict, Optional[bytes]]
+
+# Attempts at writing a job's final status before leaving it to the stale sweep
+STATUS_WRITE_ATTEMPTS = 5
+
+
+# ======================================
+# HANDLERS (one per job_type)
+# ======================================
+
+async def _parse_resume(job: Job) -> HandlerResult:
+    result, _, _ = await parse_with_cache("resume", job.input_data, parse_resume_task)
+    return result, None
+
+
+async def _apply_changes(job: Job) -> HandlerResult:
+    (output, report), _ = await run_task(
+        "docx_replace", apply_changes_task, job.input_data, (job.payload or {}).get("sentences", [])
+    )
+    return report, output
+
+
+async def _tailor(job: Job) -> HandlerResult:
+    resume_json = (job.payload or {}).get("resume_json")
+    if resume_json is None:
+        resume_json, _, _ = await parse_with_cache("resume", job.input_data, parse_resume_task)
+    tailored = await tailor_resume_with_jd(
+        resume_json, job.payload["job_description"], user_id=job.user_id
+    )
+    return tailored, None
+
+
+async def _convert(job: Job) -> HandlerResult:
+    pdf = await pdf_converter.convert(job.input_data)
+    return {"bytes": len(pdf)}, pdf
+
+
+JOB_HANDLERS: Dict[str, Callable[[Job], Awaitable[HandlerResult]]] = {
+    "parse_resume": _parse_resume,
+    "apply_changes": _apply_changes,
+    "tailor": _tailor,
+    "convert": _convert,
+}
+
+# Media type of `output_data` for job types that produce a file
+JOB_OUTPUT_TYPES = {
+    "apply_changes": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "convert": ("application/pdf", "pdf"),
+}
+
+
+# ======================================
+# RUNNER
+# ======================================
+
+class JobRunner:
+    """
+    Polls the jobs table and runs claimed jobs as asyncio tasks.
+    Each job type has its own concurrency limit (JOB_CONCURRENCY), and the
+    runner only claims as many rows as it has free slots, so several runners
+    (API pods and `python -m app.worker` processes) can share one table.
+    """
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = dict(concurrency or settings.JOB_CONCURRENCY)
+        self.running: Dict[str, int] = {t: 0 for t in self.concurrency}
+        self._wakeup = asyncio.Event()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._jobs: set = set()
+
+    def notify(self) -> None:
+        """Poll right away instead of waiting for the next interval (local submits)."""
+        self._wakeup.set()
+
+    def finished_event(self, job_id) -> asyncio.Event:
+        # Lets long-polls in this process wake as soon as a local job ends
+        return self._finished.setdefault(str(job_id), asyncio.Event())
+
+    def forget_waiter(self, job_id, event: asyncio.Event) -> None:
+        # Don't keep events for jobs another worker is running
+        if self._finished.get(str(job_id)) is event:
+            del self._finished[str(job_id)]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, *self._jobs, return_exceptions=True)
+            self._task = None
+
+    async def run_forever(self) -> None:
+        polls = 0
+        while True:
+            try:
+                if polls % 20 == 0:
+                    await self._requeue_stale()
+                await self.poll_once()
+            except (SQLAlchemyError, OSError):
+                pass  # database unavailable; try again next interval
+            polls += 1
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def poll_once(self) -> int:
+        free = {t: limit - self.running.get(t, 0) for t, limit in self.concurrency.items()}
+        if not any(n > 0 for n in free.values()):
+            return 0
+        async with SessionFactory() as db:
+            jobs = await claim_jobs(db, self.worker_id, free)
+            await db.commit()
+        for job in jobs:
+            self.running[job.job_type] += 1
+            task = asyncio.create_task(self._run(job))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+        return len(jobs)
+
+    async def _run(self, job: Job) -> None:
+        busy_for = None
+        try:
+            try:
+                result, output = await JOB_HANDLERS[job.job_type](job)
+            except HTTPException as exc:
+                if exc.status_code == 503:
+                    # An executor pool is full: not the job's fault, so it goes back
+                    # to the queue and the attempt isn't counted
+                    busy_for = float((exc.headers or {}).get("Retry-After", settings.EXECUTOR_RETRY_AFTER_SECONDS))
+                else:
+                    await self._write_status(fail_job, job.id, str(exc.detail))
+            except Exception as exc:
+                detail = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+                await self._write_status(fail_job, job.id, str(detail))
+            else:
+                await self._write_status(complete_job, job.id, result, output)
+        finally:
+            self.running[job.job_type] -= 1
+            if busy_for is None:
+                self.finished_event(job.id).set()
+                self._finished.pop(str(job.id), None)
+            self._wakeup.set()  # a slot opened up
+        if busy_for is not None:
+            # The row stays `running` meanwhile, so no runner reclaims it early
+            await asyncio.sleep(busy_for)
+            await self._write_status(requeue_job, job.id)
+            self._wakeup.set()
+
+    async def _write_status(self, write: Callable, job_id, *args) -> None:
+        # A failed write would leave the job `running` until JOB_STALE_SECONDS,
+        # so retry with backoff before giving up on it
+        for attempt in range(STATUS_WRITE_ATTEMPTS):
+            try:
+                async with SessionFactory() as db:
+                    await write(db, job_id, *args)
+                    await db.commit()
+                return
+            except (SQLAlchemyError, OSError):
+                if attempt == STATUS_WRITE_ATTEMPTS - 1:
+                    logger.exception("Could not record the status of job %s", job_id)
+                    return
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _requeue_stale(self) -> None:
+        async with SessionFactory() as db:
+            await requeue_stale_jobs(db, settings.JOB_STALE_SECONDS, settings.JOB_MAX_ATTEMPTS)
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": dict(self.running),
+            "concurrency": dict(self.concurrency),
+        }
+
+
+job_runner = JobRunner()
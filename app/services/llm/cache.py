@@ -0,0 +1,218 @@
+# cache of LLM tailoring responses: in-process TTL/LRU in front of Postgres
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.db.database import SessionFactory
+from app.db.models import LLMCacheEntry
+
+# USD per 1K tokens (input, output); unknown models are costed at zero
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+}
+
+
+def llm_cache_key(resume_json: dict, job_description: str, model: str,
+                  temperature: float, prompt_version: str) -> str:
+    """Canonical hash of everything that determines the completion."""
+    canonical = json.dumps(
+        {
+            "resume": resume_json,
+            "jd": job_description.strip(),
+            "model": model,
+            "temperature": round(float(temperature), 4),
+            "prompt_version": prompt_version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime:
+    # llm_cache columns are timestamptz: asyncpg returns aware datetimes and
+    # would read naive ones as local time
+    return datetime.now(timezone.utc)
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return prompt_tokens / 1000 * price_in + completion_tokens / 1000 * price_out
+
+
+class LLMResponseCache:
+    """
+    Memory tier: LRU of at most `max_entries`, each entry valid for `ttl_seconds`.
+    Responses are held as JSON text and decoded on every hit, so callers get
+    their own copy and can't change what the next hit returns.
+    Postgres tier (`llm_cache` table): shared across workers and restarts,
+    expired rows are ignored and purged, least recently hit rows are trimmed
+    beyond LLM_CACHE_MAX_ROWS.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, persist: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires, response JSON, cost, latency)
+        self._writes = 0
+        self._pending_hits: Dict[str, int] = {}
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dollars_saved = 0.0
+        self.seconds_saved = 0.0
+
+    def _remember(self, key: str, expires: float, response: dict, cost: float, latency: float) -> None:
+        self._entries[key] = (expires, json.dumps(response, separators=(",", ":")), cost, latency)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _count_hit(self, cost: float, latency: float) -> None:
+        self.hits += 1
+        self.dollars_saved += cost
+        self.seconds_saved += latency
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, response, cost, latency = entry
+            if expires > time.time():
+                self._entries.move_to_end(key)
+                self._count_hit(cost, latency)
+                if self.persist:
+                    self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                return json.loads(response)
+            del self._entries[key]
+
+        row = await self._db_get(key) if self.persist else None
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self._count_hit(row.cost_usd, row.latency_seconds)
+        expires = time.time() + min(self.ttl_seconds, (row.expires_at - _utcnow()).total_seconds())
+        self._remember(key, expires, row.response, row.cost_usd, row.latency_seconds)
+        return row.response
+
+    async def put(self, key: str, response: dict, *, model: str, prompt_version: str,
+                  prompt_tokens: int, completion_tokens: int, latency_seconds: float) -> None:
+        cost = call_cost(model, prompt_tokens, completion_tokens)
+        self._remember(key, time.time() + self.ttl_seconds, response, cost, latency_seconds)
+        if not self.persist:
+            return
+
+        now = _utcnow()
+        values = dict(
+            key=key, model=model, prompt_version=prompt_version, response=response,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            cost_usd=cost, latency_seconds=latency_seconds, hits=0,
+            created_at=now, last_hit_at=now,
+            expires_at=now + timedelta(seconds=self.ttl_seconds),
+        )
+        stmt = insert(LLMCacheEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={k: stmt.excluded[k] for k in values if k not in ("key", "hits")},
+        )
+        try:
+            async with SessionFactory() as db:
+                await db.execute(stmt)
+                await self._flush_hits(db)
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    await self._purge(db)
+                await db.commit()
+        except (SQLAlchemyError, OSError):
+            # The cache must never fail a tailoring request
+            pass
+
+    async def _db_get(self, key: str) -> Optional[LLMCacheEntry]:
+        try:
+            async with SessionFactory() as db:
+                res = await db.execute(
+                    update(LLMCacheEntry)
+                    .where(LLMCacheEntry.key == key, LLMCacheEntry.expires_at > _utcnow())
+                    .values(hits=LLMCacheEntry.hits + 1, last_hit_at=_utcnow())
+                    .returning(LLMCacheEntry)
+                )
+                row = res.scalars().first()
+                await db.commit()
+                return row
+        except (SQLAlchemyError, OSError):
+            return None
+
+    async def _flush_hits(self, db) -> None:
+        # Memory-tier hits are batched into one executemany instead of a write per hit
+        if not self._pending_hits:
+            return
+        pending, self._pending_hits = self._pending_hits, {}
+        table = LLMCacheEntry.__table__
+        await db.execute(
+            table.update()
+            .where(table.c.key == bindparam("k"))
+            .values(hits=table.c.hits + bindparam("n"), last_hit_at=_utcnow()),
+            [{"k": k, "n": n} for k, n in pending.items()],
+        )
+
+    async def _purge(self, db) -> None:
+        await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= _utcnow()))
+        keep = (
+            select(LLMCacheEntry.key)
+            .order_by(LLMCacheEntry.last_hit_at.desc())
+            .limit(settings.LLM_CACHE_MAX_ROWS)
+        )
+        await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.not_in(keep)))
+
+    async def stats(self) -> dict:
+        result = {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            # Savings seen by this process
+            "dollars_saved": round(self.dollars_saved, 6),
+            "seconds_saved": round(self.seconds_saved, 3),
+        }
+        if self.persist:
+            try:
+                async with SessionFactory() as db:
+                    await self._flush_hits(db)
+                    await db.commit()
+                    res = await db.execute(select(
+                        func.count(),
+                        func.coalesce(func.sum(LLMCacheEntry.hits * LLMCacheEntry.cost_usd), 0.0),
+                        func.coalesce(func.sum(LLMCacheEntry.hits * LLMCacheEntry.latency_seconds), 0.0),
+                    ))
+                    rows, dollars, seconds = res.one()
+                # Savings across every worker since each entry was created
+                result["db_rows"] = rows
+                result["db_dollars_saved"] = round(float(dollars), 6)
+                result["db_seconds_saved"] = round(float(seconds), 3)
+            except (SQLAlchemyError, OSError):
+                pass
+        return result
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    persist=settings.LLM_CACHE_PERSIST,
+)
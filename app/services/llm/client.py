@@ -0,0 +1,314 @@
+# shared async OpenAI client with concurrency limits, deadlines and retries
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import SLOW_BUCKETS, Counter, Histogram
+
+if TYPE_CHECKING:
+    # openai takes ~0.5 s to import; it is loaded on first use or during warm-up
+    from openai import AsyncOpenAI
+
+_client: Optional["AsyncOpenAI"] = None
+_global_slots: Optional[asyncio.Semaphore] = None
+_user_in_flight: Dict[str, int] = {}
+
+
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "LLM calls including slot waits and retries, by model and outcome.",
+    ["model", "status"], buckets=SLOW_BUCKETS,
+)
+LLM_FIRST_TOKEN = Histogram(
+    "llm_first_token_seconds", "Time to the first streamed token.", ["model"], buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens billed, by model and kind (prompt or completion).", ["model", "kind"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM call attempts beyond the first.", ["model"])
+
+
+@dataclass
+class LLMCallRecord:
+    model: str
+    user_id: Optional[str]
+    started_at: float
+    latency_seconds: float
+    attempts: int
+    estimated_prompt_tokens: Optional[int] = None
+    first_token_seconds: Optional[float] = None  # streaming calls only
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    status: str = "ok"
+
+
+class _LLMStats:
+    def __init__(self, keep: int = 200):
+        self.recent: deque = deque(maxlen=keep)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_seconds_total = 0.0
+
+    def record(self, rec: LLMCallRecord) -> None:
+        self.recent.append(rec)
+        self.calls += 1
+        self.failures += rec.status != "ok"
+        self.retries += rec.attempts - 1
+        self.prompt_tokens += rec.prompt_tokens
+        self.completion_tokens += rec.completion_tokens
+        self.latency_seconds_total += rec.latency_seconds
+        LLM_LATENCY.labels(rec.model, rec.status).observe(rec.latency_seconds)
+        if rec.first_token_seconds is not None:
+            LLM_FIRST_TOKEN.labels(rec.model).observe(rec.first_token_seconds)
+        if rec.prompt_tokens:
+            LLM_TOKENS.labels(rec.model, "prompt").inc(rec.prompt_tokens)
+        if rec.completion_tokens:
+            LLM_TOKENS.labels(rec.model, "completion").inc(rec.completion_tokens)
+        if rec.attempts > 1:
+            LLM_RETRIES.labels(rec.model).inc(rec.attempts - 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_seconds_avg": self.latency_seconds_total / self.calls if self.calls else 0.0,
+            "in_flight_users": len(_user_in_flight),
+            "recent": [asdict(r) for r in list(self.recent)[-20:]],
+        }
+
+
+llm_stats = _LLMStats()
+
+
+def get_llm_client() -> "AsyncOpenAI":
+    """Build the process-wide client on first use; it owns the HTTP connection pool."""
+    global _client
+    if _client is None:
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=0,  # retries are handled here so they can be counted
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+@asynccontextmanager
+async def _user_slot(user_id: Optional[str]):
+    if user_id is None:
+        yield
+        return
+    if _user_in_flight.get(user_id, 0) >= settings.LLM_MAX_IN_FLIGHT_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many tailoring requests in progress",
+        )
+    _user_in_flight[user_id] = _user_in_flight.get(user_id, 0) + 1
+    try:
+        yield
+    finally:
+        _user_in_flight[user_id] -= 1
+        if not _user_in_flight[user_id]:
+            del _user_in_flight[user_id]
+
+
+def _get_global_slots() -> asyncio.Semaphore:
+    global _global_slots
+    if _global_slots is None:
+        _global_slots = asyncio.Semaphore(settings.LLM_MAX_IN_FLIGHT)
+    return _global_slots
+
+
+def _retryable(exc: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):  # includes APITimeoutError
+        return True
+    return isinstance(exc, APIStatusError) and (exc.status_code == 429 or exc.status_code >= 500)
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt], capped
+    return random.uniform(0, min(settings.LLM_RETRY_BASE_SECONDS * (2 ** attempt), 8.0))
+
+
+async def chat_completion(
+    messages: list,
+    *,
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    deadline_seconds: Optional[float] = None,
+    estimated_prompt_tokens: Optional[int] = None,
+    **kwargs: Any,
+):
+    """
+    Run one chat completion through the shared client.
+
+    Waits for a global slot (LLM_MAX_IN_FLIGHT), refuses with 429 when the user
+    already has LLM_MAX_IN_FLIGHT_PER_USER calls running, retries 429/5xx and
+    connection errors with jittered backoff, and gives up with 504 once the
+    whole call, including waiting and retries, passes its deadline.
+    """
+    model = model or settings.OPENAI_MODEL
+    deadline = deadline_seconds or settings.LLM_DEADLINE_SECONDS
+    uid = str(user_id) if user_id is not None else None
+    started = time.time()
+    attempts = 0
+    rec = LLMCallRecord(
+        model=model, user_id=uid, started_at=started, latency_seconds=0.0, attempts=0,
+        estimated_prompt_tokens=estimated_prompt_tokens,
+    )
+
+    try:
+        async with _user_slot(uid), asyncio.timeout(deadline):
+            async with _get_global_slots():
+                while True:
+                    attempts += 1
+                    try:
+                        response = await get_llm_client().chat.completions.create(
+                            model=model, messages=messages, temperature=temperature, **kwargs
+                        )
+                        break
+                    except Exception as exc:
+                        if not _retryable(exc) or attempts > settings.LLM_MAX_RETRIES:
+                            raise
+                        await asyncio.sleep(_backoff(attempts - 1))
+    except TimeoutError:
+        rec.status = "timeout"
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="LLM call timed out")
+    except Exception:
+        rec.status = "error"
+        raise
+    else:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            rec.prompt_tokens = usage.prompt_tokens or 0
+            rec.completion_tokens = usage.completion_tokens or 0
+        return response
+    finally:
+        rec.attempts = attempts
+        rec.latency_seconds = time.time() - started
+        if attempts:
+            llm_stats.record(rec)
+
+
+async def stream_chat_completion(
+    messages: list,
+    *,
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    deadline_seconds: Optional[float] = None,
+    estimated_prompt_tokens: Optional[int] = None,
+    usage: Optional[dict] = None,
+    **kwargs: Any,
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of `chat_completion`: yields content deltas as they arrive.
+
+    Same slots, per-user limit and deadline. Retries only happen before the
+    first chunk, since a partially consumed stream can't be replayed. Use it
+    under `contextlib.aclosing` so the slots are released if the consumer stops early.
+    Token usage reported at the end of the stream is copied into `usage` if
+    given, along with the choice's `finish_reason` ("stop" unless the output was cut).
+    """
+    model = model or settings.OPENAI_MODEL
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (deadline_seconds or settings.LLM_DEADLINE_SECONDS)
+    uid = str(user_id) if user_id is not None else None
+    started = time.time()
+    attempts = 0
+    rec = LLMCallRecord(
+        model=model, user_id=uid, started_at=started, latency_seconds=0.0, attempts=0,
+        estimated_prompt_tokens=estimated_prompt_tokens,
+    )
+
+    def remaining() -> float:
+        left = deadline - loop.time()
+        if left <= 0:
+            raise TimeoutError
+        return left
+
+    try:
+        async with _user_slot(uid):
+            await asyncio.wait_for(_get_global_slots().acquire(), remaining())
+            try:
+                while True:
+                    attempts += 1
+                    try:
+                        stream = await asyncio.wait_for(
+                            get_llm_client().chat.completions.create(
+                                model=model, messages=messages, temperature=temperature,
+                                stream=True, stream_options={"include_usage": True}, **kwargs
+                            ),
+                            remaining(),
+                        )
+                        break
+                    except Exception as exc:
+                        if not _retryable(exc) or attempts > settings.LLM_MAX_RETRIES:
+                            raise
+                        await asyncio.sleep(min(_backoff(attempts - 1), remaining()))
+
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.usage is not None:
+                        rec.prompt_tokens = chunk.usage.prompt_tokens or 0
+                        rec.completion_tokens = chunk.usage.completion_tokens or 0
+                        if usage is not None:
+                            usage.update(prompt_tokens=rec.prompt_tokens,
+                                         completion_tokens=rec.completion_tokens)
+                    for choice in chunk.choices:
+                        if choice.finish_reason and usage is not None:
+                            usage["finish_reason"] = choice.finish_reason
+                        delta = choice.delta.content if choice.delta else None
+                        if delta:
+                            if rec.first_token_seconds is None:
+                                rec.first_token_seconds = time.time() - started
+                            yield delta
+            finally:
+                _get_global_slots().release()
+    except TimeoutError:
+        rec.status = "timeout"
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="LLM call timed out")
+    except (GeneratorExit, asyncio.CancelledError):
+        rec.status = "cancelled"
+        raise
+    except Exception:
+        rec.status = "error"
+        raise
+    finally:
+        rec.attempts = attempts
+        rec.latency_seconds = time.time() - started
+        if attempts:
+            llm_stats.record(rec)
@@ -0,0 +1,66 @@
+# incremental extraction of objects from a JSON document that is still arriving
+import json
+from typing import List
+
+
+class ObjectStream:
+    """
+    Feed text chunks of a JSON document; get back every object that sits
+    directly inside an array as soon as its closing brace arrives.
+
+    For `{"sentences": [{...}, {...}]}` that means each change object is
+    returned while the rest of the completion is still streaming. The scanner
+    only tracks string/escape state and a container stack, so each character
+    is looked at once.
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._start = -1
+        self._start_depth = 0
+        self._pos = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        self._buf.append(chunk)
+        text = "".join(self._buf)
+        found: List[dict] = []
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._start < 0 and self._stack and self._stack[-1] == "[":
+                    self._start = i
+                    self._start_depth = len(self._stack)
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._start >= 0 and len(self._stack) == self._start_depth:
+                    try:
+                        obj = json.loads(text[self._start:i + 1])
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        found.append(obj)
+                    self._start = -1
+
+        # Keep only what an unfinished object still needs
+        keep_from = self._start if self._start >= 0 else len(text)
+        self._buf = [text[keep_from:]]
+        self._start = 0 if self._start >= 0 else -1
+        self._pos = len(text) - keep_from
+        return found
@@ -0,0 +1,214 @@
+# compact, token-budgeted prompt construction for resume tailoring
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+# Only these sections are rewritten; everything else stays local
+REWRITE_SECTIONS = ("Summary", "Skills", "Experience", "Projects")
+
+INSTRUCTIONS = (
+    "You are an expert resume writer. Given the resume JSON and the job "
+    "description below, rewrite the SUMMARY, SKILLS, EXPERIENCE, and PROJECTS "
+    "to highlight the most relevant aspects for this JD.\n"
+    "- Keep all content truthful (do not invent fake experiences).\n"
+    "- Improve impact with action verbs and metrics if possible.\n"
+    "- Ensure ATS-friendly phrasing (keywords from JD).\n"
+    "- Return valid JSON only, with the same keys as the resume JSON."
+)
+
+# Lines in a JD that carry no signal for tailoring
+JD_BOILERPLATE = re.compile(
+    r"equal opportunity|equal employment|affirmative action|without regard to"
+    r"|reasonable accommodation|e-?verify|privacy (policy|notice)|cookie"
+    r"|apply (now|today)|click (here|apply)|follow us|all rights reserved"
+    r"|recruitment agencies|background check",
+    re.IGNORECASE,
+)
+
+_WS = re.compile(r"[ \t\u00a0]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # Exact counts when tiktoken is installed; it is optional
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for `text`; falls back to ~4 characters per token."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def compact_json(data) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def clean_job_description(text: str) -> str:
+    """Collapse whitespace, drop boilerplate lines and repeated lines/sentences."""
+    seen = set()
+    kept: List[str] = []
+    for raw_line in text.splitlines():
+        line = _WS.sub(" ", raw_line).strip(" \t-•*")
+        if not line or JD_BOILERPLATE.search(line):
+            continue
+        sentences = []
+        for sentence in _SENTENCE_SPLIT.split(line):
+            norm = re.sub(r"\W+", " ", sentence).strip().lower()
+            if not norm or norm in seen:
+                continue
+            seen.add(norm)
+            sentences.append(sentence)
+        if sentences:
+            kept.append(" ".join(sentences))
+    return "\n".join(kept)
+
+
+def select_sections(resume_json: dict) -> Dict[str, object]:
+    """The non-empty rewrite sections, in a fixed order."""
+    return {k: resume_json[k] for k in REWRITE_SECTIONS if resume_json.get(k)}
+
+
+@dataclass
+class BuiltPrompt:
+    messages: List[dict]
+    sections: Dict[str, object]
+    job_description: str
+    input_tokens: int
+    truncated: List[str] = field(default_factory=list)
+
+
+def _render(sections: Dict[str, object], jd: str) -> str:
+    return f"{INSTRUCTIONS}\n\nResume JSON:\n{compact_json(sections)}\n\nJob Description:\n{jd}"
+
+
+def build_tailor_prompt(resume_json: dict, job_description: str,
+                        token_budget: Optional[int] = None) -> BuiltPrompt:
+    """
+    Build the tailoring prompt within `token_budget` input tokens.
+
+    Truncation is deterministic: JD sentences are dropped from the end first
+    (down to PROMPT_MIN_JD_TOKENS), then the last bullet of whichever list
+    section is currently longest, ties going to the later section in
+    REWRITE_SECTIONS.
+    """
+    budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+    sections = {k: (list(v) if isinstance(v, list) else v) for k, v in select_sections(resume_json).items()}
+    jd = clean_job_description(job_description)
+    truncated: List[str] = []
+
+    tokens = count_tokens(_render(sections, jd))
+    if tokens > budget:
+        jd_units = [s for line in jd.splitlines() for s in _SENTENCE_SPLIT.split(line)]
+        while tokens > budget and len(jd_units) > 1 and count_tokens(jd) > settings.PROMPT_MIN_JD_TOKENS:
+            jd_units.pop()
+            jd = "\n".join(jd_units)
+            tokens = count_tokens(_render(sections, jd))
+            if "job_description" not in truncated:
+                truncated.append("job_description")
+
+    while tokens > budget:
+        lists = [(len(compact_json(v)), i, k) for i, (k, v) in enumerate(sections.items())
+                 if isinstance(v, list) and len(v) > 1]
+        if not lists:
+            break
+        _, _, key = max(lists)
+        sections[key].pop()
+        if key not in truncated:
+            truncated.append(key)
+        tokens = count_tokens(_render(sections, jd))
+
+    return BuiltPrompt(
+        messages=[{"role": "user", "content": _render(sections, jd)}],
+        sections=sections,
+        job_description=jd,
+        input_tokens=tokens,
+        truncated=truncated,
+    )
+
+
+EDIT_INSTRUCTIONS = (
+    "You are an expert resume writer. Below are the sentences of a resume and "
+    "a job description. Rewrite only the sentences that should change to "
+    "highlight the most relevant aspects for this JD.\n"
+    "- Keep all content truthful (do not invent fake experiences).\n"
+    "- Improve impact with action verbs and metrics if possible.\n"
+    "- Ensure ATS-friendly phrasing (keywords from JD).\n"
+    '- Return JSON only: {"sentences": [{"from_sentence": <exact original '
+    'sentence>, "to_sentence": <rewrite>, "bold_words": [...], "italic_words": [...]}]}'
+)
+
+
+def _render_edits(sentences: List[str], jd: str) -> str:
+    return f"{EDIT_INSTRUCTIONS}\n\nResume sentences:\n{compact_json(sentences)}\n\nJob Description:\n{jd}"
+
+
+def build_edit_prompt(sentences: List[str], job_description: str,
+                      token_budget: Optional[int] = None) -> BuiltPrompt:
+    """
+    Prompt asking for sentence-level edits, used by the streaming tailor path.
+    Same budget rules as `build_tailor_prompt`, with trailing resume
+    sentences dropped once the JD is at its minimum.
+    """
+    budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+    sentences = list(sentences)
+    jd = clean_job_description(job_description)
+    truncated: List[str] = []
+
+    tokens = count_tokens(_render_edits(sentences, jd))
+    if tokens > budget:
+        jd_units = [s for line in jd.splitlines() for s in _SENTENCE_SPLIT.split(line)]
+        while tokens > budget and len(jd_units) > 1 and count_tokens(jd) > settings.PROMPT_MIN_JD_TOKENS:
+            jd_units.pop()
+            jd = "\n".join(jd_units)
+            tokens = count_tokens(_render_edits(sentences, jd))
+            if "job_description" not in truncated:
+                truncated.append("job_description")
+
+    while tokens > budget and len(sentences) > 1:
+        sentences.pop()
+        if "sentences" not in truncated:
+            truncated.append("sentences")
+        tokens = count_tokens(_render_edits(sentences, jd))
+
+    return BuiltPrompt(
+        messages=[{"role": "user", "content": _render_edits(sentences, jd)}],
+        sections={"sentences": sentences},
+        job_description=jd,
+        input_tokens=tokens,
+        truncated=truncated,
+    )
+
+
+def merge_tailored(resume_json: dict, tailored: dict, prompt: Optional[BuiltPrompt] = None) -> dict:
+    """
+    Overlay the rewritten sections onto the full resume. Keys from the model
+    are matched case-insensitively; anything outside REWRITE_SECTIONS is ignored.
+    Bullets the token budget kept out of `prompt` are appended after the
+    rewritten ones, so a truncated section is never shortened.
+    """
+    if not isinstance(tailored, dict):
+        raise ValueError(f"Model response is a JSON {type(tailored).__name__}, not an object")
+    merged = dict(resume_json)
+    by_lower = {k.lower(): v for k, v in tailored.items() if isinstance(k, str)}
+    for key in REWRITE_SECTIONS:
+        if key.lower() not in by_lower:
+            continue
+        rewritten = by_lower[key.lower()]
+        if prompt is not None and key in prompt.truncated:
+            if not isinstance(rewritten, list):
+                continue  # can't tell which bullets it covers; keep the original
+            rewritten = list(rewritten) + list(resume_json[key][len(prompt.sections[key]):])
+        merged[key] = rewritten
+    return merged
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.executor import run_task
+
+# Bump when parser output changes so stale entries are never served
+PARSER_VERSION = "2"
+
+
+def parse_cache_key(data: bytes, parser: str, digest: Optional[str] = None) -> str:
+    """SHA-256 of the uploaded bytes, namespaced by parser name and version."""
+    return f"{digest or hashlib.sha256(data).hexdigest()}-{parser}-v{PARSER_VERSION}"
+
+
+class ParseCache:
+    """
+    Two-tier cache of parse results.
+    Memory tier: LRU bounded by the size of the serialized JSON, not entry count.
+    Disk tier (optional): one JSON file per key, so results survive restarts.
+    Memory hits are served inline; disk reads, writes and sweeps go to the
+    blob_io thread pool.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_files: int = 10000):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_files = disk_max_files
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    async def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(blob)
+
+        if not self.disk_dir:
+            with self._lock:
+                self.misses += 1
+            return None
+        return await run_task("blob_io", self._disk_load, key)
+
+    async def put(self, key: str, value: dict) -> None:
+        blob = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._remember(key, blob)
+        if self.disk_dir:
+            await run_task("blob_io", self._disk_put, key, blob)
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = blob
+        self._size += len(blob)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    # The disk tier runs on the blob_io pool, never on the event loop
+
+    def _disk_load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                blob = f.read()
+        except OSError:
+            blob = None
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, blob)
+        return json.loads(blob)
+
+    def _disk_put(self, key: str, blob: bytes) -> None:
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_writes += 1
+            sweep = self._disk_writes % 100 == 0
+        if sweep:
+            self._disk_sweep()
+
+    def _disk_sweep(self) -> None:
+        # Drop the oldest files once the directory grows past its limit
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+        except OSError:
+            return
+        excess = len(files) - self.disk_max_files
+        if excess <= 0:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for entry in files[:excess]:
+            try:
+                os.remove(entry.path)
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Drop the memory tier (benchmarks measure cold parses this way)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_dir": self.disk_dir,
+            }
+
+
+parse_cache = ParseCache(
+    max_bytes=settings.PARSE_CACHE_MAX_BYTES,
+    disk_dir=settings.PARSE_CACHE_DIR,
+    disk_max_files=settings.PARSE_CACHE_DISK_MAX_FILES,
+)
+
+
+async def parse_with_cache(parser: str, data: bytes, task: Callable,
+                           digest: Optional[str] = None) -> Tuple[dict, bool, Optional[int]]:
+    """
+    Return `(result, cache_hit, peak_bytes)` for `parser` run over `data`.
+    On a hit python-docx is never touched; on a miss `task(data)` runs on the
+    executor and its result is stored. Pass `digest` when the upload was
+    already hashed while it was read.
+    """
+    key = parse_cache_key(data, parser, digest)
+    cached = await parse_cache.get(key)
+    if cached is not None:
+        return cached, True, None
+
+    result, peak = await run_task("docx_parse", task, data)
+    await parse_cache.put(key, result)
+    return result, False, peak
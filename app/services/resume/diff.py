@@ -1,17 +1,203 @@
+# sentence-level diff: patience alignment with insert/delete/move/modify ops
+import difflib
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Two sentences in the same gap are a "modify" when at least this similar
+MODIFY_CUTOFF = 0.5
+# Gaps larger than this are paired by position instead of best match
+PAIRING_WINDOW = 32
+
+
+@dataclass
+class DiffOp:
+    op: str  # insert, delete, move, modify
+    old_index: Optional[int] = None
+    new_index: Optional[int] = None
+    old_text: Optional[str] = None
+    new_text: Optional[str] = None
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _lis(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Longest run of pairs increasing in both indices (pairs sorted by the first)."""
+    tails: List[int] = []  # new index at the end of the best run of each length
+    tail_idx: List[int] = []
+    prev: List[int] = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(k)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos else -1
+    run = []
+    k = tail_idx[-1] if tail_idx else -1
+    while k != -1:
+        run.append(pairs[k])
+        k = prev[k]
+    return run[::-1]
+
+
+def _align(a: List[str], b: List[str], a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+           out: List[Tuple[int, int]]) -> None:
+    """Append matched (i, j) pairs for a[a_lo:a_hi] vs b[b_lo:b_hi] to `out`, in order."""
+    # Common prefix and suffix are matched directly
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        out.append((a_lo, b_lo))
+        a_lo += 1
+        b_lo += 1
+    suffix = []
+    while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi -= 1
+        b_hi -= 1
+        suffix.append((a_hi, b_hi))
+    if a_lo < a_hi and b_lo < b_hi:
+        # Patience: anchor on sentences that occur exactly once on each side
+        count_a: Dict[str, int] = {}
+        for i in range(a_lo, a_hi):
+            count_a[a[i]] = count_a.get(a[i], 0) + 1
+        count_b: Dict[str, int] = {}
+        pos_b: Dict[str, int] = {}
+        for j in range(b_lo, b_hi):
+            count_b[b[j]] = count_b.get(b[j], 0) + 1
+            pos_b[b[j]] = j
+        pairs = [
+            (i, pos_b[a[i]]) for i in range(a_lo, a_hi)
+            if count_a[a[i]] == 1 and count_b.get(a[i]) == 1
+        ]
+        anchors = _lis(pairs)
+        if anchors:
+            i0, j0 = a_lo, b_lo
+            for i, j in anchors:
+                if i > i0 or j > j0:
+                    _align(a, b, i0, i, j0, j, out)
+                out.append((i, j))
+                i0, j0 = i + 1, j + 1
+            _align(a, b, i0, a_hi, j0, b_hi, out)
+        elif (a_hi - a_lo) * (b_hi - b_lo) <= PAIRING_WINDOW * PAIRING_WINDOW:
+            # Only repeated sentences left and the block is small: exact LCS
+            matcher = difflib.SequenceMatcher(None, a[a_lo:a_hi], b[b_lo:b_hi], autojunk=False)
+            for block in matcher.get_matching_blocks():
+                for k in range(block.size):
+                    out.append((a_lo + block.a + k, b_lo + block.b + k))
+    out.extend(reversed(suffix))
+
+
+def _pair_gap(a: List[str], b: List[str], olds: List[int], news: List[int]) -> List[Tuple[int, int]]:
+    """Pick (old, new) pairs inside one unmatched gap that look like edits of each other."""
+    pairs = []
+    if len(olds) > PAIRING_WINDOW or len(news) > PAIRING_WINDOW:
+        # Large gap: by position only, keeping the cost linear
+        for i, j in zip(olds, news):
+            m = difflib.SequenceMatcher(None, a[i], b[j], autojunk=False)
+            if m.real_quick_ratio() >= MODIFY_CUTOFF and m.quick_ratio() >= MODIFY_CUTOFF and m.ratio() >= MODIFY_CUTOFF:
+                pairs.append((i, j))
+        return pairs
+    # Small gap: greedy best match, keeping pairs in order
+    last_j = -1
+    for i in olds:
+        best, best_j = MODIFY_CUTOFF, None
+        for j in news:
+            if j <= last_j:
+                continue
+            m = difflib.SequenceMatcher(None, a[i], b[j], autojunk=False)
+            if m.real_quick_ratio() < best or m.quick_ratio() < best:
+                continue
+            ratio = m.ratio()
+            if ratio >= best:
+                best, best_j = ratio, j
+        if best_j is not None:
+            pairs.append((i, best_j))
+            last_j = best_j
+    return pairs
+
+
+def diff_sentences(old: List[str], new: List[str]) -> List[DiffOp]:
+    """
+    Operations turning `old` into `new`, sorted by position: `modify` for an
+    edited sentence, `move` for an unchanged sentence in a new place,
+    `insert` and `delete` for the rest. Unchanged sentences are omitted.
+    Sentences are compared with whitespace collapsed.
+    """
+    a = [_norm(s) for s in old]
+    b = [_norm(s) for s in new]
+    matched: List[Tuple[int, int]] = []
+    _align(a, b, 0, len(a), 0, len(b), matched)
+
+    ops: List[DiffOp] = []
+    deleted: List[int] = []
+    inserted: List[int] = []
+    # Walk the gaps between matched pairs
+    prev_i, prev_j = -1, -1
+    for i, j in matched + [(len(a), len(b))]:
+        if i == prev_i + 1 and j == prev_j + 1:
+            prev_i, prev_j = i, j
+            continue
+        olds = list(range(prev_i + 1, i))
+        news = list(range(prev_j + 1, j))
+        if olds and news:
+            pairs = _pair_gap(a, b, olds, news)
+            for pi, pj in pairs:
+                ops.append(DiffOp("modify", pi, pj, old[pi], new[pj]))
+            paired_old = {pi for pi, _ in pairs}
+            paired_new = {pj for _, pj in pairs}
+            olds = [x for x in olds if x not in paired_old]
+            news = [x for x in news if x not in paired_new]
+        deleted.extend(olds)
+        inserted.extend(news)
+        prev_i, prev_j = i, j
+
+    # A deleted sentence that reappears verbatim elsewhere is a move
+    removed_at: Dict[str, List[int]] = {}
+    for i in deleted:
+        removed_at.setdefault(a[i], []).append(i)
+    moved_old = set()
+    for j in inserted:
+        spots = removed_at.get(b[j])
+        if spots:
+            i = spots.pop(0)
+            moved_old.add(i)
+            ops.append(DiffOp("move", i, j, old[i], new[j]))
+        else:
+            ops.append(DiffOp("insert", None, j, None, new[j]))
+    for i in deleted:
+        if i not in moved_old:
+            ops.append(DiffOp("delete", i, None, old[i], None))
+
+    ops.sort(key=lambda o: (o.new_index if o.new_index is not None else o.old_index,
+                            o.old_index if o.old_index is not None else -1))
+    return ops
+
+
 def get_changed_sentences(original: dict, updated: dict):
+    """
+    Changes between two `{"sentences": [{"id", "text", ...}]}` documents,
+    aligned by content rather than by id, so an inserted sentence does not
+    make every later one look changed. Each entry has the updated sentence's
+    id; `from_sentence` is None for an inserted sentence.
+    """
     changed = {"sentences": []}
 
-    original_map = {s["id"]: s["text"] for s in original["sentences"]}
-
-    for upd in updated["sentences"]:
-        orig_text = original_map.get(upd["id"])
-        if orig_text != upd["text"]: 
-            changed["sentences"].append({
-                "id": upd["id"],
-                "from_sentence": orig_text,
-                "to_sentence": upd["text"],
-                "bold_words": upd.get("bold_words", []),
-                "italic_words": upd.get("italic_words", [])
-            })
+    old = original["sentences"]
+    new = updated["sentences"]
+    for op in diff_sentences([s["text"] for s in old], [s["text"] for s in new]):
+        if op.op not in ("modify", "insert"):
+            continue
+        upd = new[op.new_index]
+        changed["sentences"].append({
+            "id": upd["id"],
+            "op": op.op,
+            "from_sentence": op.old_text,
+            "to_sentence": upd["text"],
+            "bold_words": upd.get("bold_words", []),
+            "italic_words": upd.get("italic_words", [])
+        })
 
     return changed
@@ -1,34 +1,24 @@
-from docx import Document
-from docx2pdf import convert
+from app.services.resume.pdf import convert_file_once
+from app.services.resume.templates import template_registry
 
-def generate_resume_docx(resume_json: dict, template_docx: str, output_docx: str):
+
+def render_resume_docx(resume_json: dict, template_docx: str) -> bytes:
     """
-    Fill a DOCX template with tailored resume content.
-    Template must have placeholders like {{SUMMARY}}, {{SKILLS}}, etc.
+    Fill a DOCX template with tailored resume content and return the bytes.
+    Placeholders like {{SUMMARY}}, {{SKILLS}}, {{EXPERIENCE}} are read from
+    the matching resume_json keys, in the body, tables, headers and footers.
     """
-    doc = Document(template_docx)
-
-    for para in doc.paragraphs:
-        if "{{SUMMARY}}" in para.text:
-            para.text = resume_json.get("Summary", "")
-
-        if "{{SKILLS}}" in para.text:
-            para.text = ", ".join(resume_json.get("Skills", []))
-
-        if "{{EXPERIENCE}}" in para.text:
-            para.text = "\n".join(resume_json.get("Experience", []))
+    return template_registry.render(template_docx, resume_json)
 
-        if "{{EDUCATION}}" in para.text:
-            para.text = "\n".join(resume_json.get("Education", []))
 
-        if "{{PROJECTS}}" in para.text:
-            para.text = "\n".join(resume_json.get("Projects", []))
-
-        if "{{CERTIFICATIONS}}" in para.text:
-            para.text = "\n".join(resume_json.get("Certifications", []))
-
-    doc.save(output_docx)
+def generate_resume_docx(resume_json: dict, template_docx: str, output_docx: str):
+    """Fill a DOCX template with tailored resume content and save it to `output_docx`."""
+    with open(output_docx, "wb") as f:
+        f.write(render_resume_docx(resume_json, template_docx))
 
 def convert_to_pdf(input_docx: str, output_pdf: str):
-    """Convert DOCX to PDF (Windows/macOS with Word, Linux needs LibreOffice)."""
-    convert(input_docx, output_pdf)
+    """
+    Convert DOCX to PDF with a one-off headless LibreOffice run.
+    The API and job runner use the warm pool in `pdf.pdf_converter` instead.
+    """
+    convert_file_once(input_docx, output_pdf)
@@ -1,9 +1,12 @@
-from docx import Document
 import re
-import nltk
+
+from app.core.metrics import span
 
 # Using NLTK in Production can be triky
 def extract_sentences(docx_path: str):
+    import nltk  # imported here: it adds ~0.25 s to every worker's start-up
+    from docx import Document
+
     doc = Document(docx_path)
     sentences = []
     for para in doc.paragraphs:
@@ -15,7 +18,15 @@ def extract_sentences(docx_path: str):
 
 # Simpler version to extract sentences
 def extract_sentences_regex(docx_path: str):
-    doc = Document(docx_path)
+    from docx import Document  # imported here, in the pool worker, not with the app
+
+    with span("docx_load"):
+        doc = Document(docx_path)
+    with span("extract_sentences"):
+        return _split_sentences(doc)
+
+
+def _split_sentences(doc):
     sentences = []
     id_counter = 1
 
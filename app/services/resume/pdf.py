@@ -0,0 +1,488 @@
+# DOCX -> PDF through a pool of long-lived headless LibreOffice processes
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import observe_span
+from app.services.storage.blob import content_hash
+
+# Bump when conversion options change so cached PDFs are not served
+CONVERTER_VERSION = "1"
+
+PDF_FILTER = "writer_pdf_Export"
+
+# In cli mode the job's own subprocess timeout fires (and kills it) first;
+# the outer wait allows this much longer for that to happen
+CLI_TIMEOUT_MARGIN_SECONDS = 5.0
+
+
+class ConversionError(RuntimeError):
+    pass
+
+
+def find_soffice() -> Optional[str]:
+    if settings.PDF_SOFFICE_BINARY:
+        return shutil.which(settings.PDF_SOFFICE_BINARY)
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def _uno_available() -> bool:
+    try:
+        import uno  # noqa: F401  (ships with LibreOffice, e.g. the python3-uno package)
+    except ImportError:
+        return False
+    return True
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _group_rss(pgid: int) -> Optional[int]:
+    """Resident memory of every process in a process group (Linux /proc only)."""
+    total, page = 0, os.sysconf("SC_PAGE_SIZE")
+    try:
+        pids = [p for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    # soffice is a launcher; the real soffice.bin is a child in the same group
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+def _cli_convert(binary: str, profile: str, src: str, outdir: str, timeout: float,
+                 on_start: Optional[Callable[[subprocess.Popen], None]] = None) -> None:
+    proc = subprocess.Popen(
+        [binary, "--headless", "--nologo", "--norestore", "--nolockcheck",
+         f"-env:UserInstallation=file://{profile}",
+         "--convert-to", "pdf", "--outdir", outdir, src],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    if on_start is not None:
+        on_start(proc)
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_group(proc)
+        raise
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, binary)
+
+
+class _Office:
+    """
+    One soffice process with its own profile directory. With the `uno`
+    module it is started once and driven over a local socket; without it
+    each job is a `--convert-to` call that at least reuses a warm profile.
+    """
+
+    def __init__(self, binary: str, root: str, index: int, use_uno: bool):
+        self.binary = binary
+        self.dir = os.path.join(root, f"worker-{index}")
+        self.profile = os.path.join(self.dir, "profile")
+        self.use_uno = use_uno
+        self.proc: Optional[subprocess.Popen] = None
+        self.job_proc: Optional[subprocess.Popen] = None  # cli mode: the running --convert-to
+        self.desktop = None
+        self.jobs = 0
+        self.started_at = time.monotonic()
+        os.makedirs(self.profile, exist_ok=True)
+
+    def start(self, timeout: float) -> None:
+        if not self.use_uno:
+            return
+        port = _free_port()
+        self.proc = subprocess.Popen(
+            [self.binary, "--headless", "--invisible", "--nologo", "--nodefault",
+             "--norestore", "--nolockcheck",
+             f"-env:UserInstallation=file://{self.profile}",
+             f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self.desktop = self._connect(port, timeout)
+
+    def _connect(self, port: int, timeout: float):
+        import uno
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.proc.poll() is not None:
+                raise ConversionError(f"soffice exited during start-up ({self.proc.returncode})")
+            try:
+                ctx = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+                )
+                return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise ConversionError("soffice did not accept connections in time")
+                time.sleep(0.1)
+
+    @property
+    def alive(self) -> bool:
+        return not self.use_uno or (self.proc is not None and self.proc.poll() is None)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc is not None else None
+
+    def rss(self) -> Optional[int]:
+        return _group_rss(self.proc.pid) if self.alive and self.proc is not None else None
+
+    def convert(self, data: bytes, timeout: float) -> bytes:
+        """Blocking; run in a thread. Files live in this worker's directory only."""
+        with tempfile.TemporaryDirectory(dir=self.dir) as tmp:
+            src, dst = os.path.join(tmp, "in.docx"), os.path.join(tmp, "in.pdf")
+            with open(src, "wb") as f:
+                f.write(data)
+            if self.use_uno:
+                self._store_pdf(src, dst)
+            else:
+                try:
+                    _cli_convert(self.binary, self.profile, src, tmp, timeout, self._track)
+                finally:
+                    self.job_proc = None
+            self.jobs += 1
+            try:
+                with open(dst, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                raise ConversionError("LibreOffice produced no PDF") from None
+
+    def _track(self, proc: subprocess.Popen) -> None:
+        self.job_proc = proc
+
+    def _store_pdf(self, src: str, dst: str) -> None:
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def props(**values):
+            out = []
+            for name, value in values.items():
+                prop = PropertyValue()
+                prop.Name, prop.Value = name, value
+                out.append(prop)
+            return tuple(out)
+
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(src), "_blank", 0, props(Hidden=True, ReadOnly=True)
+        )
+        if doc is None:
+            raise ConversionError("LibreOffice could not open the document")
+        try:
+            doc.storeToURL(uno.systemPathToFileUrl(dst), props(FilterName=PDF_FILTER))
+        finally:
+            doc.close(True)
+
+    def kill(self) -> None:
+        for proc in (self.proc, self.job_proc):
+            if proc is not None and proc.poll() is None:
+                _kill_group(proc)
+
+    def stop(self) -> None:
+        if self.desktop is not None and self.alive:
+            try:
+                self.desktop.terminate()
+                self.proc.wait(timeout=5)
+            except Exception:
+                pass
+        self.kill()
+
+
+class _Job:
+    def __init__(self, data: bytes, future: asyncio.Future):
+        self.data = data
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class PdfConverter:
+    """
+    A fixed set of LibreOffice workers fed from one bounded queue.
+    A full queue is a 503 with Retry-After, like the executor pools. A job
+    that overruns PDF_TIMEOUT_SECONDS kills its worker; crashed workers are
+    started again on their next job, and each worker is recycled after
+    PDF_MAX_JOBS_PER_WORKER jobs or once it grows past PDF_MAX_WORKER_RSS_MB.
+    PDFs are cached by the SHA-256 of the DOCX, and identical conversions in
+    flight at the same time share one job.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None  # uno or cli, decided at start
+        self._binary: Optional[str] = None
+        self._root: Optional[str] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._offices: Dict[int, Optional[_Office]] = {}
+        # One per worker index: warm() and _serve() may both spawn the same one
+        self._spawn_locks: Dict[int, threading.Lock] = {}
+        self._start_lock = asyncio.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._cache_lock = threading.Lock()
+        self._latency: Deque[float] = deque(maxlen=500)
+        self._wait: Deque[float] = deque(maxlen=500)
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self.started = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._tasks:
+                return
+            self._binary = find_soffice()
+            if self._binary is None:
+                raise ConversionError("LibreOffice (soffice) was not found on PATH")
+            self.mode = "uno" if _uno_available() else "cli"
+            self._root = tempfile.mkdtemp(prefix="soffice-pool-")
+            self._queue = asyncio.Queue(maxsize=settings.PDF_QUEUE)
+            self._spawn_locks = {i: threading.Lock() for i in range(settings.PDF_WORKERS)}
+            self._tasks = [
+                asyncio.create_task(self._serve(i)) for i in range(settings.PDF_WORKERS)
+            ]
+
+    async def warm(self) -> None:
+        """Start the pool and its LibreOffice processes before the first job."""
+        await self.start()
+        await asyncio.gather(*(asyncio.to_thread(self._spawn, i) for i in range(settings.PDF_WORKERS)))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for index, office in list(self._offices.items()):
+            if office is not None:
+                await asyncio.to_thread(office.stop)
+            self._offices[index] = None
+        if self._root:
+            shutil.rmtree(self._root, ignore_errors=True)
+            self._root = None
+
+    # ---------------- cache ----------------
+
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        with self._cache_lock:
+            pdf = self._cache.get(key)
+            if pdf is not None:
+                self._cache.move_to_end(key)
+            return pdf
+
+    def _cache_put(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > settings.PDF_CACHE_MAX_BYTES:
+            return
+        with self._cache_lock:
+            if key in self._cache:
+                return
+            self._cache[key] = pdf
+            self._cache_size += len(pdf)
+            while self._cache_size > settings.PDF_CACHE_MAX_BYTES:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted)
+
+    # ---------------- conversion ----------------
+
+    async def convert(self, data: bytes) -> bytes:
+        key = f"{content_hash(data)}-v{CONVERTER_VERSION}"
+        pdf = self._cache_get(key)
+        if pdf is not None:
+            self.cache_hits += 1
+            return pdf
+        self.cache_misses += 1
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        await self.start()
+        if self._queue.full():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="PDF conversion is busy, please retry shortly",
+                headers={"Retry-After": str(settings.EXECUTOR_RETRY_AFTER_SECONDS)},
+            )
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        # Cache from the callback so a result still lands if every caller gave up
+        future.add_done_callback(lambda f: self._finish(key, f))
+        self._queue.put_nowait(_Job(data, future))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._cache_put(key, future.result())
+
+    def _spawn(self, index: int) -> _Office:
+        with self._spawn_locks[index]:
+            office = self._offices.get(index)
+            if office is not None and office.alive:
+                return office
+            office = _Office(self._binary, self._root, index, self.mode == "uno")
+            office.start(settings.PDF_START_TIMEOUT_SECONDS)
+            self._offices[index] = office
+            self.started += 1
+            return office
+
+    def _retire(self, index: int, crashed: bool = False) -> None:
+        office = self._offices.get(index)
+        self._offices[index] = None
+        if office is not None:
+            office.kill()
+        if crashed:
+            self.crashes += 1
+
+    async def _serve(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                continue
+            self.busy += 1
+            started = time.monotonic()
+            self._wait.append(started - job.queued_at)
+            limit = settings.PDF_TIMEOUT_SECONDS
+            if self.mode == "cli":
+                limit += CLI_TIMEOUT_MARGIN_SECONDS
+            try:
+                office = await asyncio.to_thread(self._spawn, index)
+                pdf = await asyncio.wait_for(
+                    asyncio.to_thread(office.convert, job.data, settings.PDF_TIMEOUT_SECONDS),
+                    limit,
+                )
+            except asyncio.TimeoutError:
+                # Kills the UNO process or the job's --convert-to process; the
+                # blocked call returns once it is gone
+                self.timeouts += 1
+                self.failed += 1
+                self._retire(index)
+                job.future.set_exception(ConversionError("PDF conversion timed out"))
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_exception(ConversionError("PDF converter stopped"))
+                raise
+            except Exception as exc:
+                self.failed += 1
+                office = self._offices.get(index)
+                if office is not None and not office.alive:
+                    self._retire(index, crashed=True)
+                if isinstance(exc, subprocess.TimeoutExpired):
+                    self.timeouts += 1
+                    exc = ConversionError("PDF conversion timed out")
+                elif isinstance(exc, subprocess.CalledProcessError):
+                    exc = ConversionError(f"LibreOffice exited with status {exc.returncode}")
+                job.future.set_exception(exc)
+            else:
+                self.completed += 1
+                self._latency.append(time.monotonic() - started)
+                observe_span("pdf_convert", self._latency[-1])
+                job.future.set_result(pdf)
+                rss = office.rss()
+                if office.jobs >= settings.PDF_MAX_JOBS_PER_WORKER or (
+                    rss is not None and rss > settings.PDF_MAX_WORKER_RSS_MB * 1024 * 1024
+                ):
+                    self.recycled += 1
+                    self._offices[index] = None
+                    await asyncio.to_thread(office.stop)
+            finally:
+                self.busy -= 1
+
+    def stats(self) -> dict:
+        latency = sorted(self._latency)
+
+        def pct(p: float) -> Optional[float]:
+            return round(latency[min(int(p * len(latency)), len(latency) - 1)], 4) if latency else None
+
+        return {
+            "mode": self.mode,
+            "binary": self._binary,
+            "workers": [
+                {"index": i, "pid": o.pid, "jobs": o.jobs, "rss_bytes": o.rss(),
+                 "age_seconds": round(time.monotonic() - o.started_at, 1)}
+                for i, o in sorted(self._offices.items()) if o is not None
+            ],
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max": settings.PDF_QUEUE,
+            "busy": self.busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycled": self.recycled,
+            "processes_started": self.started,
+            "latency_seconds": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "wait_seconds_avg": round(sum(self._wait) / len(self._wait), 4) if self._wait else None,
+            "cache": {
+                "entries": len(self._cache),
+                "bytes": self._cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "coalesced": self.coalesced,
+            },
+        }
+
+
+pdf_converter = PdfConverter()
+
+
+def convert_file_once(input_docx: str, output_pdf: str, timeout: float = 120.0) -> None:
+    """One-off synchronous conversion for scripts; the API goes through `pdf_converter`."""
+    binary = find_soffice()
+    if binary is None:
+        raise ConversionError("LibreOffice (soffice) was not found on PATH")
+    with tempfile.TemporaryDirectory(prefix="soffice-") as tmp:
+        _cli_convert(binary, os.path.join(tmp, "profile"), os.path.abspath(input_docx), tmp, timeout)
+        name = os.path.splitext(os.path.basename(input_docx))[0] + ".pdf"
+        shutil.move(os.path.join(tmp, name), output_pdf)
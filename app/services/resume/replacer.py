@@ -1,37 +1,202 @@
-from docx import Document
+from collections import deque
+from copy import deepcopy
+from typing import Dict, Iterator, List, Optional, Set
 
-def replace_and_style(doc, from_sentence, to_sentence, bold_words=None, italic_words=None):
-    bold_words = bold_words or []
-    italic_words = italic_words or []
+# WordprocessingML tags, spelled out so importing this module doesn't load python-docx
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_R = f"{{{W_NS}}}r"
+W_HYPERLINK = f"{{{W_NS}}}hyperlink"
+
+
+class _AhoCorasick:
+    """Multi-pattern substring matcher: one pass over the text finds every pattern it contains."""
+
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = nxt
+            self._out[state].add(index)
+
+        # Breadth-first pass to wire failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        """Return the indices of all patterns that occur in `text`."""
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            if self._out[state]:
+                found |= self._out[state]
+        return found
 
+
+def _iter_blocks(doc) -> Iterator[tuple]:
+    """
+    Yield ("para", paragraph) for body paragraphs, then ("cell", cell) for table cells.
+    Merged cells are returned by `row.cells` once per grid column they span,
+    so they are de-duplicated on their underlying <w:tc> element. The set
+    holds the elements themselves: lxml proxies are freed as soon as nothing
+    references them, and a freed proxy's id() is reused by the next one.
+    """
     for para in doc.paragraphs:
-        if from_sentence in para.text:
-            # Clear the paragraph text (remove old runs)
-            for run in para.runs:
-                run.text = ""
-
-            # Add styled replacement text word by word
-            for word in to_sentence.split(" "):
-                run = para.add_run(word + " ")
-                clean_word = word.strip(",.!?;:")
-
-                if clean_word in bold_words:
-                    run.bold = True
-                if clean_word in italic_words:
-                    run.italic = True
-
-    # Also check inside tables 
+        yield "para", para
+
+    seen_cells = set()
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
-                if from_sentence in cell.text:
-                    # Clear and rebuild cell
-                    cell.text = ""
-                    para = cell.add_paragraph()
-                    for word in to_sentence.split(" "):
-                        run = para.add_run(word + " ")
-                        clean_word = word.strip(",.!?;:")
-                        if clean_word in bold_words:
-                            run.bold = True
-                        if clean_word in italic_words:
-                            run.italic = True
\ No newline at end of file
+                if cell._tc in seen_cells:
+                    continue
+                seen_cells.add(cell._tc)
+                yield "cell", cell
+
+
+def _spans(to_sentence, bold_words, italic_words) -> List[tuple]:
+    """
+    Group the words of `to_sentence` into `(text, bold, italic)` spans of
+    identical formatting. The separating space goes with the earlier span,
+    so the spans join back to exactly `to_sentence`.
+    """
+    spans: List[list] = []
+    for word in to_sentence.split(" "):
+        clean_word = word.strip(",.!?;:")
+        fmt = (clean_word in bold_words, clean_word in italic_words)
+        if spans and spans[-1][1] == fmt:
+            spans[-1][0].append(word)
+        else:
+            spans.append([[word], fmt])
+    return [
+        (" ".join(words) + (" " if k < len(spans) - 1 else ""), bold, italic)
+        for k, (words, (bold, italic)) in enumerate(spans)
+    ]
+
+
+def _write_paragraph(para, to_sentence, bold_words, italic_words):
+    """
+    Replace the paragraph's runs with one run per formatting span. Every new
+    run starts from a copy of the old first run's properties (font, size,
+    colour, character style); only bold and italic are set from the change.
+    """
+    p = para._p
+    first = p.find(W_R)
+    base_rpr = first.rPr if first is not None else None
+
+    # Drop the old runs (and hyperlinks, whose text would otherwise survive)
+    for child in list(p):
+        if child.tag in (W_R, W_HYPERLINK):
+            p.remove(child)
+
+    for text, bold, italic in _spans(to_sentence, bold_words, italic_words):
+        run = para.add_run(text)
+        if base_rpr is not None:
+            run._r.insert(0, deepcopy(base_rpr))
+        # None clears a direct setting so unmarked words follow the style
+        run.bold = True if bold else None
+        run.italic = True if italic else None
+
+
+def _write_block(kind, block, to_sentence, bold_words, italic_words):
+    if kind == "para":
+        _write_paragraph(block, to_sentence, bold_words, italic_words)
+    else:
+        # Rewrite the cell's first paragraph in place and drop the others,
+        # keeping the cell's paragraph properties
+        paragraphs = block.paragraphs
+        for extra in paragraphs[1:]:
+            extra._p.getparent().remove(extra._p)
+        _write_paragraph(paragraphs[0], to_sentence, bold_words, italic_words)
+
+
+def replace_and_style(doc, from_sentence, to_sentence, bold_words=None, italic_words=None):
+    bold_words = bold_words or []
+    italic_words = italic_words or []
+
+    # Paragraphs first, then table cells
+    for kind, block in _iter_blocks(doc):
+        if from_sentence in block.text:
+            _write_block(kind, block, to_sentence, bold_words, italic_words)
+
+
+def _element(kind, block):
+    return block._p if kind == "para" else block._tc
+
+
+def replace_many(doc, changes: List[dict], written: Optional[set] = None) -> dict:
+    """
+    Apply a whole list of `{from_sentence, to_sentence, bold_words, italic_words}`
+    changes in a single traversal of the document.
+
+    Every paragraph and table cell is scanned once with an Aho-Corasick matcher
+    built over all `from_sentence` values. When several changes match the same
+    block, the earliest change in the list wins. Each block is rewritten at most
+    once, so unlike repeated `replace_and_style` calls a later change can never
+    re-match text written by an earlier one.
+
+    `written` carries that guarantee across calls when changes arrive one at a
+    time (streamed edits): blocks in it are skipped, and every block rewritten
+    here is added to it.
+
+    Returns a report with the number of rewritten blocks and the `from_sentence`
+    values that matched nowhere, that were applied to more than one block and
+    that matched only blocks an earlier change took (`shadowed`).
+    """
+    patterns = [change.get("from_sentence") or "" for change in changes]
+    matcher = _AhoCorasick(patterns)
+    match_counts = [0] * len(changes)  # blocks each change was applied to
+    lost = set()  # changes that matched a block an earlier change won
+    replaced = 0
+
+    for kind, block in _iter_blocks(doc):
+        if written is not None and _element(kind, block) in written:
+            continue
+        hits = matcher.find(block.text)
+        if not hits:
+            continue
+        winner = min(hits)
+        match_counts[winner] += 1
+        lost.update(index for index in hits if index != winner)
+
+        change = changes[winner]
+        _write_block(
+            kind,
+            block,
+            change["to_sentence"],
+            change.get("bold_words") or [],
+            change.get("italic_words") or [],
+        )
+        replaced += 1
+        if written is not None:
+            written.add(_element(kind, block))
+
+    return {
+        "replaced": replaced,
+        "unmatched": [patterns[i] for i, count in enumerate(match_counts) if count == 0 and i not in lost],
+        "ambiguous": [patterns[i] for i, count in enumerate(match_counts) if count > 1],
+        "shadowed": [patterns[i] for i, count in enumerate(match_counts) if count == 0 and i in lost],
+    }
@@ -1,8 +1,13 @@
 import re
 import difflib
-from typing import Dict, List, Union, Optional
-from docx import Document
-from docx.text.paragraph import Paragraph
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Union, Optional
+from app.core.metrics import span
+from app.services.resume.skill_names import skill_key
+
+if TYPE_CHECKING:
+    from docx.text.paragraph import Paragraph
 
 # Canonical sections and their aliases
 CANONICAL_SECTIONS = {
@@ -52,41 +57,133 @@ ALL_ALIASES = {alias: canon
 
 BULLET_PREFIX = re.compile(r"^(\u2022|•|-|–|—|\*|\u00B7|\>)\s+")
 
+# Matches difflib.get_close_matches(..., cutoff=0.8) used for headings
+FUZZY_CUTOFF = 0.8
+HEADING_MEMO_SIZE = 4096
+
+
+class _HeadingIndex:
+    """
+    Precomputed lookup that returns exactly what
+    `difflib.get_close_matches(text, names, n=1, cutoff=FUZZY_CUTOFF)` would,
+    without running SequenceMatcher against every name.
+
+    difflib only computes `ratio()` for names that pass `real_quick_ratio()`
+    (a bound on lengths) and `quick_ratio()` (a bound on shared characters).
+    The index keeps an inverted list from each character to the names that
+    contain it, so shared-character counts for every name come out of one
+    walk over the text's characters; only names passing both bounds reach
+    SequenceMatcher. Text longer than any name can match is rejected up front.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.lengths = [len(name) for name in self.names]
+        self.max_length = max(self.lengths)
+        self.postings: Dict[str, List[tuple]] = {}
+        for i, name in enumerate(self.names):
+            for ch, count in Counter(name).items():
+                self.postings.setdefault(ch, []).append((i, count))
+
+    @staticmethod
+    def _bound(matches: int, total: int) -> float:
+        # Same arithmetic as difflib's _calculate_ratio so float edges agree
+        return 2.0 * matches / total if total else 1.0
+
+    def best(self, text: str) -> Optional[str]:
+        la = len(text)
+        # No name can pass real_quick_ratio once text is this long
+        if self._bound(self.max_length, la + self.max_length) < FUZZY_CUTOFF:
+            return None
+
+        shared = [0] * len(self.names)
+        for ch, count in Counter(text).items():
+            for i, name_count in self.postings.get(ch, ()):
+                shared[i] += count if count < name_count else name_count
+
+        best: Optional[tuple] = None
+        for i, name in enumerate(self.names):
+            total = la + self.lengths[i]
+            if self._bound(min(la, self.lengths[i]), total) < FUZZY_CUTOFF:
+                continue
+            if self._bound(shared[i], total) < FUZZY_CUTOFF:
+                continue
+            score = difflib.SequenceMatcher(None, name, text).ratio()
+            if score >= FUZZY_CUTOFF and (best is None or (score, name) > best):
+                best = (score, name)
+        return best[1] if best else None
+
+
+@lru_cache(maxsize=1)
+def heading_indexes() -> tuple:
+    """(alias index, canonical index), built on first use or by the warm-up."""
+    return (
+        _HeadingIndex(ALL_ALIASES.keys()),
+        _HeadingIndex([c.lower() for c in CANONICAL_SECTIONS.keys()]),
+    )
+
+
 def _clean_line(s: str) -> str:
     s = s.strip()
     s = BULLET_PREFIX.sub("", s)
     return s.strip()
 
-def _canonical_from_text(text: str) -> Optional[str]:
-    """Map a heading text to a canonical section name using fuzzy matching."""
-    base = text.strip().rstrip(":").lower()
-    if not base:
-        return None
 
+@lru_cache(maxsize=HEADING_MEMO_SIZE)
+def _canonical_from_base(base: str) -> Optional[str]:
     # Exact alias
     if base in ALL_ALIASES:
         return ALL_ALIASES[base]
 
+    alias_index, canonical_index = heading_indexes()
+
     # Fuzzy match to aliases
-    close = difflib.get_close_matches(base, ALL_ALIASES.keys(), n=1, cutoff=0.8)
+    close = alias_index.best(base)
     if close:
-        return ALL_ALIASES[close[0]]
+        return ALL_ALIASES[close]
 
     # Fuzzy match to canonical section names
-    close_canon = difflib.get_close_matches(base, [c.lower() for c in CANONICAL_SECTIONS.keys()],
-                                            n=1, cutoff=0.8)
+    close_canon = canonical_index.best(base)
     if close_canon:
-        return close_canon[0].title()
+        return close_canon.title()
 
     return None
 
-def parse_resume_docx(file) -> Dict[str, Union[str, List[str]]]:
+
+def _canonical_from_text(text: str) -> Optional[str]:
+    """Map a heading text to a canonical section name using fuzzy matching."""
+    base = text.strip().rstrip(":").lower()
+    if not base:
+        return None
+    # Anything longer than the index can match never enters the memo
+    if len(base) > 2 * heading_indexes()[0].max_length:
+        return None
+    return _canonical_from_base(base)
+
+
+def _looks_like_heading(para: "Paragraph") -> bool:
+    """Style signal: a Heading/Title paragraph, or one whose text runs are all bold."""
+    style_name = (para.style.name if para.style is not None else "") or ""
+    if style_name.startswith(("Heading", "Title")):
+        return True
+    runs = [r for r in para.runs if r.text.strip()]
+    return bool(runs) and all(r.bold for r in runs)
+
+def parse_resume_docx(file, use_style: bool = False) -> Dict[str, Union[str, List[str]]]:
     """
     Parse a DOCX resume into JSON.
     Only canonical sections are returned; unmatched content goes to 'Other'.
+    With `use_style=True`, only heading-styled or all-bold paragraphs are
+    considered as section headings.
     """
-    doc = Document(file)
+    from docx import Document  # imported here, in the pool worker, not with the app
+
+    with span("docx_load"):
+        doc = Document(file)
+    with span("classify_sections"):
+        return _classify_sections(doc, use_style)
 
+def _classify_sections(doc, use_style: bool) -> Dict[str, Union[str, List[str]]]:
     # Initialize result with canonical buckets
     result: Dict[str, Union[str, List[str]]] = {
         "Summary": "",
@@ -111,7 +208,9 @@ def parse_resume_docx(file) -> Dict[str, Union[str, List[str]]]:
             continue
 
         # Detect heading
-        canon = _canonical_from_text(text)
+        canon = None
+        if not use_style or _looks_like_heading(para):
+            canon = _canonical_from_text(text)
         if canon:
             current_section = canon
             continue
@@ -134,11 +233,11 @@ def parse_resume_docx(file) -> Dict[str, Union[str, List[str]]]:
         else:
             result[current_section].append(cleaned)
 
-    # Deduplicate skills
+    # Deduplicate skills ("JS" and "JavaScript" count as one)
     seen = set()
     unique_skills = []
     for s in result["Skills"]:
-        key = s.lower()
+        key = skill_key(s)
         if key not in seen:
             seen.add(key)
             unique_skills.append(s)
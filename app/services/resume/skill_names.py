@@ -0,0 +1,61 @@
+# skill name normalization; no DB imports so the parse workers can use it
+import re
+
+# Alternate spellings -> canonical key
+ALIASES = {
+    "js": "javascript", "ecmascript": "javascript", "java script": "javascript",
+    "ts": "typescript",
+    "py": "python", "python3": "python", "python 3": "python",
+    "golang": "go",
+    "node": "node.js", "nodejs": "node.js", "node js": "node.js",
+    "react.js": "react", "reactjs": "react", "react js": "react",
+    "vue.js": "vue", "vuejs": "vue",
+    "angularjs": "angular",
+    "next.js": "nextjs", "next js": "nextjs",
+    "postgres": "postgresql", "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "gcp": "google cloud", "google cloud platform": "google cloud",
+    "ml": "machine learning", "dl": "deep learning",
+    "nlp": "natural language processing",
+    "cpp": "c++", "csharp": "c#", "c sharp": "c#",
+    "dotnet": ".net", "dot net": ".net",
+    "sklearn": "scikit-learn", "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+}
+
+# How canonical keys are written when a new row has to be created
+DISPLAY_NAMES = {
+    "javascript": "JavaScript", "typescript": "TypeScript", "python": "Python",
+    "go": "Go", "node.js": "Node.js", "react": "React", "vue": "Vue",
+    "angular": "Angular", "nextjs": "Next.js", "postgresql": "PostgreSQL",
+    "mongodb": "MongoDB", "kubernetes": "Kubernetes", "aws": "AWS",
+    "google cloud": "Google Cloud", "machine learning": "Machine Learning",
+    "deep learning": "Deep Learning", "natural language processing": "Natural Language Processing",
+    "c++": "C++", "c#": "C#", ".net": ".NET", "scikit-learn": "scikit-learn",
+    "tensorflow": "TensorFlow", "sql": "SQL", "html": "HTML", "css": "CSS",
+}
+
+_WS = re.compile(r"\s+")
+# Bullets, brackets and separators at the edges; "+", "#" and a leading "." are kept (C++, C#, .NET)
+_EDGE_LEFT = re.compile(r"^[\s\-–—•*·,;:()\[\]{}\"']+")
+_EDGE_RIGHT = re.compile(r"[\s\-–—•*·.,;:()\[\]{}\"']+$")
+
+
+def clean_skill(raw: str) -> str:
+    """Strip bullets and edge punctuation and collapse whitespace, keeping case."""
+    text = _WS.sub(" ", raw)
+    text = _EDGE_RIGHT.sub("", _EDGE_LEFT.sub("", text))
+    return text
+
+
+def skill_key(raw: str) -> str:
+    """Normalized lookup key: cleaned, lower-cased, aliases resolved."""
+    key = clean_skill(raw).lower()
+    return ALIASES.get(key, key)
+
+
+def display_name(raw: str) -> str:
+    key = skill_key(raw)
+    return DISPLAY_NAMES.get(key) or clean_skill(raw)
@@ -0,0 +1,122 @@
+# process-local dictionary of skills rows, with name normalization and bulk resolve
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import SessionFactory
+from app.db.models import Skill
+from app.services.resume.skill_names import clean_skill, display_name, skill_key
+
+# Re-read rows created this long before the watermark, for commits that landed out of order
+_REFRESH_OVERLAP = timedelta(seconds=60)
+# skills.name length; longer "skills" are parse noise (whole sentences) and are skipped
+MAX_NAME_LENGTH = Skill.__table__.c.name.type.length
+
+
+class SkillDictionary:
+    """
+    Normalized skill key -> `skills.id`, for every row in the table.
+    Ids are held as 16-byte strings to keep the map small. Reads are plain
+    dict lookups; refreshes and inserts are serialized by one asyncio lock.
+    New rows are written and committed in their own session, so an id is
+    only ever cached once it exists for everyone.
+    """
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = refresh_seconds
+        self._ids: Dict[str, bytes] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inserted = 0
+        self.refreshes = 0
+        self.too_long = 0
+
+    def _add_rows(self, rows: Iterable) -> None:
+        for skill_id, name, created_at in rows:
+            # setdefault: when legacy rows collide after normalization, the first one wins
+            self._ids.setdefault(skill_key(name), skill_id.bytes)
+            if created_at is not None and (self._watermark is None or created_at > self._watermark):
+                self._watermark = created_at
+
+    async def refresh(self, db: Optional[AsyncSession] = None) -> int:
+        """Load rows created since the last refresh (all rows the first time)."""
+        stmt = select(Skill.id, Skill.name, Skill.created_at)
+        if self._watermark is not None:
+            stmt = stmt.where(Skill.created_at >= self._watermark - _REFRESH_OVERLAP)
+        if db is None:
+            async with SessionFactory() as session:
+                rows = (await session.execute(stmt)).all()
+        else:
+            rows = (await db.execute(stmt)).all()
+        before = len(self._ids)
+        self._add_rows(rows)
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+        return len(self._ids) - before
+
+    def lookup(self, raw: str) -> Optional[UUID]:
+        skill_id = self._ids.get(skill_key(raw))
+        return UUID(bytes=skill_id) if skill_id is not None else None
+
+    async def resolve(self, names: List[str]) -> Dict[str, UUID]:
+        """
+        Map raw skill names to ids, creating the unknown ones in one batch.
+        The result is keyed by the raw strings given; blank names and names
+        longer than MAX_NAME_LENGTH are skipped.
+        """
+        keys = {raw: skill_key(raw) for raw in names if clean_skill(raw)}
+        for raw, key in list(keys.items()):
+            if key not in self._ids and len(display_name(raw)) > MAX_NAME_LENGTH:
+                del keys[raw]
+                self.too_long += 1
+        missing = {key for key in keys.values() if key not in self._ids}
+        self.hits += len(keys) - sum(1 for k in keys.values() if k in missing)
+        self.misses += sum(1 for k in keys.values() if k in missing)
+
+        if missing:
+            async with self._lock:
+                if self._refreshed_at < time.monotonic() - self.refresh_seconds or self._watermark is None:
+                    await self.refresh()
+                missing = {key for key in missing if key not in self._ids}
+                if missing:
+                    await self._insert(missing, keys)
+
+        return {raw: UUID(bytes=self._ids[key]) for raw, key in keys.items()}
+
+    async def _insert(self, missing: set, keys: Dict[str, str]) -> None:
+        names = {}
+        for raw, key in keys.items():
+            if key in missing and key not in names:
+                names[key] = display_name(raw)
+        stmt = insert(Skill).values([{"name": name} for name in names.values()])
+        # DO UPDATE (a no-op write) rather than DO NOTHING so rows another worker created are RETURNed too
+        stmt = stmt.on_conflict_do_update(index_elements=[Skill.name], set_={"name": stmt.excluded.name})
+        async with SessionFactory() as session:
+            res = await session.execute(stmt.returning(Skill.id, Skill.name, Skill.created_at))
+            rows = res.all()
+            await session.commit()
+        self._add_rows(rows)
+        self.inserted += len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserted": self.inserted,
+            "refreshes": self.refreshes,
+            "too_long": self.too_long,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+skill_dictionary = SkillDictionary()
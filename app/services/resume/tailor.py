@@ -1,14 +1,38 @@
 import json
 import os
-from openai import OpenAI
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional
 from app.core.config import settings
+from app.services.llm.cache import llm_cache, llm_cache_key
+from app.services.llm.client import chat_completion, stream_chat_completion
+from app.services.llm.json_stream import ObjectStream
+from app.services.llm.prompt import build_edit_prompt, build_tailor_prompt, merge_tailored
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# Bump whenever the prompt text changes so cached responses are not reused
+PROMPT_VERSION = "2"
+EDIT_PROMPT_VERSION = "edits-1"
+TEMPERATURE = 0.7
 
-def tailor_resume_with_jd(resume_json: dict, job_description: str, use_demo: bool = False) -> dict:
+
+async def tailor_resume_with_jd(
+    resume_json: dict,
+    job_description: str,
+    use_demo: bool = False,
+    user_id: Optional[str] = None,
+    bypass_cache: bool = False,
+    refresh_cache: bool = False,
+) -> dict:
     """
     Tailor resume JSON according to a job description.
     If use_demo=True, load from demo.json instead of calling OpenAI.
+    The call goes through the shared async client, so it never blocks the event loop.
+    Only the rewritten sections are sent, within PROMPT_TOKEN_BUDGET, and the
+    model's output is merged back into the full resume here; bullets cut by
+    the budget are kept as they were.
+    Responses are cached on (sent sections, cleaned JD, model, temperature,
+    prompt version): `bypass_cache` neither reads nor writes the cache,
+    `refresh_cache` skips the read but stores the fresh response.
     """
 
     if use_demo:
@@ -16,29 +40,86 @@ def tailor_resume_with_jd(resume_json: dict, job_description: str, use_demo: boo
         with open(demo_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
-    prompt = f"""
-    You are an expert resume writer.
-    Given the resume JSON and the job description below,
-    rewrite the SUMMARY, SKILLS, EXPERIENCE, and PROJECTS to highlight
-    the most relevant aspects for this JD.
+    prompt = build_tailor_prompt(resume_json, job_description)
+
+    model = settings.OPENAI_MODEL
+    key = llm_cache_key(prompt.sections, prompt.job_description, model, TEMPERATURE, PROMPT_VERSION)
+    if not bypass_cache and not refresh_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return merge_tailored(resume_json, cached, prompt)
+
+    started = time.perf_counter()
+    response = await chat_completion(
+        prompt.messages,
+        user_id=user_id,
+        model=model,
+        temperature=TEMPERATURE,
+        estimated_prompt_tokens=prompt.input_tokens,
+    )
+    latency = time.perf_counter() - started
 
-    - Keep all content truthful (do not invent fake experiences).
-    - Improve impact with action verbs and metrics if possible.
-    - Ensure ATS-friendly phrasing (keywords from JD).
-    - Return valid JSON only.
+    tailored_sections = json.loads(response.choices[0].message.content)
+    merged = merge_tailored(resume_json, tailored_sections, prompt)  # rejects a non-object before caching
 
-    Resume JSON:
-    {json.dumps(resume_json, indent=2)}
+    if not bypass_cache:
+        usage = response.usage
+        await llm_cache.put(
+            key, tailored_sections, model=model, prompt_version=PROMPT_VERSION,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            latency_seconds=latency,
+        )
+    return merged
 
-    Job Description:
-    {job_description}
+
+async def stream_tailored_edits(
+    sentences: List[str],
+    job_description: str,
+    user_id: Optional[str] = None,
+    bypass_cache: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    Yield `{from_sentence, to_sentence, bold_words, italic_words}` edits for the
+    resume sentences one by one, as soon as each object is complete in the
+    model's streamed JSON. A cached edit list is replayed without calling the
+    model; only a stream that finished cleanly is cached, since one cut off at
+    the token limit (or by the client) has lost its trailing edits.
     """
+    prompt = build_edit_prompt(sentences, job_description)
+    model = settings.OPENAI_MODEL
+    key = llm_cache_key(prompt.sections, prompt.job_description, model, TEMPERATURE, EDIT_PROMPT_VERSION)
+
+    if not bypass_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            for edit in cached.get("sentences", []):
+                yield edit
+            return
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
+    parser = ObjectStream()
+    edits: List[dict] = []
+    usage = {"prompt_tokens": prompt.input_tokens, "completion_tokens": 0, "finish_reason": None}
+    started = time.perf_counter()
+    stream = stream_chat_completion(
+        prompt.messages,
+        user_id=user_id,
+        model=model,
+        temperature=TEMPERATURE,
+        estimated_prompt_tokens=prompt.input_tokens,
+        usage=usage,
+        response_format={"type": "json_object"},
     )
+    async with aclosing(stream):
+        async for delta in stream:
+            for obj in parser.feed(delta):
+                if obj.get("from_sentence") and "to_sentence" in obj:
+                    edits.append(obj)
+                    yield obj
 
-    tailored_json = json.loads(response.choices[0].message.content)
-    return tailored_json
+    if not bypass_cache and usage["finish_reason"] == "stop":
+        await llm_cache.put(
+            key, {"sentences": edits}, model=model, prompt_version=EDIT_PROMPT_VERSION,
+            prompt_tokens=usage["prompt_tokens"], completion_tokens=usage["completion_tokens"],
+            latency_seconds=time.perf_counter() - started,
+        )
@@ -0,0 +1,112 @@
+# Module-level entry points for the executor pools.
+# Everything here must stay picklable: plain arguments in, plain values out.
+# Documents travel as bytes and are parsed and saved through BytesIO, so
+# nothing touches the disk.
+import io
+import os
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.services.resume.parser import extract_sentences_regex
+from app.services.resume.replacer import replace_and_style, replace_many
+from app.services.resume.resume import heading_indexes, parse_resume_docx
+
+
+def _save(doc) -> bytes:
+    with span("docx_save"):
+        buf = io.BytesIO()
+        doc.save(buf)
+        return buf.getvalue()
+
+
+def _load(data: bytes):
+    from docx import Document  # python-docx loads in the workers, not with the app
+
+    with span("docx_load"):
+        return Document(io.BytesIO(data))
+
+
+# Thread-pool helpers for work that keeps a live Document in this process
+# (streaming tailoring applies edits one at a time as they arrive).
+
+def load_document(data: bytes):
+    return _load(data)
+
+
+def apply_one_change(doc, change: dict, written: set) -> dict:
+    """One streamed edit; `written` holds the blocks earlier edits rewrote, which it won't touch."""
+    with span("replace"):
+        return replace_many(doc, [change], written)
+
+
+def save_document(doc) -> bytes:
+    return _save(doc)
+
+
+def _measured(fn: Callable, *args) -> Tuple[object, int | None]:
+    """
+    Call `fn(*args)` and return `(result, peak_bytes)`.
+    Peak Python heap is only traced when TRACE_PEAK_MEMORY is on; it is exact
+    per task in the process pool and approximate in thread mode.
+    """
+    if not settings.TRACE_PEAK_MEMORY or tracemalloc.is_tracing():
+        return fn(*args), None
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _extract(data: bytes) -> dict:
+    return extract_sentences_regex(io.BytesIO(data))
+
+
+def _replace(data: bytes, from_sentence: str, to_sentence: str,
+             bold_words: list, italic_words: list) -> bytes:
+    doc = _load(data)
+    with span("replace"):
+        replace_and_style(doc, from_sentence, to_sentence, bold_words, italic_words)
+    return _save(doc)
+
+
+def _apply(data: bytes, changes: list) -> Tuple[bytes, dict]:
+    doc = _load(data)
+    with span("replace"):
+        report = replace_many(doc, changes)
+    return _save(doc), report
+
+
+def extract_sentences_task(data: bytes) -> Tuple[dict, int | None]:
+    return _measured(_extract, data)
+
+
+def parse_resume_task(data: bytes) -> Tuple[dict, int | None]:
+    return _measured(parse_resume_docx, io.BytesIO(data))
+
+
+def replace_sentence_task(data: bytes, from_sentence: str, to_sentence: str,
+                          bold_words: list, italic_words: list) -> Tuple[bytes, int | None]:
+    return _measured(_replace, data, from_sentence, to_sentence, bold_words, italic_words)
+
+
+def apply_changes_task(data: bytes, changes: list) -> Tuple[Tuple[bytes, dict], int | None]:
+    return _measured(_apply, data, changes)
+
+
+def warm_worker(hold_seconds: float = 0.05) -> int:
+    """
+    Runs once per worker during warm-up. Unpickling this function has
+    already imported the parsers in the worker; this imports python-docx
+    and builds the heading indexes. Holding briefly makes each call land on
+    its own worker.
+    """
+    import docx  # noqa: F401
+
+    heading_indexes()
+    time.sleep(hold_seconds)
+    return os.getpid()
@@ -0,0 +1,266 @@
+# DOCX templates parsed once, with {{PLACEHOLDER}} locations indexed for rendering
+import io
+import os
+import re
+import threading
+import zipfile
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_P = f"{{{W_NS}}}p"
+W_T = f"{{{W_NS}}}t"
+W_BR = f"{{{W_NS}}}br"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z0-9_]+)\s*\}\}")
+
+# Parts that can hold placeholders: the body, headers, footers, notes
+TEXT_PART = re.compile(r"word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$")
+
+# List values are joined with this; anything not listed gets one line per item
+LIST_SEPARATORS = {"SKILLS": ", "}
+
+Path = Tuple[int, ...]
+
+
+def _path(root, el) -> Path:
+    steps = []
+    while el is not root:
+        parent = el.getparent()
+        steps.append(parent.index(el))
+        el = parent
+    return tuple(reversed(steps))
+
+
+def _resolve(root, path: Path):
+    for i in path:
+        root = root[i]
+    return root
+
+
+def _owner(t):
+    el = t.getparent()
+    while el is not None and el.tag != W_P:
+        el = el.getparent()
+    return el
+
+
+@dataclass
+class _Placeholder:
+    name: str
+    # (path of the w:t under the paragraph, start, end) for each text node the token touches
+    pieces: List[Tuple[Path, int, int]]
+
+
+@dataclass
+class _Slot:
+    part: str
+    path: Path  # of the w:p under the part root
+    placeholders: List[_Placeholder]
+
+
+@dataclass
+class Template:
+    path: str
+    mtime_ns: int
+    size: int
+    entries: List[Tuple[zipfile.ZipInfo, bytes]]
+    roots: Dict[str, "etree._Element"]  # parsed parts that have slots
+    slots: List[_Slot] = field(default_factory=list)
+
+    @property
+    def names(self) -> List[str]:
+        return sorted({ph.name for slot in self.slots for ph in slot.placeholders})
+
+
+def _index_paragraph(p) -> List[_Placeholder]:
+    texts = [t for t in p.iter(W_T) if _owner(t) is p]
+    full = "".join(t.text or "" for t in texts)
+    if "{{" not in full:
+        return []
+
+    # Offset of each text node in the paragraph's text
+    bounds, offset = [], 0
+    for t in texts:
+        bounds.append((offset, offset + len(t.text or "")))
+        offset += len(t.text or "")
+
+    found = []
+    for m in PLACEHOLDER.finditer(full):
+        pieces = []
+        for t, (lo, hi) in zip(texts, bounds):
+            if hi <= m.start() or lo >= m.end() or lo == hi:
+                continue
+            pieces.append((_path(p, t), max(m.start(), lo) - lo, min(m.end(), hi) - lo))
+        found.append(_Placeholder(m.group(1).upper(), pieces))
+    return found
+
+
+def load_template(path: str) -> Template:
+    """Read the package once and index every placeholder, including ones split across runs."""
+    from lxml import etree  # not imported with the app: templates load in warm-up or a worker
+
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    entries, roots, slots = [], {}, []
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for info in zf.infolist():
+            raw = zf.read(info)
+            entries.append((info, raw))
+            if not TEXT_PART.match(info.filename) or b"{{" not in raw:
+                continue
+            root = etree.fromstring(raw)
+            part_slots = []
+            for p in root.iter(W_P):
+                placeholders = _index_paragraph(p)
+                if placeholders:
+                    part_slots.append(_Slot(info.filename, _path(root, p), placeholders))
+            if part_slots:
+                roots[info.filename] = root
+                slots.extend(part_slots)
+    return Template(path, st.st_mtime_ns, st.st_size, entries, roots, slots)
+
+
+def _new_t(text: str):
+    from lxml import etree
+
+    t = etree.Element(W_T)
+    t.text = text
+    t.set(XML_SPACE, "preserve")
+    return t
+
+
+def _write_value(t, before: str, value: str, after: str) -> None:
+    """Put `value` into text node `t`; line breaks become <w:br/> in the same run."""
+    from lxml import etree
+
+    lines = value.split("\n")
+    t.text = before + lines[0] + (after if len(lines) == 1 else "")
+    t.set(XML_SPACE, "preserve")
+    anchor = t
+    for k, line in enumerate(lines[1:], start=2):
+        br = etree.Element(W_BR)
+        anchor.addnext(br)
+        nxt = _new_t(line + (after if k == len(lines) else ""))
+        br.addnext(nxt)
+        anchor = nxt
+
+
+def _fill(p, placeholder: _Placeholder, value: str) -> None:
+    # The value takes the formatting of the run the token starts in
+    nodes = [(_resolve(p, path), start, end) for path, start, end in placeholder.pieces]
+    first, start, end = nodes[0]
+    text = first.text or ""
+    if len(nodes) == 1:
+        _write_value(first, text[:start], value, text[end:])
+        return
+    for t, s, e in nodes[1:-1]:
+        t.text = (t.text or "")[:s] + (t.text or "")[e:]
+    last, s, e = nodes[-1]
+    last.text = (last.text or "")[e:]
+    last.set(XML_SPACE, "preserve")
+    _write_value(first, text[:start], value, "")
+
+
+def placeholder_value(resume_json: dict, name: str) -> str:
+    """`{{SKILLS}}` reads `Skills` (case-insensitive); lists are joined, missing keys are blank."""
+    wanted = name.replace("_", " ").lower()
+    for key, value in resume_json.items():
+        if key.replace("_", " ").lower() == wanted:
+            break
+    else:
+        return ""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATORS.get(name, "\n").join(str(v) for v in value)
+    return str(value)
+
+
+def render(template: Template, resume_json: dict) -> bytes:
+    """
+    Fill the template's slots in copies of the parts that have them and
+    write the package; every other part is written back byte for byte.
+    """
+    from lxml import etree
+
+    copies = {name: deepcopy(root) for name, root in template.roots.items()}
+    for slot in template.slots:
+        p = _resolve(copies[slot.part], slot.path)
+        # Right to left, so earlier offsets in shared text nodes stay valid
+        for placeholder in reversed(slot.placeholders):
+            _fill(p, placeholder, placeholder_value(resume_json, placeholder.name))
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for info, raw in template.entries:
+            root = copies.get(info.filename)
+            if root is not None:
+                raw = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+            zf.writestr(info, raw)
+    return buf.getvalue()
+
+
+class TemplateRegistry:
+    """
+    Templates by path. Each `get` stats the file and reloads it when its
+    mtime or size changed, so edited templates are picked up without a
+    restart. Rendering never touches the cached trees.
+    """
+
+    def __init__(self):
+        self._templates: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.reloads = 0
+        self.renders = 0
+
+    def get(self, path: str) -> Template:
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        template = self._templates.get(path)
+        if template is not None and (template.mtime_ns, template.size) == (st.st_mtime_ns, st.st_size):
+            return template
+        with self._lock:
+            current = self._templates.get(path)
+            if current is not None and current is not template:
+                return current  # another thread reloaded it meanwhile
+            template = load_template(path)
+            self._templates[path] = template
+            if current is None:
+                self.loads += 1
+            else:
+                self.reloads += 1
+            return template
+
+    def render(self, path: str, resume_json: dict) -> bytes:
+        data = render(self.get(path), resume_json)
+        self.renders += 1
+        return data
+
+    def preload(self, directory: str) -> int:
+        names = [n for n in sorted(os.listdir(directory)) if n.endswith(".docx") and not n.startswith("~$")]
+        for name in names:
+            self.get(os.path.join(directory, name))
+        return len(names)
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "reloads": self.reloads,
+            "renders": self.renders,
+            "templates": {
+                path: {"slots": len(t.slots), "placeholders": t.names}
+                for path, t in self._templates.items()
+            },
+        }
+
+
+template_registry = TemplateRegistry()
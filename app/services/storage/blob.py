@@ -0,0 +1,121 @@
+# content-addressed blob store: local filesystem or any S3-compatible endpoint
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from typing import Optional, Protocol
+
+from app.core.config import settings
+from app.core.executor import run_task
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(Protocol):
+    """Blobs are immutable and keyed by the SHA-256 of their content."""
+
+    def put(self, data: bytes) -> str: ...
+    def get(self, key: str) -> bytes: ...
+    def exists(self, key: str) -> bool: ...
+    def delete(self, key: str) -> None: ...
+
+
+class LocalBlobStore:
+    """Files under `root/ab/cd/<hash>`; writes go through a temp file and an atomic rename."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        key = content_hash(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key  # identical content is stored once
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore:
+    """
+    Objects under `prefix/<hash>`. `client` is anything with the boto3 S3
+    client's put_object/get_object/head_object/delete_object, so MinIO,
+    LocalStack or a test double can stand in for S3.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put(self, data: bytes) -> str:
+        key = content_hash(data)
+        if not self.exists(key):
+            self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+        return key
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as exc:
+            # botocore's ClientError carries the HTTP status; anything else is a real failure
+            code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    if settings.BLOB_BACKEND == "s3":
+        try:
+            import boto3  # optional; only needed for the S3 backend
+        except ImportError as exc:
+            raise RuntimeError("BLOB_BACKEND=s3 requires boto3") from exc
+        client = boto3.client("s3", endpoint_url=settings.BLOB_S3_ENDPOINT_URL)
+        return S3BlobStore(client, settings.BLOB_S3_BUCKET, settings.BLOB_S3_PREFIX)
+    return LocalBlobStore(settings.BLOB_DIR)
+
+
+async def put_blob(data: bytes, store: Optional[BlobStore] = None) -> str:
+    return await run_task("blob_io", (store or get_blob_store()).put, data)
+
+
+async def get_blob(key: str, store: Optional[BlobStore] = None) -> bytes:
+    return await run_task("blob_io", (store or get_blob_store()).get, key)
@@ -0,0 +1,22 @@
+# Standalone job worker: `python -m app.worker`
+# Runs the same JobRunner as the API process, so workers can be scaled
+# independently of API pods (set JOB_RUNNER_IN_PROCESS=false on the API).
+import asyncio
+
+from app.core.executor import shutdown_executors
+from app.services.jobs.runner import job_runner
+from app.services.llm.client import close_llm_client
+from app.services.resume.pdf import pdf_converter
+
+
+async def main():
+    try:
+        await job_runner.run_forever()
+    finally:
+        await close_llm_client()
+        await pdf_converter.stop()
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
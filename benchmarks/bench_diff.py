@@ -0,0 +1,77 @@
+"""
+Sentence diff on long synthetic CVs with random edits.
+
+    python -m benchmarks.bench_diff [--sizes 500 5000 50000] [--edits 20] [--seed 7]
+
+Compares diff_sentences against difflib.SequenceMatcher and counts how many
+changes the old id-based comparison would have reported.
+"""
+import argparse
+import difflib
+import random
+import time
+
+from app.services.resume.diff import diff_sentences
+
+WORDS = (
+    "led built designed shipped reduced improved migrated automated scaled "
+    "python react postgres kafka latency revenue pipeline team customers api "
+    "service platform cost reliability dashboard model training data cloud"
+).split()
+
+
+def make_cv(rng: random.Random, n: int) -> list:
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + f" ({i})."
+        for i in range(n)
+    ]
+
+
+def edit(rng: random.Random, sentences: list, edits: int) -> list:
+    out = list(sentences)
+    for e in range(edits):
+        kind = rng.choice(("insert", "delete", "modify", "move"))
+        k = rng.randrange(len(out))
+        if kind == "insert":
+            out.insert(k, f"Inserted sentence number {e} about {rng.choice(WORDS)}.")
+        elif kind == "delete":
+            del out[k]
+        elif kind == "modify":
+            out[k] = out[k].replace(" ", f" {rng.choice(WORDS)} ", 1)
+        else:
+            out.insert(rng.randrange(len(out)), out.pop(k))
+    return out
+
+
+def id_based_changes(old: list, new: list) -> int:
+    # What get_changed_sentences reported before: compare by position-derived id
+    return sum(1 for j, text in enumerate(new) if j >= len(old) or old[j] != text)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'sentences':>10} {'ops':>6} {'by id':>7} {'align ms':>10} {'difflib ms':>11}")
+    for n in args.sizes:
+        old = make_cv(rng, n)
+        new = edit(rng, old, args.edits)
+        ops, align_ms = timed(diff_sentences, old, new)
+        _, difflib_ms = timed(
+            lambda: difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        )
+        print(f"{n:>10} {len(ops):>6} {id_based_changes(old, new):>7} {align_ms:>10.1f} {difflib_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
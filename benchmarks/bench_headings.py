@@ -0,0 +1,161 @@
+"""
+Section-heading classification, difflib scans vs the heading index.
+
+    python -m benchmarks.bench_headings [--pages 25] [--strings 28000] [--repeat 5] [--seed 7]
+
+Checks parity first: every string of the seeded heading corpus (mutated
+aliases in several cases, bullet lines, random printable text) must
+classify the same as the old `difflib.get_close_matches` code, which is
+kept here as `legacy_canonical`. Then prints best-of-N times for the
+paragraphs of a synthetic CV, for parse_resume_docx on it, and for the
+corpus itself.
+"""
+import argparse
+import difflib
+import io
+import random
+import string
+import sys
+import time
+from typing import Callable, List, Optional
+
+from docx import Document
+
+from app.services.resume import resume
+from app.services.resume.resume import ALL_ALIASES, CANONICAL_SECTIONS, parse_resume_docx
+from benchmarks.corpus import make_resume
+
+
+def legacy_canonical(text: str) -> Optional[str]:
+    # What resume._canonical_from_text did before the heading index
+    base = text.strip().rstrip(":").lower()
+    if not base:
+        return None
+    if base in ALL_ALIASES:
+        return ALL_ALIASES[base]
+    close = difflib.get_close_matches(base, ALL_ALIASES.keys(), n=1, cutoff=0.8)
+    if close:
+        return ALL_ALIASES[close[0]]
+    close_canon = difflib.get_close_matches(base, [c.lower() for c in CANONICAL_SECTIONS.keys()],
+                                            n=1, cutoff=0.8)
+    if close_canon:
+        return close_canon[0].title()
+    return None
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(1, 3)):
+        op = rng.randrange(4)
+        k = rng.randrange(len(chars) + 1)
+        if op == 0:
+            chars.insert(k, rng.choice(string.ascii_lowercase + " "))
+        elif op == 1 and len(chars) > 1 and k < len(chars):
+            del chars[k]
+        elif op == 2 and k < len(chars):
+            chars[k] = rng.choice(string.ascii_lowercase)
+        elif k + 1 < len(chars):
+            chars[k], chars[k + 1] = chars[k + 1], chars[k]
+    return "".join(chars)
+
+
+def heading_corpus(seed: int = 7, size: int = 28000) -> List[str]:
+    """
+    Seeded strings around the classifier's edges: exact and misspelt
+    aliases and canonical names in several cases and punctuations, joined
+    aliases, bullet lines and random printable text of every length.
+    """
+    rng = random.Random(f"headings:{seed}")
+    names = list(ALL_ALIASES) + [c.lower() for c in CANONICAL_SECTIONS]
+    words = [w for name in names for w in name.split()] + ["led", "built", "the", "team", "python", "2019"]
+    out: List[str] = []
+    while len(out) < size:
+        kind = rng.randrange(6)
+        if kind == 0:
+            text = rng.choice(names)
+        elif kind == 1:
+            text = _mutate(rng, rng.choice(names))
+        elif kind == 2:
+            text = " ".join(rng.sample(names, 2))
+        elif kind == 3:
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 20)))
+        elif kind == 4:
+            text = "".join(rng.choice(string.printable[:95]) for _ in range(rng.randint(0, 60)))
+        else:
+            text = rng.choice(("• ", "- ", "* ", "")) + _mutate(rng, rng.choice(names)) + " " * rng.randrange(3)
+        form = rng.randrange(4)
+        if form == 1:
+            text = text.upper()
+        elif form == 2:
+            text = text.title() + ":"
+        out.append(text)
+    return out
+
+
+def mismatches(texts: List[str]) -> List[tuple]:
+    """(text, legacy, indexed) for every string the two classify differently."""
+    found = []
+    for text in texts:
+        old, new = legacy_canonical(text), resume._canonical_from_text(text)
+        if old != new:
+            found.append((text, old, new))
+    return found
+
+
+def best_of(repeat: int, fn: Callable, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        resume._canonical_from_base.cache_clear()  # cold memo each time
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def classify_all(classify: Callable, texts: List[str]) -> None:
+    for text in texts:
+        classify(text)
+
+
+def parse_with(classify: Callable, data: bytes) -> None:
+    current = resume._canonical_from_text
+    resume._canonical_from_text = classify
+    try:
+        parse_resume_docx(io.BytesIO(data))
+    finally:
+        resume._canonical_from_text = current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--strings", type=int, default=28000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = heading_corpus(args.seed, args.strings)
+    bad = mismatches(texts)
+    print(f"parity: {len(texts)} strings, {len(bad)} mismatches")
+    for text, old, new in bad[:20]:
+        print(f"  {text!r}: legacy {old!r}, indexed {new!r}")
+    if bad:
+        sys.exit(1)
+
+    data, _ = make_resume(args.seed, args.pages)
+    paragraphs = [p.text for p in Document(io.BytesIO(data)).paragraphs if p.text.strip()]
+    indexed = resume._canonical_from_text
+    rows = (
+        (f"classify {len(paragraphs)} CV paragraphs", classify_all, paragraphs),
+        (f"parse_resume_docx, {args.pages} pages", parse_with, data),
+        (f"classify {len(texts)} corpus strings", classify_all, texts),
+    )
+    print(f"{'':<40} {'difflib ms':>11} {'index ms':>10}")
+    for label, fn, arg in rows:
+        old_ms = best_of(args.repeat, fn, legacy_canonical, arg)
+        new_ms = best_of(args.repeat, fn, indexed, arg)
+        print(f"{label:<40} {old_ms:>11.1f} {new_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
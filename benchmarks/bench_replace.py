@@ -0,0 +1,123 @@
+"""
+Repeated tailoring passes over a synthetic CV, old word-per-run writer vs
+the run-coalescing one.
+
+    python -m benchmarks.bench_replace [--bullets 60] [--passes 5] [--seed 7]
+
+After each pass prints the number of <w:r> elements, the size of
+word/document.xml and the time python-docx takes to save the document.
+"""
+import argparse
+import io
+import random
+import time
+import zipfile
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import Pt
+
+from app.services.resume import replacer
+from benchmarks.bench_diff import WORDS
+
+
+def legacy_write_block(kind, block, to_sentence, bold_words, italic_words):
+    # What replacer._write_block did before: one run per word, cells rebuilt
+    if kind == "para":
+        for run in block.runs:
+            run.text = ""
+        para = block
+    else:
+        block.text = ""
+        para = block.add_paragraph()
+    for word in to_sentence.split(" "):
+        run = para.add_run(word + " ")
+        clean_word = word.strip(",.!?;:")
+        if clean_word in bold_words:
+            run.bold = True
+        if clean_word in italic_words:
+            run.italic = True
+
+
+def make_doc(rng: random.Random, bullets: int) -> tuple:
+    doc = Document()
+    sentences = []
+    for i in range(bullets):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30))).capitalize() + f" ({i})."
+        run = doc.add_paragraph(style="List Bullet").add_run(text)
+        run.font.name = "Calibri"
+        run.font.size = Pt(10.5)
+        sentences.append(text)
+    table = doc.add_table(rows=bullets // 10 or 1, cols=2)
+    for row in table.rows:
+        for cell in row.cells:
+            text = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize() + f" [{len(sentences)}]."
+            cell.text = text
+            sentences.append(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue(), sentences
+
+
+def tailor(rng: random.Random, sentences: list) -> list:
+    changes = []
+    for text in sentences:
+        words = text.split(" ")
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+        changes.append({
+            "from_sentence": text,
+            "to_sentence": " ".join(words),
+            "bold_words": rng.sample(WORDS, 2),
+            "italic_words": rng.sample(WORDS, 1),
+        })
+    return changes
+
+
+def measure(doc) -> tuple:
+    start = time.perf_counter()
+    buf = io.BytesIO()
+    doc.save(buf)
+    save_ms = (time.perf_counter() - start) * 1000
+    with zipfile.ZipFile(buf) as zf:
+        xml_bytes = len(zf.read("word/document.xml"))
+    runs = len(doc.element.body.findall(".//" + qn("w:r")))
+    return buf.getvalue(), runs, xml_bytes, save_ms
+
+
+def run_passes(data: bytes, sentences: list, passes: int, seed: int) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(passes):
+        changes = tailor(rng, sentences)
+        doc = Document(io.BytesIO(data))
+        replacer.replace_many(doc, changes)
+        data, runs, xml_bytes, save_ms = measure(doc)
+        sentences = [c["to_sentence"] for c in changes]
+        rows.append((runs, xml_bytes, save_ms))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bullets", type=int, default=60)
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    data, sentences = make_doc(random.Random(args.seed), args.bullets)
+    coalesced = run_passes(data, sentences, args.passes, args.seed)
+    current = replacer._write_block
+    replacer._write_block = legacy_write_block
+    try:
+        legacy = run_passes(data, sentences, args.passes, args.seed)
+    finally:
+        replacer._write_block = current
+
+    print(f"{'pass':>4} | {'runs':>6} {'xml KB':>8} {'save ms':>8} | {'legacy runs':>11} {'xml KB':>8} {'save ms':>8}")
+    for i, (new, old) in enumerate(zip(coalesced, legacy), start=1):
+        print(f"{i:>4} | {new[0]:>6} {new[1] / 1024:>8.1f} {new[2]:>8.1f} | "
+              f"{old[0]:>11} {old[1] / 1024:>8.1f} {old[2]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
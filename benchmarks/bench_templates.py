@@ -0,0 +1,97 @@
+"""
+Rendering many resumes from one template.
+
+    python -m benchmarks.bench_templates [--renders 1000] [--bullets 40] [--seed 7]
+
+Compares the template registry with the old reparse-and-scan generator and
+with the floor: saving an already-loaded Document, with no filling at all.
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+from docx import Document
+
+from app.services.resume.templates import TemplateRegistry
+from benchmarks.bench_diff import WORDS
+
+SECTIONS = ("SUMMARY", "SKILLS", "EXPERIENCE", "EDUCATION", "PROJECTS", "CERTIFICATIONS")
+
+
+def make_template(rng: random.Random, path: str, bullets: int) -> None:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Curriculum vitae"
+    for name in SECTIONS:
+        doc.add_heading(name.title(), level=2)
+        doc.add_paragraph("{{%s}}" % name)
+        for _ in range(bullets // len(SECTIONS)):
+            doc.add_paragraph(" ".join(rng.choice(WORDS) for _ in range(14)), style="List Bullet")
+    doc.save(path)
+
+
+def make_resume(rng: random.Random) -> dict:
+    def lines(n):
+        return [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(n)]
+    return {
+        "Summary": " ".join(rng.choice(WORDS) for _ in range(40)),
+        "Skills": rng.sample(WORDS, 8),
+        "Experience": lines(6),
+        "Education": lines(2),
+        "Projects": lines(3),
+        "Certifications": lines(2),
+    }
+
+
+def legacy_generate(resume_json: dict, template_docx: str) -> bytes:
+    # What generate_resume_docx did before: reparse, six scans per paragraph, body only
+    doc = Document(template_docx)
+    for para in doc.paragraphs:
+        if "{{SUMMARY}}" in para.text:
+            para.text = resume_json.get("Summary", "")
+        if "{{SKILLS}}" in para.text:
+            para.text = ", ".join(resume_json.get("Skills", []))
+        for name in SECTIONS[2:]:
+            if "{{%s}}" % name in para.text:
+                para.text = "\n".join(resume_json.get(name.title(), []))
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def timed(label: str, renders: int, fn) -> None:
+    start = time.perf_counter()
+    for i in range(renders):
+        fn(i)
+    total = time.perf_counter() - start
+    print(f"{label:<22} {total:>8.2f} s {total / renders * 1000:>8.2f} ms/render")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=1000)
+    parser.add_argument("--bullets", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng) for _ in range(50)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "template.docx")
+        make_template(rng, path, args.bullets)
+        registry = TemplateRegistry()
+        loaded = Document(path)
+
+        def save_only(i):
+            loaded.save(io.BytesIO())
+
+        timed("serialize only", args.renders, save_only)
+        timed("registry", args.renders, lambda i: registry.render(path, resumes[i % len(resumes)]))
+        timed("legacy", args.renders, lambda i: legacy_generate(resumes[i % len(resumes)], path))
+        print(f"template loads: {registry.loads}, reloads: {registry.reloads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Seeded synthetic DOCX resumes for the benchmarks.
+
+The same (seed, pages) always gives the same document. Headings are drawn
+from the aliases in CANONICAL_SECTIONS with varied case, punctuation and
+styling; bullets mix the "List Bullet" style with typed prefixes; skills
+and education can be laid out in tables.
+"""
+import io
+import random
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from docx import Document
+from docx.shared import Pt
+
+from app.services.resume.resume import CANONICAL_SECTIONS
+
+# Page counts covered by the suite
+SIZES = (1, 5, 10, 25, 50)
+
+# Roughly what fits on one page at 10.5pt
+LINES_PER_PAGE = 32
+
+VERBS = (
+    "Led", "Built", "Designed", "Shipped", "Reduced", "Improved", "Migrated",
+    "Automated", "Scaled", "Owned", "Mentored", "Launched", "Refactored",
+)
+NOUNS = (
+    "payment pipeline", "search service", "data platform", "React dashboard",
+    "Kafka consumers", "Postgres schema", "CI workflow", "recommendation model",
+    "billing API", "mobile onboarding", "observability stack", "ETL jobs",
+)
+RESULTS = (
+    "cutting p95 latency by {n}%", "saving ${n}k a year", "for {n} enterprise customers",
+    "raising conversion {n}%", "across {n} services", "with a team of {n} engineers",
+)
+SKILLS = (
+    "Python", "FastAPI", "PostgreSQL", "Kafka", "Docker", "Kubernetes", "AWS",
+    "React", "TypeScript", "Terraform", "Redis", "Go", "GraphQL", "Airflow", "Spark",
+)
+BULLET_PREFIXES = ("", "• ", "- ", "* ", "– ")
+
+
+def _sentence(rng: random.Random) -> str:
+    result = rng.choice(RESULTS).format(n=rng.randint(2, 90))
+    return f"{rng.choice(VERBS)} the {rng.choice(NOUNS)}, {result}."
+
+
+def _heading_text(rng: random.Random, section: str) -> str:
+    alias = rng.choice(CANONICAL_SECTIONS[section])
+    form = rng.randrange(4)
+    if form == 0:
+        return alias.upper()
+    if form == 1:
+        return alias.title() + ":"
+    return alias.title()
+
+
+def _add_heading(doc, rng: random.Random, section: str) -> None:
+    text = _heading_text(rng, section)
+    kind = rng.randrange(3)
+    if kind == 0:
+        doc.add_heading(text, level=rng.choice((1, 2)))
+    else:
+        run = doc.add_paragraph().add_run(text)
+        run.bold = kind == 1
+        run.font.size = Pt(12)
+
+
+def _add_bullet(doc, rng: random.Random, text: str, prefix: str) -> None:
+    if prefix:
+        para = doc.add_paragraph()
+    else:
+        para = doc.add_paragraph(style="List Bullet")
+    # Some bullets carry inline bold/italic spans, as real resumes do
+    words = (prefix + text).split(" ")
+    if rng.random() < 0.3 and len(words) > 4:
+        cut = rng.randrange(2, len(words) - 1)
+        para.add_run(" ".join(words[:cut]) + " ")
+        para.add_run(words[cut]).bold = True
+        para.add_run(" " + " ".join(words[cut + 1:]))
+    else:
+        para.add_run(prefix + text)
+
+
+def make_resume(seed: int, pages: int, tables: bool = True) -> Tuple[bytes, List[str]]:
+    """
+    A resume of about `pages` pages. Returns the .docx bytes and the bullet
+    sentences in document order (for diff and replace benchmarks).
+    """
+    rng = random.Random(f"{seed}:{pages}:{tables}")
+    doc = Document()
+    sentences: List[str] = []
+
+    doc.add_paragraph().add_run("Jordan Example").bold = True
+    doc.add_paragraph("jordan@example.com | +1 555 0100 | github.com/jordan")
+
+    _add_heading(doc, rng, "Summary")
+    summary = " ".join(_sentence(rng) for _ in range(3))
+    doc.add_paragraph(summary)
+
+    _add_heading(doc, rng, "Skills")
+    skills = rng.sample(SKILLS, 10)
+    if tables:
+        table = doc.add_table(rows=2, cols=5)
+        for cell, skill in zip((c for row in table.rows for c in row.cells), skills):
+            cell.text = skill
+    else:
+        doc.add_paragraph(", ".join(skills))
+
+    # Experience and projects fill the requested length
+    budget = max(pages * LINES_PER_PAGE - 20, 6)
+    role = 0
+    prefix = rng.choice(BULLET_PREFIXES)
+    for section in ("Experience", "Projects"):
+        _add_heading(doc, rng, section)
+        share = budget * 3 // 4 if section == "Experience" else budget // 4
+        written = 0
+        while written < share:
+            role += 1
+            doc.add_paragraph().add_run(f"Senior Engineer, Company {role} (2015 - 2020)").italic = True
+            for _ in range(rng.randint(3, 6)):
+                text = _sentence(rng)
+                _add_bullet(doc, rng, text, prefix)
+                sentences.append(text)
+                written += 1
+            if rng.random() < 0.2:
+                prefix = rng.choice(BULLET_PREFIXES)
+
+    _add_heading(doc, rng, "Education")
+    if tables:
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "BSc Computer Science, Example University"
+        table.cell(0, 1).text = "2011 - 2015"
+    else:
+        doc.add_paragraph("BSc Computer Science, Example University, 2011 - 2015")
+
+    _add_heading(doc, rng, "Certifications")
+    doc.add_paragraph("AWS Certified Solutions Architect")
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue(), sentences
+
+
+@lru_cache(maxsize=None)
+def corpus(seed: int = 7, sizes: Tuple[int, ...] = SIZES) -> Dict[int, Tuple[bytes, List[str]]]:
+    return {pages: make_resume(seed, pages) for pages in sizes}
+
+
+def edit_sentences(seed: int, sentences: List[str], edits: int) -> List[str]:
+    """A tailoring pass: reword, insert, drop and move a few sentences."""
+    rng = random.Random(f"edit:{seed}:{len(sentences)}")
+    out = list(sentences)
+    for _ in range(edits):
+        kind = rng.choice(("modify", "modify", "insert", "delete", "move"))
+        k = rng.randrange(len(out))
+        if kind == "modify":
+            out[k] = out[k].replace("the", f"the {rng.choice(('core', 'legacy', 'new'))}", 1)
+        elif kind == "insert":
+            out.insert(k, _sentence(rng))
+        elif kind == "delete" and len(out) > 1:
+            del out[k]
+        else:
+            out.insert(rng.randrange(len(out)), out.pop(k))
+    return out
@@ -0,0 +1,322 @@
+"""
+Benchmark suite for the resume services, on the seeded corpus in
+benchmarks/corpus.py.
+
+    python -m benchmarks.suite run [--quick] [--only SUBSTRING] [--out FILE]
+    python -m benchmarks.suite compare BASE.json NEW.json [--threshold 0.1]
+
+`run` times each micro-benchmark (one service function, in-process) and
+end-to-end benchmark (a request through the FastAPI app, with auth
+stubbed and no database) and writes the results as JSON, by default to
+benchmarks/results/<time>-<commit>.json. `compare` prints the change in
+median time per benchmark and exits with status 1 when any got slower by
+more than the threshold. The settings must load, so DATABASE_URL and
+JWT_SECRET_KEY have to be set (nothing connects to the database).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from docx import Document
+
+from app.services.resume.diff import get_changed_sentences
+from app.services.resume.generator import render_resume_docx
+from app.services.resume.parser import extract_sentences_regex
+from app.services.resume.replacer import replace_and_style, replace_many
+from app.services.resume.resume import parse_resume_docx
+from benchmarks import bench_templates
+from benchmarks.corpus import SIZES, corpus, edit_sentences
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+QUICK_SIZES = (1, 10)
+E2E_SIZES = (1, 10, 50)
+SEED = 7
+
+# name -> factory(pages, data, sentences) returning the zero-argument call to time
+_MICRO: Dict[str, Callable] = {}
+_E2E: Dict[str, Callable] = {}
+
+
+def micro(name: str):
+    def register(factory):
+        _MICRO[name] = factory
+        return factory
+    return register
+
+
+def e2e(name: str):
+    def register(factory):
+        _E2E[name] = factory
+        return factory
+    return register
+
+
+def _swap_changes(sentences: List[str], count: int) -> tuple:
+    """Changes that reword `count` sentences, and the changes that undo them."""
+    step = max(len(sentences) // count, 1)
+    forward, back = [], []
+    for s in sentences[::step][:count]:
+        new = s.replace("the", "the revised", 1)
+        forward.append({"from_sentence": s, "to_sentence": new, "bold_words": ["revised"], "italic_words": []})
+        back.append({"from_sentence": new, "to_sentence": s, "bold_words": [], "italic_words": []})
+    return forward, back
+
+
+# ======================================
+# MICRO
+# ======================================
+
+@micro("docx_load_save")
+def bench_load_save(pages, data, sentences):
+    # The floor every DOCX operation pays
+    return lambda: Document(io.BytesIO(data)).save(io.BytesIO())
+
+
+@micro("extract_sentences_regex")
+def bench_extract(pages, data, sentences):
+    return lambda: extract_sentences_regex(io.BytesIO(data))
+
+
+@micro("parse_resume_docx")
+def bench_parse(pages, data, sentences):
+    return lambda: parse_resume_docx(io.BytesIO(data))
+
+
+@micro("replace_and_style")
+def bench_replace(pages, data, sentences):
+    # Flip one sentence in the middle back and forth on a loaded document
+    doc = Document(io.BytesIO(data))
+    original = sentences[len(sentences) // 2]
+    pair = [original, original.replace("the", "the revised", 1)]
+
+    def run():
+        replace_and_style(doc, pair[0], pair[1], ["revised"], [])
+        pair.reverse()
+    return run
+
+
+@micro("replace_many")
+def bench_replace_many(pages, data, sentences):
+    doc = Document(io.BytesIO(data))
+    batches = list(_swap_changes(sentences, 20))
+
+    def run():
+        replace_many(doc, batches[0])
+        batches.reverse()
+    return run
+
+
+@micro("get_changed_sentences")
+def bench_changed(pages, data, sentences):
+    edited = edit_sentences(SEED, sentences, 5 + pages)
+    original = {"sentences": [{"id": i, "text": s} for i, s in enumerate(sentences, 1)]}
+    updated = {"sentences": [{"id": i, "text": s} for i, s in enumerate(edited, 1)]}
+    return lambda: get_changed_sentences(original, updated)
+
+
+@micro("generate_resume_docx")
+def bench_generate(pages, data, sentences):
+    import random
+
+    tmp = tempfile.mkdtemp(prefix="bench-template-")
+    path = os.path.join(tmp, "template.docx")
+    rng = random.Random(SEED)
+    bench_templates.make_template(rng, path, bullets=pages * 8)
+    resume = bench_templates.make_resume(rng)
+    return lambda: render_resume_docx(resume, path)
+
+
+# ======================================
+# END TO END (FastAPI app, in-process)
+# ======================================
+
+def _client():
+    from fastapi.testclient import TestClient
+
+    from app.core.principal import Principal
+    from app.core.security import get_current_user
+    from app.main import app
+
+    app.dependency_overrides[get_current_user] = lambda: Principal(uuid.uuid4(), "bench@example.com")
+    # Not entered as a context manager: no start-up, so no database or warm-up
+    return TestClient(app)
+
+
+@e2e("POST /resume/extract_sentences (parse)")
+def bench_http_extract(pages, data, sentences):
+    from app.services.resume.cache import parse_cache
+
+    client = _client()
+
+    def run():
+        parse_cache.clear()
+        r = client.post("/resume/extract_sentences", files={"file": ("r.docx", data)})
+        r.raise_for_status()
+    return run
+
+
+@e2e("POST /resume/extract_sentences (cached)")
+def bench_http_extract_cached(pages, data, sentences):
+    client = _client()
+
+    def run():
+        r = client.post("/resume/extract_sentences", files={"file": ("r.docx", data)})
+        r.raise_for_status()
+    return run
+
+
+@e2e("POST /resume/tailor_resume")
+def bench_http_tailor(pages, data, sentences):
+    client = _client()
+    changes = json.dumps({"sentences": _swap_changes(sentences, 20)[0]})
+
+    def run():
+        r = client.post(
+            "/resume/tailor_resume",
+            files={"file": ("r.docx", data)},
+            data={"changes_json": changes},
+        )
+        r.raise_for_status()
+    return run
+
+
+# ======================================
+# RUNNER
+# ======================================
+
+def measure(fn: Callable, min_time: float, max_rounds: int) -> dict:
+    fn()  # warm-up: imports, caches, pool start-up
+    times: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < max_rounds and (len(times) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(times[0], 4),
+        "p95_ms": round(times[min(int(len(times) * 0.95), len(times) - 1)], 4),
+        "mean_ms": round(statistics.fmean(times), 4),
+        "rounds": len(times),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(__file__), timeout=10,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(args) -> None:
+    sizes = QUICK_SIZES if args.quick else SIZES
+    min_time = 0.2 if args.quick else 1.0
+    docs = corpus(SEED, tuple(sorted(set(sizes) | set(E2E_SIZES))))
+
+    plan = [(name, factory, pages, "micro") for name, factory in _MICRO.items() for pages in sizes]
+    if not args.no_e2e:
+        e2e_sizes = [p for p in E2E_SIZES if p in sizes] or [sizes[0]]
+        plan += [(name, factory, pages, "e2e") for name, factory in _E2E.items() for pages in e2e_sizes]
+
+    results = {}
+    for name, factory, pages, kind in plan:
+        key = f"{name} [{pages}p]"
+        if args.only and args.only not in key:
+            continue
+        data, sentences = docs[pages]
+        stats = measure(factory(pages, data, sentences), min_time, args.max_rounds)
+        results[key] = {"kind": kind, "pages": pages, "bytes": len(data), **stats}
+        print(f"{key:<58} {stats['median_ms']:>10.3f} ms  (p95 {stats['p95_ms']:.3f}, n={stats['rounds']})")
+
+    from app.core.executor import shutdown_executors
+    shutdown_executors()
+
+    commit = _commit()
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": SEED,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'nogit'}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+
+def compare(args) -> int:
+    with open(args.base) as f:
+        base = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'benchmark':<58} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    for key in sorted(set(base) & set(new)):
+        old_ms, new_ms = base[key]["median_ms"], new[key]["median_ms"]
+        change = (new_ms - old_ms) / old_ms if old_ms else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{key:<58} {old_ms:>10.3f} {new_ms:>10.3f} {change:>+7.1%}{flag}")
+    for key in sorted(set(base) - set(new)):
+        print(f"{key:<58} missing from {args.new}")
+    for key in sorted(set(new) - set(base)):
+        print(f"{key:<58} new in {args.new}")
+
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--quick", action="store_true", help="1 and 10 pages, shorter timings")
+    p_run.add_argument("--only", help="run benchmarks whose name contains this")
+    p_run.add_argument("--no-e2e", action="store_true")
+    p_run.add_argument("--max-rounds", type=int, default=200)
+    p_run.add_argument("--out")
+
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
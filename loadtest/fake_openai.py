@@ -0,0 +1,222 @@
+"""
+OpenAI-compatible stand-in for load tests: POST /v1/chat/completions, plain
+and streamed, with made-up but well-formed answers to the app's prompts.
+
+    python -m loadtest.fake_openai [--port 8900] [--latency-ms 600] [--jitter-ms 200]
+        [--tokens-per-second 80] [--error-rate 0.0] [--rate-limit-rate 0.0] [--stall-rate 0.0]
+
+Latency is the time to the first token; the rest of the answer is paced at
+--tokens-per-second (about four characters per token). Injected failures:
+HTTP 500, HTTP 429 with Retry-After, and stalls that never answer (to
+exercise the client's deadlines). GET /stats reports what was served.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REWRITES = (
+    ("Built", "Architected"), ("Led", "Spearheaded"), ("Improved", "Boosted"),
+    ("Reduced", "Cut"), ("the", "the production"),
+)
+KEYWORDS = ("Kubernetes", "observability", "stakeholders", "SLOs", "mentoring")
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 600.0
+    jitter_ms: float = 200.0
+    tokens_per_second: float = 80.0
+    tokens_per_chunk: int = 4
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    stall_rate: float = 0.0
+    edit_fraction: float = 0.3
+    seed: int = 7
+
+
+def _tokens(text: str) -> int:
+    return max((len(text) + 3) // 4, 1)
+
+
+def _after(marker: str, content: str):
+    """The JSON value on the line after `marker` in the prompt, if any."""
+    m = re.search(re.escape(marker) + r"\n(.+)", content)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(1))
+    except ValueError:
+        return None
+
+
+def _rewrite(text: str, rng: random.Random) -> str:
+    old, new = rng.choice(REWRITES)
+    out = text.replace(old, new, 1) if old in text else text
+    return out if out != text else f"{text.rstrip('.')} using {rng.choice(KEYWORDS)}."
+
+
+def answer_for(content: str, rng: random.Random, edit_fraction: float) -> str:
+    """A JSON answer shaped like what the app asked for."""
+    sentences = _after("Resume sentences:", content)
+    if isinstance(sentences, list):
+        edits = []
+        for s in sentences:
+            if isinstance(s, str) and rng.random() < edit_fraction:
+                edits.append({
+                    "from_sentence": s,
+                    "to_sentence": _rewrite(s, rng),
+                    "bold_words": [rng.choice(KEYWORDS)],
+                    "italic_words": [],
+                })
+        return json.dumps({"sentences": edits})
+
+    resume = _after("Resume JSON:", content)
+    if isinstance(resume, dict):
+        out = {}
+        for key, value in resume.items():
+            if isinstance(value, list):
+                out[key] = [_rewrite(v, rng) if isinstance(v, str) else v for v in value]
+            elif isinstance(value, str):
+                out[key] = _rewrite(value, rng)
+        return json.dumps(out)
+    return "{}"
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="fake-openai")
+    rng = random.Random(config.seed)
+    served: Counter = Counter()
+
+    async def first_token_delay():
+        delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+
+    def injected_failure():
+        roll = rng.random()
+        if roll < config.stall_rate:
+            return "stall"
+        roll -= config.stall_rate
+        if roll < config.rate_limit_rate:
+            return "rate_limit"
+        roll -= config.rate_limit_rate
+        if roll < config.error_rate:
+            return "error"
+        return None
+
+    @app.get("/stats")
+    async def stats():
+        return dict(served)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+
+        failure = injected_failure()
+        if failure == "stall":
+            served["stalled"] += 1
+            await asyncio.sleep(3600)
+        if failure == "rate_limit":
+            served["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (injected)", "type": "rate_limit_error"}},
+                status_code=429, headers={"Retry-After": "1"},
+            )
+        if failure == "error":
+            served["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "Internal error (injected)", "type": "server_error"}},
+                status_code=500,
+            )
+
+        text = answer_for(prompt, rng, config.edit_fraction)
+        usage = {
+            "prompt_tokens": _tokens(prompt),
+            "completion_tokens": _tokens(text),
+            "total_tokens": _tokens(prompt) + _tokens(text),
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await first_token_delay()
+            await asyncio.sleep(usage["completion_tokens"] / config.tokens_per_second)
+            served["completions"] += 1
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict, finish=None, **extra) -> str:
+            payload = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await first_token_delay()
+            yield chunk({"role": "assistant", "content": ""})
+            step = config.tokens_per_chunk * 4
+            for start in range(0, len(text), step):
+                yield chunk({"content": text[start:start + step]})
+                await asyncio.sleep(config.tokens_per_chunk / config.tokens_per_second)
+            yield chunk({}, finish="stop")
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+            served["streams"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=600.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--edit-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, stall_rate=args.stall_rate,
+        edit_fraction=args.edit_fraction, seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
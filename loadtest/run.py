@@ -0,0 +1,407 @@
+"""
+Load-test driver: starts the fake LLM server and the app, then drives the
+scenarios in loadtest/scenarios.py at a target request rate.
+
+    python -m loadtest.run --database-url postgresql+asyncpg://user:pw@localhost/resume_load \\
+        [--rps 20] [--duration 30] [--mix login=1,extract=4,apply=2,tailor=1]
+        [--phases each,mixed] [--app-workers 1] [--env EXECUTOR_PROCESS_WORKERS=4 ...]
+        [--llm-latency-ms 600] [--llm-tps 80] [--llm-error-rate 0.01] [--out report.json]
+
+The database must be reachable and empty or already at the current schema
+(an empty one is created on start-up); any Postgres works, e.g.
+`docker run -e POSTGRES_PASSWORD=pw -p 5432:5432 postgres:16`. With
+--base-url the driver uses an app that is already running instead, and
+--app-pid lets it still sample that process tree.
+
+Arrivals are open-loop: requests start on schedule whether or not earlier
+ones finished, so an overloaded app shows up as growing latency and
+errors, not as a lower offered rate; requests still running
+--drain-seconds after a phase ends are cancelled and counted as
+"drain_timeout" errors. For each phase (each scenario alone,
+then the mix) the report gives p50/p95/p99 latency, throughput, error
+rate and status counts per scenario, plus CPU and resident memory of the
+app's process tree (uvicorn workers and executor pool processes).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.scenarios import SCENARIOS, Context, make_documents
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+# ======================================
+# PROCESSES
+# ======================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _tree(root: int) -> List[int]:
+    """`root` and all its descendants, from /proc (Linux only)."""
+    children = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children[ppid].append(int(entry))
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, ()))
+    return pids
+
+
+def _usage(pid: int) -> tuple:
+    """(cpu seconds, rss bytes) for one process; zeros once it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE
+        return (int(fields[11]) + int(fields[12])) / CLK_TCK, rss
+    except (OSError, IndexError, ValueError):
+        return 0.0, 0
+
+
+class TreeSampler:
+    """Samples CPU time and RSS of a process tree while a phase runs."""
+
+    def __init__(self, root: Optional[int], interval: float = 0.5):
+        self.root = root
+        self.interval = interval
+        self.samples: List[tuple] = []  # (time, cpu seconds by pid, total rss, processes)
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> None:
+        cpu, rss = {}, 0
+        pids = _tree(self.root)
+        for pid in pids:
+            c, r = _usage(pid)
+            cpu[pid] = c
+            rss += r
+        self.samples.append((time.monotonic(), cpu, rss, len(pids)))
+
+    async def _loop(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.root is not None:
+            self.samples = []
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> dict:
+        if self._task is None:
+            return {}
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._sample()
+        first, last = self.samples[0], self.samples[-1]
+        wall = last[0] - first[0]
+        # Only pids alive at both ends count; short-lived processes are missed
+        cpu = sum(last[1][pid] - first[1].get(pid, 0.0) for pid in last[1])
+        rss = [s[2] for s in self.samples]
+        return {
+            "cpu_percent": round(100 * cpu / wall, 1) if wall > 0 else None,
+            "rss_peak_mb": round(max(rss) / 2**20, 1),
+            "rss_avg_mb": round(statistics.fmean(rss) / 2**20, 1),
+            "processes": max(s[3] for s in self.samples),
+        }
+
+
+async def _wait_until(url: str, timeout: float, proc: Optional[subprocess.Popen] = None) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if proc is not None and proc.poll() is not None:
+                raise RuntimeError(f"{url}: process exited with {proc.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def _start_llm(args, port: int) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, "-m", "loadtest.fake_openai", "--port", str(port),
+        "--latency-ms", str(args.llm_latency_ms), "--jitter-ms", str(args.llm_jitter_ms),
+        "--tokens-per-second", str(args.llm_tps), "--error-rate", str(args.llm_error_rate),
+        "--rate-limit-rate", str(args.llm_rate_limit_rate), "--stall-rate", str(args.llm_stall_rate),
+    ])
+
+
+def _start_app(args, port: int, llm_port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url,
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY", "load-test-secret"),
+        "OPENAI_API_KEY": "sk-load-test",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+    })
+    if args.ops_token:
+        env["PROFILE_ADMIN_TOKEN"] = args.ops_token
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+        "--port", str(port), "--workers", str(args.app_workers), "--log-level", "warning",
+    ], env=env)
+
+
+# ======================================
+# DRIVER
+# ======================================
+
+async def _setup(client: httpx.AsyncClient, args) -> Context:
+    users, tokens = [], []
+    for i in range(args.users):
+        email, password = f"load{i}@example.com", "load-test-password"
+        r = await client.post("/auth/register", json={"email": email, "password": password})
+        if r.status_code not in (201, 409):
+            raise RuntimeError(f"register failed: {r.status_code} {r.text}")
+        r = await client.post("/auth/login", data={"username": email, "password": password})
+        r.raise_for_status()
+        users.append((email, password))
+        tokens.append(r.json()["access_token"])
+    return Context(users, tokens, make_documents(args.documents), args.jd_variants)
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def _summary(latencies: List[float], outcomes: Counter, duration: float) -> dict:
+    latencies = sorted(latencies)
+    done = len(latencies)
+
+    def pct(p: float) -> Optional[float]:
+        return round(latencies[min(int(p * done), done - 1)] * 1000, 1) if done else None
+
+    errors = sum(n for status, n in outcomes.items() if status != "ok")
+    return {
+        "requests": done,
+        "throughput_rps": round(outcomes["ok"] / duration, 2),
+        "error_rate": round(errors / done, 4) if done else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": pct(1.0),
+        "statuses": dict(outcomes),
+    }
+
+
+async def run_phase(name: str, client: httpx.AsyncClient, ctx: Context, mix: Dict[str, float],
+                    args, sampler: TreeSampler) -> dict:
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+    in_flight = 0
+    tasks = set()
+    rng = random.Random(args.seed)
+
+    async def one(scenario: str) -> None:
+        nonlocal in_flight
+        in_flight += 1
+        started = time.perf_counter()
+        ok, status = False, "error"
+        try:
+            ok, status = await SCENARIOS[scenario](client, ctx)
+        except httpx.TimeoutException:
+            ok, status = False, "timeout"
+        except httpx.HTTPError as exc:
+            ok, status = False, type(exc).__name__
+        except asyncio.CancelledError:
+            # Still running at the drain timeout: an error, timed up to the cancel
+            ok, status = False, "drain_timeout"
+            raise
+        finally:
+            in_flight -= 1
+            latencies[scenario].append(time.perf_counter() - started)
+            outcomes[scenario]["ok" if ok else status] += 1
+
+    sampler.start()
+    started = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= args.duration:
+            break
+        due = int(elapsed * args.rps) + 1
+        while sent < due:
+            sent += 1
+            scenario = rng.choices(names, weights)[0]
+            if in_flight >= args.max_in_flight:
+                outcomes[scenario]["client_overload"] += 1
+                continue
+            task = asyncio.create_task(one(scenario))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.sleep(min(1 / args.rps, 0.05))
+
+    # Requests still running count, but only up to the drain timeout
+    if tasks:
+        await asyncio.wait(tasks, timeout=args.drain_seconds)
+        late = list(tasks)
+        for task in late:
+            task.cancel()
+        await asyncio.gather(*late, return_exceptions=True)
+    duration = time.perf_counter() - started
+    resources = await sampler.stop()
+
+    report = {
+        "phase": name,
+        "offered_rps": args.rps,
+        "duration_seconds": round(duration, 1),
+        "scenarios": {s: _summary(latencies[s], outcomes[s], duration) for s in names},
+        "resources": resources,
+    }
+    all_latencies = [x for s in names for x in latencies[s]]
+    total = Counter()
+    for s in names:
+        total.update(outcomes[s])
+    report["total"] = _summary(all_latencies, total, duration)
+    return report
+
+
+def _print(report: dict) -> None:
+    res = report["resources"]
+    extra = (f"  cpu {res['cpu_percent']}%  rss peak {res['rss_peak_mb']} MB  "
+             f"avg {res['rss_avg_mb']} MB  procs {res['processes']}") if res else ""
+    print(f"\n== {report['phase']} @ {report['offered_rps']} rps, {report['duration_seconds']}s{extra}")
+    print(f"{'scenario':<10} {'reqs':>6} {'ok/s':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}  statuses")
+    rows = list(report["scenarios"].items()) + [("total", report["total"])]
+    for name, s in rows:
+        err = f"{s['error_rate'] * 100:.1f}" if s["error_rate"] is not None else "-"
+        print(f"{name:<10} {s['requests']:>6} {s['throughput_rps']:>7} {err:>6} "
+              f"{s['p50_ms'] or '-':>8} {s['p95_ms'] or '-':>8} {s['p99_ms'] or '-':>8}  {s['statuses']}")
+
+
+async def main_async(args) -> dict:
+    procs: List[subprocess.Popen] = []
+    try:
+        app_pid = args.app_pid
+        base_url = args.base_url
+        if base_url is None:
+            llm_port, app_port = _free_port(), _free_port()
+            llm = _start_llm(args, llm_port)
+            procs.append(llm)
+            await _wait_until(f"http://127.0.0.1:{llm_port}/stats", 30, llm)
+            app = _start_app(args, app_port, llm_port)
+            procs.append(app)
+            base_url = f"http://127.0.0.1:{app_port}"
+            await _wait_until(f"{base_url}/ready", args.ready_timeout, app)
+            app_pid = app.pid
+
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            ctx = await _setup(client, args)
+            mix = _parse_mix(args.mix)
+            phases = []
+            for phase in args.phases.split(","):
+                if phase == "each":
+                    phases += [(name, {name: 1.0}) for name in mix]
+                elif phase == "mixed":
+                    phases.append(("mixed", mix))
+                else:
+                    raise SystemExit(f"unknown phase {phase!r}; use each and/or mixed")
+
+            reports = []
+            for name, phase_mix in phases:
+                report = await run_phase(name, client, ctx, phase_mix, args, TreeSampler(app_pid))
+                _print(report)
+                reports.append(report)
+            ops = {}
+            headers = {"X-Profile-Token": args.ops_token} if args.ops_token else {}
+            for path in ("/ops/executor", "/ops/llm", "/ops/parse_cache"):
+                try:
+                    r = await client.get(path, headers=headers)
+                    if r.status_code == 200:
+                        ops[path] = r.json()
+                except (httpx.HTTPError, ValueError):
+                    pass
+        return {"config": {k: v for k, v in vars(args).items() if k not in ("database_url", "ops_token")},
+                "phases": reports, "ops": ops}
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--base-url", help="use an app that is already running")
+    parser.add_argument("--app-pid", type=int, help="process to sample with --base-url")
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the app, repeatable")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default="login=1,extract=4,apply=2,tailor=1")
+    parser.add_argument("--phases", default="each,mixed")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--jd-variants", type=int, default=0, help="0: unique JDs, no LLM cache hits")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--drain-seconds", type=float, default=30.0)
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=600.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--llm-tps", type=float, default=80.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-stall-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ops-token", default=os.environ.get("PROFILE_ADMIN_TOKEN"),
+                        help="PROFILE_ADMIN_TOKEN, to read the /ops stats after the run")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+    if args.base_url is None and not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) is required to start the app")
+
+    report = asyncio.run(main_async(args))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Load-test scenarios. Each one makes a single user-level call against the
+app and returns (ok, status); the driver times it.
+"""
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.corpus import make_resume
+
+JOB_DESCRIPTIONS = (
+    "Senior backend engineer. Python, FastAPI, PostgreSQL, Kafka. Own services end to end, "
+    "improve latency and reliability, mentor engineers, work with product stakeholders.",
+    "Platform engineer. Kubernetes, Terraform, AWS, observability. Build CI/CD and SLOs "
+    "for dozens of services; reduce cost and toil.",
+    "Full-stack engineer. React, TypeScript, GraphQL, Node. Ship customer-facing features "
+    "quickly with strong testing and analytics.",
+)
+
+
+@dataclass
+class Document:
+    data: bytes
+    sentences: List[str]
+
+
+@dataclass
+class Context:
+    """Shared state prepared before the run: accounts, tokens and documents."""
+    users: List[Tuple[str, str]]
+    tokens: List[str]
+    documents: List[Document]
+    jd_variants: int  # 0: every tailor request has a unique JD, so the LLM cache never hits
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+    sequence: int = 0
+
+    def auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+    def document(self) -> Document:
+        return self.rng.choice(self.documents)
+
+    def job_description(self) -> str:
+        self.sequence += 1
+        base = self.rng.choice(JOB_DESCRIPTIONS)
+        variant = self.sequence if self.jd_variants == 0 else self.sequence % self.jd_variants
+        return f"{base}\nRequisition {variant}."
+
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[Tuple[bool, str]]]
+
+
+def make_documents(count: int, seed: int = 7) -> List[Document]:
+    """Resumes of 1-3 pages, different bytes each (parse cache hit rate depends on `count`)."""
+    docs = []
+    for i in range(count):
+        data, sentences = make_resume(seed + i, 1 + i % 3)
+        docs.append(Document(data, sentences))
+    return docs
+
+
+async def login(client: httpx.AsyncClient, ctx: Context) -> Tuple[bool, str]:
+    email, password = ctx.rng.choice(ctx.users)
+    r = await client.post("/auth/login", data={"username": email, "password": password})
+    return r.status_code == 200, str(r.status_code)
+
+
+async def extract(client: httpx.AsyncClient, ctx: Context) -> Tuple[bool, str]:
+    doc = ctx.document()
+    r = await client.post(
+        "/resume/extract_sentences", headers=ctx.auth(),
+        files={"file": ("resume.docx", doc.data)},
+    )
+    return r.status_code == 200, str(r.status_code)
+
+
+async def apply_changes(client: httpx.AsyncClient, ctx: Context) -> Tuple[bool, str]:
+    doc = ctx.document()
+    picked = ctx.rng.sample(doc.sentences, min(10, len(doc.sentences)))
+    changes = {"sentences": [
+        {"from_sentence": s, "to_sentence": s.replace("the", "the production", 1),
+         "bold_words": ["production"], "italic_words": []}
+        for s in picked
+    ]}
+    r = await client.post(
+        "/resume/tailor_resume", headers=ctx.auth(),
+        files={"file": ("resume.docx", doc.data)},
+        data={"changes_json": json.dumps(changes)},
+    )
+    return r.status_code == 200, str(r.status_code)
+
+
+async def tailor(client: httpx.AsyncClient, ctx: Context) -> Tuple[bool, str]:
+    """The streamed tailoring path: parse, LLM edits as SSE, final DOCX."""
+    doc = ctx.document()
+    async with client.stream(
+        "POST", "/resume/tailor_stream", headers=ctx.auth(),
+        files={"file": ("resume.docx", doc.data)},
+        data={"job_description": ctx.job_description()},
+    ) as r:
+        if r.status_code != 200:
+            await r.aread()
+            return False, str(r.status_code)
+        event = None
+        async for line in r.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+                if event == "error":
+                    return False, "stream_error"
+        return event == "done", "200" if event == "done" else "incomplete"
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "extract": extract,
+    "apply": apply_changes,
+    "tailor": tailor,
+}
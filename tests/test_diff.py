@@ -0,0 +1,96 @@
+import random
+
+from app.services.resume.diff import diff_sentences, get_changed_sentences
+
+
+def _ops(old, new):
+    return [(op.op, op.old_index, op.new_index) for op in diff_sentences(old, new)]
+
+
+def _check_covers(old, new):
+    """Every sentence is in at most one op, and the untouched ones line up in order."""
+    ops = diff_sentences(old, new)
+    old_seen = [op.old_index for op in ops if op.old_index is not None]
+    new_seen = [op.new_index for op in ops if op.new_index is not None]
+    assert len(old_seen) == len(set(old_seen)) and len(new_seen) == len(set(new_seen))
+    kept_old = [" ".join(s.split()) for i, s in enumerate(old) if i not in set(old_seen)]
+    kept_new = [" ".join(s.split()) for j, s in enumerate(new) if j not in set(new_seen)]
+    assert kept_old == kept_new
+    for op in ops:
+        assert op.new_text == (new[op.new_index] if op.new_index is not None else None)
+        assert op.old_text == (old[op.old_index] if op.old_index is not None else None)
+    return ops
+
+
+def test_identical_lists_have_no_ops():
+    text = [f"Sentence {i}." for i in range(10)]
+    assert diff_sentences(text, list(text)) == []
+    assert diff_sentences(text, [f"  Sentence   {i}. " for i in range(10)]) == []
+
+
+def test_insert_and_delete_inside_common_prefix_and_suffix():
+    old = ["A.", "B.", "C.", "D."]
+    assert _ops(old, ["A.", "B.", "New.", "C.", "D."]) == [("insert", None, 2)]
+    assert _ops(old, ["A.", "C.", "D."]) == [("delete", 1, None)]
+    assert _ops(old, ["Start.", *old]) == [("insert", None, 0)]
+    assert _ops(old, [*old, "End."]) == [("insert", None, 4)]
+
+
+def test_edited_sentence_is_a_modify():
+    old = ["Led a team of five engineers.", "Shipped the app."]
+    new = ["Led a team of seven engineers.", "Shipped the app."]
+    assert _ops(old, new) == [("modify", 0, 0)]
+
+
+def test_reordered_sentence_is_a_move():
+    old = ["Alpha one.", "Beta two.", "Gamma three.", "Delta four."]
+    new = ["Delta four.", "Alpha one.", "Beta two.", "Gamma three."]
+    assert _ops(old, new) == [("move", 3, 0)]
+
+
+def test_repeated_sentences_are_aligned_in_order():
+    old = ["Python.", "Go.", "Python.", "Rust.", "Python."]
+    new = ["Python.", "Python.", "Rust.", "Python.", "Python."]
+    ops = _check_covers(old, new)
+    assert [op.op for op in ops] == ["delete", "insert"]
+
+
+def test_random_edits_keep_the_untouched_sentences_in_order():
+    rng = random.Random(11)
+    vocab = [f"Sentence number {k} about work." for k in range(40)] + ["Repeated line."] * 5
+    for _ in range(200):
+        old = rng.choices(vocab, k=rng.randint(0, 30))
+        new = list(old)
+        for _ in range(rng.randint(0, 6)):
+            kind = rng.randrange(4)
+            if kind == 0:
+                new.insert(rng.randint(0, len(new)), rng.choice(vocab))
+            elif kind == 1 and new:
+                del new[rng.randrange(len(new))]
+            elif kind == 2 and new:
+                new.insert(rng.randint(0, len(new) - 1), new.pop(rng.randrange(len(new))))
+            elif new:
+                k = rng.randrange(len(new))
+                new[k] = new[k].replace("work", "projects")
+        _check_covers(old, new)
+
+
+def test_changed_sentences_contract():
+    original = {"sentences": [
+        {"id": "a", "text": "Led a team of five engineers."},
+        {"id": "b", "text": "Shipped the app."},
+        {"id": "c", "text": "Wrote the docs."},
+    ]}
+    updated = {"sentences": [
+        {"id": "a", "text": "Led a team of seven engineers.", "bold_words": ["seven"]},
+        {"id": "x", "text": "Cut costs by half."},
+        {"id": "c", "text": "Wrote the docs."},
+        {"id": "b", "text": "Shipped the app."},
+    ]}
+    changed = get_changed_sentences(original, updated)["sentences"]
+    assert changed == [
+        {"id": "a", "op": "modify", "from_sentence": "Led a team of five engineers.",
+         "to_sentence": "Led a team of seven engineers.", "bold_words": ["seven"], "italic_words": []},
+        {"id": "x", "op": "insert", "from_sentence": None,
+         "to_sentence": "Cut costs by half.", "bold_words": [], "italic_words": []},
+    ]
@@ -0,0 +1,56 @@
+import io
+import os
+import tempfile
+
+from docx import Document
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.uploads import DOCX_MEDIA_TYPE, docx_response
+from app.services.resume.tasks import apply_changes_task, extract_sentences_task
+
+
+def _docx(*paragraphs) -> bytes:
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_tasks_take_and_return_bytes_without_touching_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    data = _docx("Led a team of five engineers.", "Shipped the app.")
+    change = {"from_sentence": "Shipped the app.", "to_sentence": "Launched the app.",
+              "bold_words": ["Launched"], "italic_words": []}
+
+    (output, report), peak = apply_changes_task(data, [change])
+    assert isinstance(output, bytes) and peak is None
+    assert report["replaced"] == 1
+    texts = [p.text for p in Document(io.BytesIO(output)).paragraphs]
+    assert texts == ["Led a team of five engineers.", "Launched the app."]
+    assert os.listdir(tmp_path) == []
+
+
+def test_peak_memory_is_reported_when_traced(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_PEAK_MEMORY", True)
+    result, peak = extract_sentences_task(_docx("One sentence here.", "Another one there."))
+    assert result["sentences"]
+    assert peak > 0
+
+
+def test_docx_response_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_CHUNK_BYTES", 1000)
+    data = _docx(*(f"Paragraph {i}." for i in range(200)))
+    app = FastAPI()
+    app.get("/file")(lambda: docx_response(data, "out.docx", {"X-Buffered-Bytes": str(len(data))}))
+
+    with TestClient(app).stream("GET", "/file") as r:
+        chunks = list(r.iter_raw())
+        assert r.headers["content-type"] == DOCX_MEDIA_TYPE
+        assert r.headers["content-length"] == str(len(data))
+        assert r.headers["content-disposition"] == 'attachment; filename="out.docx"'
+    assert b"".join(chunks) == data
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import executor
+from app.core.executor import _Pool, run_task
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A one-worker thread pool that admits two tasks (one running, one queued)."""
+    small = _Pool("thread", 1, 2)
+    monkeypatch.setitem(executor._pools, "thread", small)
+    yield small
+    small.executor.shutdown(wait=True)
+
+
+async def _settle(pool, expected: int) -> None:
+    for _ in range(200):
+        if pool.in_flight == expected:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_full_pool_rejects_with_retry_after(pool):
+    release = threading.Event()
+
+    async def scenario():
+        held = [asyncio.ensure_future(run_task("blob_io", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as info:
+            await run_task("blob_io", release.wait)
+        release.set()
+        await asyncio.gather(*held)
+        return info.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert pool.stats["blob_io"].rejected == 1
+    assert pool.in_flight == 0
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_worker_finishes(pool):
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(run_task("blob_io", release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        busy = pool.in_flight  # the worker is still blocked
+        release.set()
+        await _settle(pool, 0)
+        return busy
+
+    assert asyncio.run(scenario()) == 1
+    assert pool.in_flight == 0
+    assert pool.stats["blob_io"].in_flight == 0
+
+
+def test_results_and_errors_free_the_slot(pool):
+    def boom():
+        raise ValueError("bad input")
+
+    async def scenario():
+        assert await run_task("blob_io", sum, [1, 2, 3]) == 6
+        with pytest.raises(ValueError):
+            await run_task("blob_io", boom)
+        await _settle(pool, 0)
+
+    asyncio.run(scenario())
+    assert pool.in_flight == 0
+    assert pool.stats["blob_io"].completed == 1 and pool.stats["blob_io"].failed == 1
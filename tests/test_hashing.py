@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("bcrypt")
+
+from app.core.config import settings
+from app.core.hashing import _make_context, check_bcrypt_backend
+
+
+def _hash(rounds):
+    return _make_context(rounds).hash("pw")
+
+
+def test_hashes_within_the_range_are_not_rehashed():
+    # Pods that calibrated to different costs accept each other's hashes
+    here = _make_context(settings.HASH_MIN_ROUNDS + 1)
+    for rounds in (settings.HASH_MIN_ROUNDS, settings.HASH_MIN_ROUNDS + 2):
+        assert here.verify_and_update("pw", _hash(rounds)) == (True, None)
+
+
+def test_hashes_below_the_floor_are_upgraded():
+    weak = _hash(4)
+    valid, new_hash = _make_context(settings.HASH_MIN_ROUNDS).verify_and_update("pw", weak)
+    assert valid and new_hash is not None
+    assert f"${settings.HASH_MIN_ROUNDS:02d}$" in new_hash
+
+
+def test_supported_bcrypt_passes_the_start_up_check():
+    import bcrypt
+
+    assert check_bcrypt_backend() == bcrypt.__version__
+
+
+def test_bcrypt_5_fails_the_start_up_check(monkeypatch):
+    import bcrypt
+
+    monkeypatch.setattr(bcrypt, "__version__", "5.0.0")
+    with pytest.raises(RuntimeError, match="bcrypt==4.0.1"):
+        check_bcrypt_backend()
@@ -0,0 +1,28 @@
+import io
+
+import pytest
+
+from app.services.resume.resume import _canonical_from_text, parse_resume_docx
+from benchmarks.bench_headings import heading_corpus, legacy_canonical, mismatches
+from benchmarks.corpus import make_resume
+
+
+def test_parity_with_difflib_on_the_heading_corpus():
+    assert mismatches(heading_corpus(seed=7, size=6000)) == []
+
+
+@pytest.mark.parametrize("text", [
+    "", "   ", ":", "SKILLS", "Skills:", "Work Experince", "experiance", "Proffesional Summary",
+    "certificate", "volunteering", "tech stacks", "linkdin", "about", "EDUCATION & TRAINING",
+    "Led the team that shipped the billing API", "x" * 500,
+])
+def test_parity_on_edge_cases(text):
+    assert _canonical_from_text(text) == legacy_canonical(text)
+
+
+def test_parse_resume_is_unchanged_on_a_synthetic_cv(monkeypatch):
+    data, _ = make_resume(3, 5)
+    indexed = parse_resume_docx(io.BytesIO(data))
+    monkeypatch.setattr("app.services.resume.resume._canonical_from_text", legacy_canonical)
+    assert parse_resume_docx(io.BytesIO(data)) == indexed
+    assert {"Summary", "Skills", "Experience", "Projects", "Education"} <= set(indexed)
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+
+from app.api.routers import jobs as jobs_router
+from app.services.jobs import runner
+from app.services.jobs.runner import JobRunner
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Records the status writes the runner makes instead of touching the database."""
+    calls = []
+
+    def recorder(name):
+        async def write(db, job_id, *args):
+            calls.append(name)
+        return write
+
+    monkeypatch.setattr(runner, "SessionFactory", _Session)
+    for name in ("complete_job", "fail_job", "requeue_job"):
+        monkeypatch.setattr(runner, name, recorder(name))
+    return calls
+
+
+def _run(handler, monkeypatch):
+    monkeypatch.setitem(runner.JOB_HANDLERS, "convert", handler)
+    job = SimpleNamespace(id=uuid.uuid4(), job_type="convert")
+    job_runner = JobRunner({"convert": 1})
+    job_runner.running["convert"] = 1
+    asyncio.run(job_runner._run(job))
+    return job_runner
+
+
+def test_a_full_pool_requeues_instead_of_failing(writes, monkeypatch):
+    async def busy(job):
+        raise HTTPException(status_code=503, detail="Server is busy", headers={"Retry-After": "0"})
+
+    job_runner = _run(busy, monkeypatch)
+    assert writes == ["requeue_job"]
+    assert job_runner.running["convert"] == 0
+
+
+def test_other_errors_fail_the_job(writes, monkeypatch):
+    async def broken(job):
+        raise HTTPException(status_code=422, detail="bad document")
+
+    _run(broken, monkeypatch)
+    assert writes == ["fail_job"]
+
+
+def test_status_write_is_retried(writes, monkeypatch):
+    flaky = iter([OperationalError("UPDATE", {}, Exception("connection reset")), None])
+
+    async def complete(db, job_id, *args):
+        error = next(flaky)
+        if error is not None:
+            raise error
+        writes.append("complete_job")
+
+    async def done(job):
+        return {}, None
+
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(runner, "complete_job", complete)
+    monkeypatch.setattr(runner.asyncio, "sleep", no_sleep)
+    _run(done, monkeypatch)
+    assert writes == ["complete_job"]
+
+
+@pytest.mark.parametrize("payload_json", ["[]", "3", '"text"', "null"])
+def test_non_object_payload_is_rejected(payload_json):
+    with pytest.raises(HTTPException) as info:
+        asyncio.run(jobs_router.submit_job("tailor", None, payload_json, db=None, current_user=None))
+    assert info.value.status_code == 422
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.db.models import LLMCacheEntry
+from app.services.llm.cache import LLMResponseCache
+from app.services.llm.prompt import merge_tailored
+
+
+def test_hits_are_independent_copies():
+    cache = LLMResponseCache(max_entries=8, ttl_seconds=60, persist=False)
+    response = {"Experience": ["Built the API."], "Skills": ["Python"]}
+
+    async def scenario():
+        await cache.put("k", response, model="gpt-4o-mini", prompt_version="1",
+                        prompt_tokens=10, completion_tokens=5, latency_seconds=1.0)
+        response["Skills"].append("changed after put")
+        first = await cache.get("k")
+        merged = merge_tailored({"Name": "Ada"}, first)
+        merged["Experience"].append("appended by a caller")
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) == {"Experience": ["Built the API."], "Skills": ["Python"]}
+    assert cache.hits == 2
+
+
+def test_db_hit_with_an_aware_expiry(monkeypatch):
+    # asyncpg returns timestamptz columns as UTC-aware datetimes
+    cache = LLMResponseCache(max_entries=8, ttl_seconds=3600, persist=True)
+    row = LLMCacheEntry(
+        key="k", model="gpt-4o-mini", prompt_version="1", response={"Skills": ["Python"]},
+        cost_usd=0.01, latency_seconds=2.0,
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
+    )
+
+    async def db_get(key):
+        return row
+
+    monkeypatch.setattr(cache, "_db_get", db_get)
+
+    async def scenario():
+        from_db = await cache.get("k")
+        from_memory = await cache.get("k")
+        return from_db, from_memory
+
+    from_db, from_memory = asyncio.run(scenario())
+    assert from_db == from_memory == {"Skills": ["Python"]}
+    assert cache.db_hits == 1 and cache.hits == 2
+    # The memory entry expires with the row, not a full TTL later
+    expires = cache._entries["k"][0]
+    assert 500 < expires - time.time() <= 600
@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.llm import client
+
+
+class _FakeCompletions:
+    """Plays back `outcomes` (exceptions or delays) one per call, then succeeds."""
+
+    def __init__(self, outcomes=(), delay: float = 0.0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.outcomes:
+                raise self.outcomes.pop(0)
+            usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+            return SimpleNamespace(choices=[], usage=usage)
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(**kwargs):
+        completions = _FakeCompletions(**kwargs)
+        monkeypatch.setattr(client, "_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+        return completions
+
+    monkeypatch.setattr(client, "_global_slots", None)  # bound to the first event loop that uses it
+    monkeypatch.setattr(client, "llm_stats", client._LLMStats())
+    monkeypatch.setattr(client, "_backoff", lambda attempt: 0.0)
+    return install
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "http://llm.test/v1/chat/completions"))
+
+
+def test_connection_errors_are_retried(fake, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+    completions = fake(outcomes=[_connection_error(), _connection_error()])
+    response = asyncio.run(client.chat_completion([], user_id="u1"))
+    assert response.usage.prompt_tokens == 10
+    assert completions.calls == 3
+    stats = client.llm_stats.as_dict()
+    assert stats["retries"] == 2 and stats["failures"] == 0 and stats["prompt_tokens"] == 10
+
+
+def test_retries_stop_at_the_limit(fake, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 1)
+    completions = fake(outcomes=[_connection_error()] * 3)
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(client.chat_completion([]))
+    assert completions.calls == 2
+    assert client.llm_stats.failures == 1
+
+
+def test_client_errors_are_not_retried(fake):
+    completions = fake(outcomes=[ValueError("bad request")])
+    with pytest.raises(ValueError):
+        asyncio.run(client.chat_completion([]))
+    assert completions.calls == 1
+
+
+def test_deadline_gives_504(fake):
+    fake(delay=1.0)
+    with pytest.raises(HTTPException) as info:
+        asyncio.run(client.chat_completion([], deadline_seconds=0.05))
+    assert info.value.status_code == 504
+    assert client.llm_stats.recent[-1].status == "timeout"
+
+
+def test_per_user_limit(fake, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_IN_FLIGHT_PER_USER", 1)
+    fake(delay=0.1)
+
+    async def scenario():
+        first = asyncio.ensure_future(client.chat_completion([], user_id="u1"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as info:
+            await client.chat_completion([], user_id="u1")
+        await client.chat_completion([], user_id="u2")  # other users aren't held back
+        await first
+        return info.value
+
+    assert asyncio.run(scenario()).status_code == 429
+    assert client._user_in_flight == {}
+
+
+def test_global_limit_queues_calls(fake, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_IN_FLIGHT", 2)
+    completions = fake(delay=0.02)
+
+    async def scenario():
+        await asyncio.gather(*(client.chat_completion([], user_id=f"u{i}") for i in range(6)))
+
+    asyncio.run(scenario())
+    assert completions.calls == 6
+    assert completions.max_running == 2
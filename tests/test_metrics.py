@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import CallbackGauge, Counter, Gauge, Histogram, MetricsMiddleware, collect_spans, span
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    # Metrics made here are dropped again; the app's own keep their values
+    monkeypatch.setattr(metrics, "_registry", list(metrics._registry))
+
+
+def test_counter_and_gauge_rendering():
+    requests = Counter("test_requests_total", "Requests.", ["path"])
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    requests.labels("line\nbreak").inc(0.5)
+    depth = Gauge("test_depth", "Depth.")
+    depth.set(7)
+
+    assert requests.render().splitlines() == [
+        "# HELP test_requests_total Requests.",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{path="/a\\"b"} 3',
+        'test_requests_total{path="line\\nbreak"} 0.5',
+    ]
+    assert depth.render().splitlines()[-1] == "test_depth 7"
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("test_latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("/x").observe(value)
+
+    assert latency.render().splitlines()[2:] == [
+        'test_latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'test_latency_seconds_bucket{route="/x",le="1"} 3',
+        'test_latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'test_latency_seconds_sum{route="/x"} 3.65',
+        'test_latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_callback_gauge_is_read_at_render_time():
+    sizes = {"thread": 1}
+    gauge = CallbackGauge("test_pool_size", "Pool size.", ["pool"], lambda: [((k,), v) for k, v in sizes.items()])
+    sizes["thread"] = 4
+    assert 'test_pool_size{pool="thread"} 4' in metrics.render()
+    assert gauge.render().startswith("# HELP test_pool_size Pool size.")
+
+
+def test_spans_inside_collect_spans_are_returned_not_observed():
+    before = metrics.SPANS.labels("test_span").counts[:]
+    with collect_spans() as spans:
+        with span("test_span"):
+            pass
+    assert [name for name, _ in spans] == ["test_span"]
+    assert metrics.SPANS.labels("test_span").counts == before
+
+    metrics.record_spans(spans)
+    assert sum(metrics.SPANS.labels("test_span").counts) == sum(before) + 1
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.get("/things/{thing_id}")(lambda thing_id: {"id": thing_id})
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    for thing_id in ("1", "2", "3"):
+        assert client.get(f"/things/{thing_id}").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    assert metrics.HTTP_REQUESTS.labels("GET", "/things/{thing_id}", "200").value == 3
+    assert metrics.HTTP_REQUESTS.labels("GET", "unmatched", "404").value >= 1
+    assert ("GET", "/things/2") in metrics._path_cache  # later requests find their route before routing
+    assert metrics.HTTP_IN_FLIGHT.labels("GET", "/things/{thing_id}").value == 0
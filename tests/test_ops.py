@@ -0,0 +1,36 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers import ops
+from app.core.config import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(ops.router)
+    return TestClient(app)
+
+
+STATS_PATHS = [route.path for route in ops.router.routes if "{" not in route.path]
+
+
+@pytest.mark.parametrize("path", STATS_PATHS)
+def test_ops_endpoints_are_hidden_without_a_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", None)
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize("path", STATS_PATHS)
+def test_ops_endpoints_need_the_admin_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", "s3cret")
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Profile-Token": "wrong"}).status_code == 403
+
+
+def test_ops_stats_with_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", "s3cret")
+    r = client.get("/ops/executor", headers={"X-Profile-Token": "s3cret"})
+    assert r.status_code == 200
+    assert "thread" in r.json()
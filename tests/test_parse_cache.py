@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from app.services.resume.cache import ParseCache
+
+
+def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    for name in ("_disk_load", "_disk_put"):
+        original = getattr(ParseCache, name)
+
+        def spy(self, *args, _original=original):
+            disk_threads.append(threading.get_ident())
+            return _original(self, *args)
+        monkeypatch.setattr(ParseCache, name, spy)
+
+    async def scenario():
+        cache = ParseCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+        await cache.put("k", {"sentences": ["a"]})
+        restarted = ParseCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+        from_disk = await restarted.get("k")
+        from_memory = await restarted.get("k")
+        missing = await restarted.get("other")
+        return restarted.stats(), from_disk, from_memory, missing
+
+    stats, from_disk, from_memory, missing = asyncio.run(scenario())
+    assert from_disk == from_memory == {"sentences": ["a"]}
+    assert missing is None
+    assert (stats["hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    # put, the disk hit and the disk miss; the memory hit never touched the disk
+    assert len(disk_threads) == 3
+    assert loop_thread not in disk_threads
+
+
+def test_memory_only_cache_never_uses_the_pool(monkeypatch):
+    monkeypatch.setattr("app.services.resume.cache.run_task", None)  # any call would fail
+
+    async def scenario():
+        cache = ParseCache(max_bytes=1 << 20)
+        await cache.put("k", {"a": 1})
+        return await cache.get("k"), await cache.get("other")
+
+    assert asyncio.run(scenario()) == ({"a": 1}, None)
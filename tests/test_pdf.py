@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.resume import pdf
+from app.services.resume.pdf import ConversionError, PdfConverter
+
+
+@pytest.fixture
+def fake_soffice(tmp_path, monkeypatch):
+    """A `soffice` that records its pid and hangs, as a stuck conversion does."""
+    pid_file = tmp_path / "pid"
+    binary = tmp_path / "soffice"
+    binary.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+    binary.chmod(0o755)
+    monkeypatch.setattr(settings, "PDF_SOFFICE_BINARY", str(binary))
+    monkeypatch.setattr(pdf, "_uno_available", lambda: False)
+    return pid_file
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_outer_timeout_kills_the_cli_process(fake_soffice, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_TIMEOUT_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "PDF_WORKERS", 1)
+    # Make the outer wait fire before the subprocess's own timeout
+    monkeypatch.setattr(pdf, "CLI_TIMEOUT_MARGIN_SECONDS", -0.5)
+
+    async def scenario():
+        converter = PdfConverter()
+        try:
+            with pytest.raises(ConversionError, match="timed out"):
+                await converter.convert(b"docx")
+        finally:
+            await converter.stop()
+        return converter
+
+    converter = asyncio.run(scenario())
+    pid = int(fake_soffice.read_text())
+    deadline = time.monotonic() + 2
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(pid)
+    assert converter.timeouts == 1
+
+
+def test_concurrent_spawns_start_one_process_per_index(monkeypatch):
+    starts = []
+
+    def slow_start(office, timeout):
+        starts.append(office.dir)
+        time.sleep(0.1)
+        office.proc = type("P", (), {"poll": lambda self: None, "pid": 0})()
+
+    monkeypatch.setattr(pdf._Office, "start", slow_start)
+    monkeypatch.setattr(pdf, "find_soffice", lambda: "soffice")
+    monkeypatch.setattr(pdf, "_uno_available", lambda: True)
+    monkeypatch.setattr(settings, "PDF_WORKERS", 2)
+
+    async def scenario():
+        converter = PdfConverter()
+        await converter.start()
+        try:
+            threads = [threading.Thread(target=converter._spawn, args=(i % 2,)) for i in range(6)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            converter._offices.clear()
+            await converter.stop()
+        return converter
+
+    converter = asyncio.run(scenario())
+    assert len(starts) == 2
+    assert converter.started == 2
@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories import profile_repo
+from app.repositories.profile_repo import _parse_date, save_resume_data
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.sql = []
+
+    async def execute(self, statement, *args):
+        self.sql.append(" ".join(str(statement.compile(dialect=postgresql.dialect())).split()))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2023-05-17", date(2023, 5, 17)),
+    ("2023-05", date(2023, 5, 1)),
+    ("05/2023", date(2023, 5, 1)),
+    ("May 2023", date(2023, 5, 1)),
+    ("Sept 2021.", date(2021, 9, 1)),
+    ("  September,  2021 ", date(2021, 9, 1)),
+    ("2019", date(2019, 1, 1)),
+    ("Present", None),
+    ("till date", None),
+    (None, None),
+])
+def test_resume_dates(text, expected):
+    assert _parse_date(text) == expected
+
+
+def test_unknown_dates_are_rejected():
+    with pytest.raises(ValueError):
+        _parse_date("last summer")
+
+
+def test_list_sections_take_one_statement_each():
+    db = _RecordingSession()
+    experience = [
+        {"company": f"Co {i}", "role": "Engineer", "start_date": "2020-01", "end_date": "Present",
+         "description": ["Built things.", "Fixed things."]}
+        for i in range(25)
+    ]
+    data = {"experience": experience, "achievements": [], "projects": None}
+    saved = asyncio.run(save_resume_data(db, uuid.uuid4(), data))
+
+    assert saved == ["experience", "achievements"]
+    assert len(db.sql) == 2
+    insert_sql, clear_sql = db.sql
+    assert insert_sql.startswith("WITH removed AS (DELETE FROM experience ")
+    assert insert_sql.count("%(start_date_m") == 25  # one multi-row VALUES
+    assert clear_sql.startswith("WITH removed AS (DELETE FROM achievement")
+
+
+def test_skills_delete_stale_links_then_upsert(monkeypatch):
+    ids = {"Python": uuid.uuid4(), "SQL": uuid.uuid4()}
+
+    async def resolve(names):
+        return {name: ids[name] for name in names if name in ids}
+
+    monkeypatch.setattr(profile_repo.skill_dictionary, "resolve", resolve)
+    db = _RecordingSession()
+    skills = [{"name": "Python", "proficiency": "Expert"}, {"name": "SQL"}, {"name": "Python"}]
+    asyncio.run(profile_repo.save_skills(db, uuid.uuid4(), skills))
+
+    delete_sql, upsert_sql = db.sql
+    assert delete_sql.startswith("DELETE FROM user_skills") and "NOT IN" in delete_sql
+    assert upsert_sql.count("%(skill_id_m") == 2  # the duplicate collapses
+    assert "ON CONFLICT (user_id, skill_id) DO UPDATE" in upsert_sql
@@ -0,0 +1,93 @@
+import os
+import time
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.executor import run_task
+from app.core.profiling import ProfilingMiddleware, list_profiles, profile_call, profile_path, write_profile
+
+
+def _busy(seconds: float) -> int:
+    total, end = 0, time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def _write(profile_id: str, age_hours: float = 0.0) -> None:
+    write_profile({"id": profile_id, "created": f"{time.time() - age_hours * 3600:.6f}"}, Counter({"a;b": 5}))
+    if age_hours:
+        for path in profiling._paths(profile_id):
+            then = time.time() - age_hours * 3600
+            os.utime(path, (then, then))
+
+
+def test_retention_keeps_the_newest_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_KEEP", 3)
+    monkeypatch.setattr(settings, "PROFILE_MAX_AGE_HOURS", 24)
+    ids = [uuid.uuid4().hex for _ in range(5)]
+    for k, profile_id in enumerate(ids):
+        _write(profile_id, age_hours=5 - k)  # oldest first
+    _write(ids[-1])
+
+    assert sorted(p["id"] for p in list_profiles()) == sorted(ids[2:])
+    assert len(os.listdir(tmp_path)) == 6  # .folded and .json for each
+    assert profile_path(ids[0]) is None
+    with open(profile_path(ids[-1])) as f:
+        assert f.read() == "a;b 5\n"
+
+
+def test_retention_drops_expired_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_MAX_AGE_HOURS", 1)
+    old, new = uuid.uuid4().hex, uuid.uuid4().hex
+    _write(old, age_hours=2)
+    _write(new)
+    assert [p["id"] for p in list_profiles()] == [new]
+
+
+def test_profile_ids_are_validated(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    assert profile_path("../../etc/passwd") is None
+    assert profile_path(uuid.uuid4().hex) is None
+
+
+def test_both_modes_attribute_time_to_the_task():
+    result, folded = profile_call("trace", 0.001, _busy, 0.02)
+    assert result > 0
+    assert any(stack.endswith("_busy") or ";_busy;" in stack for stack in folded)
+
+    _, folded = profile_call("sample", 0.001, _busy, 0.1)
+    assert sum(micros for stack, micros in folded.items() if "_busy" in stack) > 0
+
+
+def test_middleware_profiles_requests_with_the_token(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": await run_task("blob_io", _busy, 0.05)}
+
+    app.add_middleware(ProfilingMiddleware)
+    client = TestClient(app)
+
+    assert "x-profile-id" not in client.get("/work").headers
+    r = client.get("/work", headers={"X-Profile-Token": "s3cret", "X-Profile-Mode": "trace"})
+    profile_id = r.headers["x-profile-id"]
+
+    [meta] = list_profiles()
+    assert meta["id"] == profile_id and meta["mode"] == "trace" and meta["route"] == "/work"
+    assert [task["task"] for task in meta["tasks"]] == ["blob_io"]
+    with open(profile_path(profile_id)) as f:
+        stacks = f.read()
+    assert "GET /work;run_task:blob_io;" in stacks
+    assert "GET /work;[event loop, I/O and awaits]" in stacks
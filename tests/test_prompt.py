@@ -0,0 +1,46 @@
+import pytest
+
+from app.services.llm.prompt import build_tailor_prompt, compact_json, count_tokens, merge_tailored
+
+
+def _resume(bullets=40):
+    return {
+        "Name": "Ada",
+        "Summary": "Backend engineer.",
+        "Experience": [f"Built service {i} handling many requests per second." for i in range(bullets)],
+        "Projects": ["Wrote a compiler."],
+    }
+
+
+def test_truncated_sections_keep_their_unsent_bullets():
+    resume = _resume()
+    budget = count_tokens(compact_json(resume)) // 2
+    prompt = build_tailor_prompt(resume, "Python engineer.", token_budget=budget)
+    sent = len(prompt.sections["Experience"])
+    assert "Experience" in prompt.truncated and sent < len(resume["Experience"])
+
+    rewritten = [f"Rewrote {i}." for i in range(sent)]
+    merged = merge_tailored(resume, {"experience": rewritten, "Summary": "New."}, prompt)
+    assert merged["Experience"] == rewritten + resume["Experience"][sent:]
+    assert merged["Summary"] == "New."
+    assert merged["Name"] == "Ada"
+
+
+def test_truncated_section_not_returned_as_list_is_left_alone():
+    resume = _resume()
+    prompt = build_tailor_prompt(resume, "Python engineer.", token_budget=count_tokens(compact_json(resume)) // 2)
+    merged = merge_tailored(resume, {"Experience": "one paragraph"}, prompt)
+    assert merged["Experience"] == resume["Experience"]
+
+
+def test_untruncated_sections_are_replaced():
+    resume = _resume(bullets=2)
+    prompt = build_tailor_prompt(resume, "Python engineer.", token_budget=100_000)
+    assert prompt.truncated == []
+    assert merge_tailored(resume, {"Experience": ["Only one."]}, prompt)["Experience"] == ["Only one."]
+
+
+@pytest.mark.parametrize("response", [[], "text", None, 3])
+def test_non_object_response_is_rejected(response):
+    with pytest.raises(ValueError):
+        merge_tailored(_resume(), response)
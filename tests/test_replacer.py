@@ -0,0 +1,89 @@
+from docx import Document
+
+from app.services.resume.replacer import _iter_blocks, replace_and_style, replace_many
+
+
+def _change(old, new):
+    return {"from_sentence": old, "to_sentence": new, "bold_words": [], "italic_words": []}
+
+
+def _tables_doc(*shapes):
+    doc = Document()
+    for t, (rows, cols) in enumerate(shapes):
+        table = doc.add_table(rows=rows, cols=cols)
+        for r in range(rows):
+            for c in range(cols):
+                table.cell(r, c).text = f"Cell {t}-{r}-{c}."
+    return doc
+
+
+def test_every_cell_of_multi_row_tables_is_visited():
+    doc = _tables_doc((50, 3), (30, 2))
+    cells = [block for kind, block in _iter_blocks(doc) if kind == "cell"]
+    assert len(cells) == 50 * 3 + 30 * 2
+    assert len({cell.text for cell in cells}) == len(cells)
+
+
+def test_replace_many_reaches_late_table_cells():
+    doc = _tables_doc((10, 2))
+    report = replace_many(doc, [_change("Cell 0-7-1.", "Rewritten cell.")])
+    assert report == {"replaced": 1, "unmatched": [], "ambiguous": [], "shadowed": []}
+    assert doc.tables[0].cell(7, 1).text == "Rewritten cell."
+
+
+def test_replace_and_style_rewrites_table_cells():
+    doc = _tables_doc((10, 2))
+    replace_and_style(doc, "Cell 0-9-0.", "Last row.", ["Last"])
+    cell = doc.tables[0].cell(9, 0)
+    assert cell.text == "Last row."
+    assert cell.paragraphs[0].runs[0].bold
+
+
+def test_merged_cells_are_visited_once():
+    doc = _tables_doc((4, 3))
+    table = doc.tables[0]
+    wide = table.cell(0, 0).merge(table.cell(0, 2))  # horizontal
+    wide.text = "Wide cell."
+    tall = table.cell(1, 1).merge(table.cell(3, 1))  # vertical
+    tall.text = "Tall cell."
+
+    texts = [block.text for kind, block in _iter_blocks(doc) if kind == "cell"]
+    assert texts.count("Wide cell.") == 1
+    assert texts.count("Tall cell.") == 1
+    # 12 grid slots: the wide cell covers 3 and the tall one 3
+    assert len(texts) == 12 - 2 - 2
+
+    report = replace_many(doc, [_change("Tall cell.", "Taller cell."), _change("Cell 0-3-2.", "Corner.")])
+    assert report == {"replaced": 2, "unmatched": [], "ambiguous": [], "shadowed": []}
+    assert table.cell(2, 1).text == "Taller cell."
+    assert table.cell(3, 2).text == "Corner."
+
+
+def test_streamed_edits_do_not_rewrite_earlier_edits():
+    doc = Document()
+    doc.add_paragraph("Led a team.")
+    doc.add_paragraph("Shipped the app.")
+    written = set()
+    first = replace_many(doc, [_change("Led a team.", "Led a team that Shipped the app.")], written)
+    second = replace_many(doc, [_change("Shipped the app.", "Launched the app.")], written)
+    assert first["replaced"] == 1 and second["replaced"] == 1
+    assert [p.text for p in doc.paragraphs] == ["Led a team that Shipped the app.", "Launched the app."]
+
+    # The only match left is text an earlier edit wrote
+    third = replace_many(doc, [_change("Led a team", "Managed people.")], written)
+    assert third == {"replaced": 0, "unmatched": ["Led a team"], "ambiguous": [], "shadowed": []}
+    assert doc.paragraphs[0].text == "Led a team that Shipped the app."
+
+
+def test_only_the_winning_change_counts_as_matched():
+    doc = Document()
+    doc.add_paragraph("Led a team of five engineers.")
+    doc.add_paragraph("Led a team of five engineers again.")
+    report = replace_many(doc, [
+        _change("Led a team of five", "Managed five engineers."),
+        _change("five engineers", "Led five people."),
+    ])
+    assert report == {
+        "replaced": 2, "unmatched": [], "ambiguous": ["Led a team of five"], "shadowed": ["five engineers"],
+    }
+    assert [p.text for p in doc.paragraphs] == ["Managed five engineers."] * 2
@@ -0,0 +1,42 @@
+import asyncio
+import uuid
+
+from app.core import security
+from app.core.principal import Principal, principal_cache
+from app.core.security import create_access_token, get_token_principal
+
+
+def test_email_claim_skips_the_lookup(monkeypatch):
+    async def no_lookup(db, user_id):
+        raise AssertionError("looked the user up")
+
+    monkeypatch.setattr(security, "_resolve_principal", no_lookup)
+    user_id = uuid.uuid4()
+    before = principal_cache.claim_hits
+    principal = asyncio.run(get_token_principal(create_access_token(user_id, email="a@example.com"), None))
+    assert principal == Principal(id=user_id, email="a@example.com")
+    assert isinstance(principal.id, uuid.UUID)
+    assert principal_cache.claim_hits == before + 1
+
+
+def test_tokens_without_the_claim_fall_back_to_the_lookup(monkeypatch):
+    user_id = uuid.uuid4()
+
+    async def lookup(db, uid):
+        return Principal(id=uid, email="db@example.com")
+
+    monkeypatch.setattr(security, "_resolve_principal", lookup)
+    principal = asyncio.run(get_token_principal(create_access_token(user_id), None))
+    assert principal == Principal(id=user_id, email="db@example.com")
+
+
+def test_read_only_routes_use_the_claims():
+    from app.api.routers import jobs, versions
+
+    def uses_claims(route):
+        return any(dep.call is get_token_principal for dep in route.dependant.dependencies)
+
+    by_endpoint = {route.endpoint.__name__: route for r in (jobs.router, versions.router) for route in r.routes}
+    for read_only in ("job_status", "job_result", "read_version"):
+        assert uses_claims(by_endpoint[read_only]), read_only
+    assert not uses_claims(by_endpoint["submit_job"])
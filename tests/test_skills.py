@@ -0,0 +1,23 @@
+import asyncio
+import time
+
+from app.services.resume.skills import MAX_NAME_LENGTH, SkillDictionary
+
+
+def test_names_longer_than_the_column_are_skipped():
+    inserted = []
+    skills = SkillDictionary()
+    skills._refreshed_at = time.monotonic()
+    skills._watermark = object()  # already loaded: resolve won't refresh
+
+    async def insert(missing, keys):
+        inserted.extend(missing)
+        for key in missing:
+            skills._ids[key] = bytes(16)
+
+    skills._insert = insert
+    long_name = "Designed and shipped " + "x" * MAX_NAME_LENGTH
+    ids = asyncio.run(skills.resolve(["Python", long_name]))
+    assert list(ids) == ["Python"]
+    assert inserted == ["python"]
+    assert skills.too_long == 1
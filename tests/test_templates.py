@@ -0,0 +1,65 @@
+import io
+import os
+
+from docx import Document
+
+from app.services.resume.templates import TemplateRegistry, load_template, render
+
+
+def _template(path, build) -> str:
+    doc = Document()
+    build(doc)
+    doc.save(path)
+    return str(path)
+
+
+def _split_runs(doc):
+    p = doc.add_paragraph("Summary: ")
+    first = p.add_run("{{SUM")
+    first.bold = True
+    p.add_run("MARY}} and {{ name }}.")
+    doc.add_paragraph("Skills: {{SKILLS}}")
+    doc.add_paragraph("{{EXPERIENCE}}")
+    doc.sections[0].header.paragraphs[0].text = "{{NAME}}"
+
+
+def _texts(data: bytes):
+    doc = Document(io.BytesIO(data))
+    return [p.text for p in doc.paragraphs], doc
+
+
+def test_placeholders_split_across_runs_are_filled(tmp_path):
+    template = load_template(_template(tmp_path / "cv.docx", _split_runs))
+    assert template.names == ["EXPERIENCE", "NAME", "SKILLS", "SUMMARY"]
+
+    data = render(template, {
+        "Summary": "Backend engineer", "Name": "Sam Lee", "skills": ["Python", "SQL"],
+        "experience": ["Acme, 2020-2024", "Initech, 2018-2020"],
+    })
+    texts, doc = _texts(data)
+    assert texts[0] == "Summary: Backend engineer and Sam Lee."
+    assert doc.paragraphs[0].runs[1].bold  # the value keeps the token's first run formatting
+    assert texts[1] == "Skills: Python, SQL"
+    assert texts[2] == "Acme, 2020-2024\nInitech, 2018-2020"  # one line per item, joined by w:br
+    assert doc.sections[0].header.paragraphs[0].text == "Sam Lee"
+
+
+def test_missing_keys_are_blank_and_the_cached_tree_is_untouched(tmp_path):
+    template = load_template(_template(tmp_path / "cv.docx", _split_runs))
+    first, _ = _texts(render(template, {"Summary": "First"}))
+    second, _ = _texts(render(template, {"Summary": "Second", "Name": "Ana"}))
+    assert first[0] == "Summary: First and ."
+    assert second[0] == "Summary: Second and Ana."
+
+
+def test_registry_reloads_an_edited_template(tmp_path):
+    path = _template(tmp_path / "cv.docx", lambda doc: doc.add_paragraph("Hello {{NAME}}"))
+    registry = TemplateRegistry()
+    assert _texts(registry.render(path, {"name": "Ana"}))[0] == ["Hello Ana"]
+    assert registry.get(path) is registry.get(path)
+
+    _template(tmp_path / "cv.docx", lambda doc: doc.add_paragraph("Hi there, {{NAME}}!"))
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    assert _texts(registry.render(path, {"name": "Ana"}))[0] == ["Hi there, Ana!"]
+    stats = registry.stats()
+    assert (stats["loads"], stats["reloads"], stats["renders"]) == (1, 1, 2)
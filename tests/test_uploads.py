@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import io
+import zipfile
+
+import pytest
+from docx import Document
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.uploads import UploadLimitMiddleware, read_docx_upload, read_upload, upload_stats, validate_docx
+
+
+def _docx() -> bytes:
+    buf = io.BytesIO()
+    Document().save(buf)
+    return buf.getvalue()
+
+
+def _zip(entries) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def _read(data: bytes, **kwargs):
+    return asyncio.run(read_upload(UploadFile(io.BytesIO(data), filename="cv.docx"), **kwargs))
+
+
+def _rejected(fn, *args, **kwargs) -> int:
+    with pytest.raises(HTTPException) as info:
+        fn(*args, **kwargs)
+    return info.value.status_code
+
+
+def test_chunked_read_hashes_as_it_goes(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_CHUNK_BYTES", 1000)
+    data = _docx()
+    upload = _read(data, magic=b"PK\x03\x04")
+    assert upload.data == data and upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.filename == "cv.docx"
+
+
+def test_oversized_and_wrong_type_uploads_stop_early(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_CHUNK_BYTES", 1000)
+    before = dict(upload_stats)
+    assert _rejected(_read, b"x" * 5000, max_bytes=2000) == 413
+    assert _rejected(_read, b"%PDF-1.7" + b"x" * 100, magic=b"PK\x03\x04") == 422
+    assert upload_stats["too_large"] == before.get("too_large", 0) + 1
+    assert upload_stats["wrong_type"] == before.get("wrong_type", 0) + 1
+
+
+def test_validate_docx_accepts_a_real_document():
+    validate_docx(_docx())
+
+
+@pytest.mark.parametrize("data, status", [
+    (b"PK\x03\x04 not really a zip", 422),
+    (_zip([("[Content_Types].xml", "<Types/>"), ("word/styles.xml", "<styles/>")]), 422),
+    (_zip([(f"word/part{i}.xml", "") for i in range(1001)]), 413),
+])
+def test_validate_docx_rejects_bad_archives(data, status):
+    assert _rejected(validate_docx, data) == status
+
+
+def test_validate_docx_rejects_zip_bombs(monkeypatch):
+    bomb = _zip([("[Content_Types].xml", "<Types/>"), ("word/document.xml", "\0" * (4 * 1024 * 1024))])
+    assert _rejected(validate_docx, bomb) == 413
+    monkeypatch.setattr(settings, "UPLOAD_MAX_COMPRESSION_RATIO", 10**6)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_UNCOMPRESSED_BYTES", 1024 * 1024)
+    assert _rejected(validate_docx, bomb) == 413
+
+
+def test_validate_docx_rejects_encrypted_entries():
+    data = bytearray(_docx())
+    # Set the encryption flag on the first central directory entry
+    at = data.find(b"PK\x01\x02")
+    data[at + 8] |= 0x1
+    assert _rejected(validate_docx, bytes(data)) == 422
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"sha256": (await read_docx_upload(file)).sha256}
+
+    app.add_middleware(UploadLimitMiddleware, max_body_bytes=64 * 1024)
+    return TestClient(app)
+
+
+def test_endpoint_accepts_a_docx(client):
+    data = _docx()
+    r = client.post("/upload", files={"file": ("cv.docx", data)})
+    assert r.status_code == 200
+    assert r.json()["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_middleware_refuses_large_bodies(client):
+    big = b"PK\x03\x04" + b"\0" * (128 * 1024)
+    r = client.post("/upload", files={"file": ("cv.docx", big)})
+    assert r.status_code == 413
+
+    def chunked():
+        for _ in range(4):
+            yield b"\0" * (32 * 1024)
+
+    r = client.post("/upload", content=chunked(), headers={"Content-Type": "multipart/form-data; boundary=x"})
+    assert r.status_code == 413
@@ -0,0 +1,142 @@
+import asyncio
+import random
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Base, Resume, ResumeSentence, ResumeVersion
+from app.repositories import version_repo
+
+
+class _AsyncFacade:
+    """Just the AsyncSession calls version_repo makes, over a sync SQLite session."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def execute(self, *args, **kwargs):
+        return self.session.execute(*args, **kwargs)
+
+    async def get(self, *args):
+        return self.session.get(*args)
+
+    def add(self, obj):
+        self.session.add(obj)
+
+    async def flush(self):
+        self.session.flush()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Resume.__table__, ResumeVersion.__table__, ResumeSentence.__table__])
+    version_repo._states.clear()
+    with Session(engine) as session:
+        yield _AsyncFacade(session)
+    version_repo._states.clear()
+
+
+def _edit(rng: random.Random, sentences: list, serial: int) -> list:
+    out = list(sentences)
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.randrange(4)
+        if kind == 0 or not out:
+            out.insert(rng.randint(0, len(out)), f"Added sentence {serial}-{rng.random():.6f}.")
+        elif kind == 1:
+            del out[rng.randrange(len(out))]
+        elif kind == 2:
+            out.insert(rng.randint(0, len(out) - 1), out.pop(rng.randrange(len(out))))
+        else:
+            k = rng.randrange(len(out))
+            out[k] = out[k].rstrip(".") + " (revised)."
+    return out
+
+
+async def _write_chain(db, count: int, seed: int = 3):
+    rng = random.Random(seed)
+    resume = Resume(user_id=uuid.uuid4(), title="CV")
+    db.add(resume)
+    await db.flush()
+    sentences = [f"Original sentence {i}." for i in range(30)]
+    history, parent = [], None
+    for serial in range(count):
+        version, _ = await version_repo.create_version(db, resume.id, sentences, parent)
+        history.append((version, sentences))
+        parent = version.id
+        sentences = _edit(rng, sentences, serial)
+    return history
+
+
+def test_every_version_reconstructs_exactly(db, monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_SNAPSHOT_INTERVAL", 5)
+
+    async def scenario():
+        history = await _write_chain(db, 23)
+        assert [v.depth for v, _ in history][:7] == [0, 1, 2, 3, 4, 0, 1]
+        # Cold: every version goes through the CTE and replays its deltas
+        version_repo._states.clear()
+        for version, sentences in history:
+            assert await version_repo.get_version_sentences(db, version.id) == sentences
+            version_repo._states.clear()
+        # Warm: each one builds on the previous version held in memory
+        for version, sentences in history:
+            assert await version_repo.get_version_sentences(db, version.id) == sentences
+
+    asyncio.run(scenario())
+
+
+def test_reconstruction_from_a_cached_ancestor_across_a_snapshot(db, monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_SNAPSHOT_INTERVAL", 4)
+
+    async def scenario():
+        history = await _write_chain(db, 10)
+        version_repo._states.clear()
+        # Hold version 2 (before the snapshot at 4); version 6 must still start from that snapshot
+        await version_repo.get_version_state(db, history[2][0].id)
+        version, sentences = history[6]
+        assert version.depth == 2
+        assert await version_repo.get_version_sentences(db, version.id) == sentences
+
+    asyncio.run(scenario())
+
+
+def test_deltas_write_only_changed_rows(db):
+    async def scenario():
+        resume = Resume(user_id=uuid.uuid4(), title="CV")
+        db.add(resume)
+        await db.flush()
+        base = [f"Sentence {i}." for i in range(50)]
+        first, written = await version_repo.create_version(db, resume.id, base)
+        assert written == 50
+        edited = base[:10] + ["Inserted."] + base[10:20] + base[21:]
+        _, written = await version_repo.create_version(db, resume.id, edited, first.id)
+        assert written == 2  # one insert, one delete
+
+    asyncio.run(scenario())
+
+
+def test_exhausted_order_keys_fall_back_to_a_snapshot(db, monkeypatch):
+    monkeypatch.setattr(version_repo, "ORDER_GAP", 4)
+
+    async def scenario():
+        resume = Resume(user_id=uuid.uuid4(), title="CV")
+        db.add(resume)
+        await db.flush()
+        sentences = ["First.", "Last."]
+        version, _ = await version_repo.create_version(db, resume.id, sentences)
+        depths = []
+        for k in range(5):
+            sentences = sentences[:1] + [f"Squeezed {k}."] + sentences[1:]
+            version, _ = await version_repo.create_version(db, resume.id, sentences, version.id)
+            depths.append(version.depth)
+        assert 0 in depths  # ran out of room between 4 and 8
+        version_repo._states.clear()
+        assert await version_repo.get_version_sentences(db, version.id) == sentences
+        orders = [order for order, _ in await version_repo.get_version_state(db, version.id)]
+        assert orders == sorted(set(orders))
+
+    asyncio.run(scenario())